@@ -4,7 +4,7 @@ Scheduling API routes for AuroraSync OS.
 
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, Field
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 
 from app.scheduling.scheduler import get_scheduler
 from app.scheduling.workshop_manager import get_workshop_manager
@@ -42,6 +42,11 @@ class ScheduleRequest(BaseModel):
         }
 
 
+class BatchScheduleRequest(BaseModel):
+    """Request model for fleet scheduling."""
+    requests: List[ScheduleRequest] = Field(..., description="Scheduling requests, booked in order")
+
+
 @router.post("/auto", tags=["Scheduling"])
 def auto_schedule(request: ScheduleRequest) -> Dict[str, Any]:
     """
@@ -84,6 +89,40 @@ def auto_schedule(request: ScheduleRequest) -> Dict[str, Any]:
         )
 
 
+@router.post("/auto/batch", tags=["Scheduling"])
+def auto_schedule_batch(request: BatchScheduleRequest) -> Dict[str, Any]:
+    """
+    Autonomous scheduling for several vehicles in one call.
+    
+    Args:
+        request: Batch of scheduling requests
+    
+    Returns:
+        Scheduling results, in request order
+    
+    Raises:
+        HTTPException: If scheduling fails
+    """
+    try:
+        scheduler = get_scheduler()
+        
+        results = scheduler.schedule_appointments(
+            [item.model_dump() for item in request.requests]
+        )
+        
+        return {
+            "status": "success",
+            "count": len(results),
+            "results": results
+        }
+    
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Batch scheduling failed: {str(e)}"
+        )
+
+
 @router.get("/workshops", tags=["Scheduling"])
 def get_workshops() -> Dict[str, Any]:
     """
@@ -99,7 +138,7 @@ def get_workshops() -> Dict[str, Any]:
         return {
             "status": "success",
             "count": len(workshops),
-            "workshops": workshops
+            "workshops": [workshop.to_dict() for workshop in workshops]
         }
     
     except Exception as e:
@@ -135,7 +174,7 @@ def get_workshop(workshop_id: str) -> Dict[str, Any]:
         
         return {
             "status": "success",
-            "workshop": workshop
+            "workshop": workshop.to_dict()
         }
     
     except HTTPException:
@@ -195,7 +234,8 @@ def get_available_slots(workshop_id: str, days: int = 7) -> Dict[str, Any]:
         workshop_manager = get_workshop_manager()
         slot_manager = get_slot_manager()
         
-        workshop = workshop_manager.get_workshop(workshop_id)
+        # Slot generation needs the raw workshop config (with pre-parsed hours)
+        workshop = workshop_manager.WORKSHOPS.get(workshop_id)
         if not workshop:
             raise HTTPException(
                 status_code=404,
@@ -215,7 +255,7 @@ def get_available_slots(workshop_id: str, days: int = 7) -> Dict[str, Any]:
             "status": "success",
             "workshop_id": workshop_id,
             "total_slots": len(slots),
-            "slots": slots
+            "slots": [slot.to_dict() for slot in slots]
         }
     
     except HTTPException:
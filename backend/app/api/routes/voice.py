@@ -2,9 +2,12 @@
 Voice API routes for AuroraSync OS.
 """
 
-from fastapi import APIRouter, HTTPException, UploadFile, File
+from fastapi import APIRouter, HTTPException, UploadFile, File, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterator, List, Optional
+import json
 import logging
 
 from app.voice_engine.voice_agent import VoiceAgent
@@ -16,6 +19,9 @@ from app.voice_engine.flow_manager import get_flow_manager
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+# Audio IDs are content-addressed, so audio for an ID never changes
+AUDIO_CACHE_CONTROL = "public, max-age=86400, immutable"
+
 # Initialize voice agent
 _voice_agent = None
 
@@ -34,6 +40,7 @@ class VoiceEngageRequest(BaseModel):
     vehicle_data: Dict[str, Any] = Field(..., description="Vehicle information")
     prediction_data: Optional[Dict[str, Any]] = Field(None, description="ML prediction data")
     booking_data: Optional[Dict[str, Any]] = Field(None, description="Booking information")
+    sample_rate: Optional[int] = Field(None, description="Audio sample rate in Hz (8000 for telephony, default 24000)")
     
     class Config:
         json_schema_extra = {
@@ -62,6 +69,92 @@ class VoiceContinueRequest(BaseModel):
     """Request model for continuing conversation."""
     conversation_id: str = Field(..., description="Conversation ID")
     user_response: str = Field(..., description="User's response")
+    sample_rate: Optional[int] = Field(None, description="Audio sample rate in Hz (8000 for telephony, default 24000)")
+
+
+# Map scenario to event type
+_EVENT_TYPE_MAP = {
+    "predicted_failure": "voice_predict_failure",
+    "urgent_alert": "voice_urgent_alert",
+    "appointment_reminder": "voice_reminder",
+    "post_service_feedback": "voice_feedback",
+    "booking_recovery": "voice_booking_recovery"
+}
+
+
+def _engage_event(request: VoiceEngageRequest, stream: bool = False) -> Dict[str, Any]:
+    """Create the voice agent event for an engagement request."""
+    return {
+        "type": _EVENT_TYPE_MAP.get(request.scenario, "voice_predict_failure"),
+        "payload": {
+            "vehicle_data": request.vehicle_data,
+            "prediction_data": request.prediction_data,
+            "booking_data": request.booking_data,
+            "sample_rate": request.sample_rate,
+            "stream": stream
+        }
+    }
+
+
+def _continue_event(request: VoiceContinueRequest, stream: bool = False) -> Dict[str, Any]:
+    """Create the voice agent event for a continue request."""
+    return {
+        "type": "voice_continue",
+        "payload": {
+            "conversation_id": request.conversation_id,
+            "user_response": request.user_response,
+            "sample_rate": request.sample_rate,
+            "stream": stream
+        }
+    }
+
+
+def _engage_result(response: Dict[str, Any]) -> Dict[str, Any]:
+    """Extract the result from a BaseAgent response, with the fields the frontend expects."""
+    if isinstance(response, dict) and "result" in response:
+        result = response["result"]
+        # Ensure 'message' field exists (frontend expects 'message', backend returns 'text')
+        if "text" in result and "message" not in result:
+            result["message"] = result["text"]
+        return result
+    
+    return response
+
+
+def _stream_response(
+    voice_agent: VoiceAgent,
+    response: Dict[str, Any],
+    progressive: bool = False
+) -> StreamingResponse:
+    """
+    Stream a voice agent response as newline-delimited JSON.
+    
+    The first line is the result (text, conversation ID, ...); each further
+    line is one synthesized sentence ({"seq", "text", "audio"}), sent as
+    soon as it is ready, or with progressive=True one audio frame of
+    growing size (see VoiceAgent._stream_audio).
+    """
+    result = response.get("result", response)
+    # Ensure 'message' field exists (frontend expects 'message', backend returns 'text')
+    if "text" in result and "message" not in result:
+        result["message"] = result["text"]
+    if "should_continue" in result:
+        result["conversation_complete"] = not result["should_continue"]
+    
+    def lines() -> Iterator[str]:
+        yield json.dumps(result, default=str) + "\n"
+        audio = result.get("audio") or {}
+        if audio.get("streaming"):
+            for chunk in voice_agent.synthesize_streaming(
+                result["text"],
+                voice=audio["voice"],
+                speaking_rate=audio["speaking_rate"],
+                progressive=progressive,
+                sample_rate=audio["sample_rate"]
+            ):
+                yield json.dumps(chunk) + "\n"
+    
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
 
 
 @router.post("/engage", tags=["Voice"])
@@ -94,39 +187,11 @@ def engage_voice(request: VoiceEngageRequest) -> Dict[str, Any]:
     try:
         voice_agent = get_voice_agent()
         
-        # Map scenario to event type
-        event_type_map = {
-            "predicted_failure": "voice_predict_failure",
-            "urgent_alert": "voice_urgent_alert",
-            "appointment_reminder": "voice_reminder",
-            "post_service_feedback": "voice_feedback",
-            "booking_recovery": "voice_booking_recovery"
-        }
-        
-        event_type = event_type_map.get(request.scenario, "voice_predict_failure")
-        
-        # Create event
-        event = {
-            "type": event_type,
-            "payload": {
-                "vehicle_data": request.vehicle_data,
-                "prediction_data": request.prediction_data,
-                "booking_data": request.booking_data
-            }
-        }
-        
         # Handle event
-        response = voice_agent.handle_event(event)
+        response = voice_agent.handle_event(_engage_event(request))
         
         # Extract result from BaseAgent response format
-        if isinstance(response, dict) and "result" in response:
-            result = response["result"]
-            # Ensure 'message' field exists (frontend expects 'message', backend returns 'text')
-            if "text" in result and "message" not in result:
-                result["message"] = result["text"]
-            return result
-        
-        return response
+        return _engage_result(response)
     
     except Exception as e:
         import traceback
@@ -138,6 +203,43 @@ def engage_voice(request: VoiceEngageRequest) -> Dict[str, Any]:
         )
 
 
+@router.post("/engage/batch", tags=["Voice"])
+def engage_voice_batch(requests: List[VoiceEngageRequest]) -> Dict[str, Any]:
+    """
+    Start voice conversations with many customers at once.
+    
+    For bulk campaigns (service reminders, alert broadcasts): each request
+    is handled as in /engage, but all messages are synthesized together,
+    one TTS batch per voice setting, with repeated messages synthesized once.
+    
+    Args:
+        requests: Voice engagement requests
+    
+    Returns:
+        One /engage result per request, in order
+    
+    Raises:
+        HTTPException: If engagement fails
+    """
+    try:
+        voice_agent = get_voice_agent()
+        responses = voice_agent.run_batch([_engage_event(request) for request in requests])
+        results = [_engage_result(response) for response in responses]
+        
+        return {
+            "status": "success",
+            "count": len(results),
+            "results": results
+        }
+    
+    except Exception as e:
+        logger.error(f"Batch voice engagement failed: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Batch voice engagement failed: {str(e)}"
+        )
+
+
 @router.post("/continue", tags=["Voice"])
 def continue_conversation(request: VoiceContinueRequest) -> Dict[str, Any]:
     """
@@ -158,15 +260,7 @@ def continue_conversation(request: VoiceContinueRequest) -> Dict[str, Any]:
     try:
         voice_agent = get_voice_agent()
         
-        event = {
-            "type": "voice_continue",
-            "payload": {
-                "conversation_id": request.conversation_id,
-                "user_response": request.user_response
-            }
-        }
-        
-        response = voice_agent.handle_event(event)
+        response = voice_agent.handle_event(_continue_event(request))
         
         # Extract result from BaseAgent response format
         if isinstance(response, dict) and "result" in response:
@@ -188,6 +282,68 @@ def continue_conversation(request: VoiceContinueRequest) -> Dict[str, Any]:
         )
 
 
+@router.post("/engage/stream", tags=["Voice"])
+def engage_voice_stream(request: VoiceEngageRequest, progressive: bool = False) -> StreamingResponse:
+    """
+    Start a voice conversation, streaming audio sentence by sentence.
+    
+    Same scenarios as /engage. The response is newline-delimited JSON: the
+    conversation result first, then one audio chunk per sentence, so
+    playback can start before the whole message is synthesized.
+    
+    Args:
+        request: Voice engagement request
+        progressive: Stream audio frames of growing size (20, 40, 80, 160,
+            then 200ms) instead of whole sentences
+    
+    Returns:
+        Streaming NDJSON response
+    
+    Raises:
+        HTTPException: If engagement fails
+    """
+    try:
+        voice_agent = get_voice_agent()
+        response = voice_agent.handle_event(_engage_event(request, stream=True))
+        return _stream_response(voice_agent, response, progressive)
+    
+    except Exception as e:
+        logger.error(f"Voice engagement failed: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Voice engagement failed: {str(e)}"
+        )
+
+
+@router.post("/continue/stream", tags=["Voice"])
+def continue_conversation_stream(request: VoiceContinueRequest, progressive: bool = False) -> StreamingResponse:
+    """
+    Continue a voice conversation, streaming audio sentence by sentence.
+    
+    Same as /continue, with the response streamed as in /engage/stream.
+    
+    Args:
+        request: Continue conversation request
+        progressive: Stream audio frames of growing size, as in /engage/stream
+    
+    Returns:
+        Streaming NDJSON response
+    
+    Raises:
+        HTTPException: If continuation fails
+    """
+    try:
+        voice_agent = get_voice_agent()
+        response = voice_agent.handle_event(_continue_event(request, stream=True))
+        return _stream_response(voice_agent, response, progressive)
+    
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Conversation continuation failed: {str(e)}"
+        )
+
+
 @router.post("/transcribe", tags=["Voice"])
 async def transcribe_audio(
     audio: UploadFile = File(...),
@@ -214,14 +370,15 @@ async def transcribe_audio(
         
         # In production, we would read the actual audio file
         # For demo, we use mock transcription
-        transcription = stt_provider.transcribe_audio(audio.file, language)
+        # Async route: run the blocking STT call off the event loop
+        transcription = await run_in_threadpool(stt_provider.transcribe_audio, audio.file, language)
         
         # Detect intent
-        intent = stt_provider.detect_intent(transcription["text"])
+        intent = stt_provider.detect_intent(transcription.text)
         
         return {
             "status": "success",
-            "transcription": transcription,
+            "transcription": transcription.to_dict(),
             "intent": intent
         }
     
@@ -292,9 +449,11 @@ def get_available_voices() -> Dict[str, Any]:
 
 @router.post("/tts", tags=["Voice"])
 def generate_speech(
+    response: Response,
     text: str,
     voice: str = "Aurora_Default",
-    speaking_rate: float = 1.0
+    speaking_rate: float = 1.0,
+    sample_rate: int = 24000
 ) -> Dict[str, Any]:
     """
     Generate speech from text.
@@ -305,6 +464,7 @@ def generate_speech(
         text: Text to convert
         voice: Voice to use
         speaking_rate: Speaking rate (0.5 to 2.0)
+        sample_rate: Audio sample rate in Hz (8000, 16000 or 24000)
     
     Returns:
         Audio metadata
@@ -314,11 +474,12 @@ def generate_speech(
     """
     try:
         tts_provider = get_tts_provider()
-        audio = tts_provider.generate_tts(text, voice, speaking_rate)
+        audio = tts_provider.generate_tts(text, voice, speaking_rate, sample_rate=sample_rate)
+        response.headers["ETag"] = f'"{audio.audio_id}"'
         
         return {
             "status": "success",
-            "audio": audio
+            "audio": audio.to_dict()
         }
     
     except Exception as e:
@@ -329,23 +490,41 @@ def generate_speech(
 
 
 @router.get("/audio/{audio_id}", tags=["Voice"])
-def get_audio(audio_id: str) -> Dict[str, Any]:
+def get_audio(audio_id: str, response: Response) -> Dict[str, Any]:
     """
     Get audio file.
     
     In production, this would serve the actual audio file.
     For demo, returns metadata.
     
+    Audio is looked up in this worker's TTS cache, so an ID generated on
+    another worker, or already evicted from the cache, is reported as not
+    found; the ID is a content hash, so its audio cannot be rebuilt from it.
+    
     Args:
-        audio_id: Audio ID
+        audio_id: Audio ID, with or without the ".wav" suffix of audio_url
     
     Returns:
         Audio metadata or file
+    
+    Raises:
+        HTTPException: If no audio with this ID is cached
     """
+    audio_id = audio_id.removesuffix(".wav")
+    audio = get_tts_provider().get_cached_audio(audio_id)
+    if audio is None:
+        raise HTTPException(
+            status_code=404,
+            detail="Audio not found"
+        )
+    
+    response.headers["ETag"] = f'"{audio_id}"'
+    response.headers["Cache-Control"] = AUDIO_CACHE_CONTROL
     return {
         "status": "success",
         "audio_id": audio_id,
         "message": "Mock audio endpoint - in production, this would serve the actual audio file",
-        "format": "wav",
-        "sample_rate": 24000
+        "format": audio.format,
+        "sample_rate": audio.sample_rate,
+        "codec": audio.codec
     }
@@ -21,6 +21,16 @@ class Settings(BaseSettings):
     # Redis Configuration
     REDIS_URL: str = "redis://localhost:6379/0"
     
+    # Scheduler state backend: "memory" (single worker) or "redis" (shared across workers)
+    SCHEDULER_STATE_BACKEND: str = "memory"
+    
+    # Voice conversation storage: "memory" (single worker) or "redis" (shared across workers)
+    CONVERSATION_STORE_BACKEND: str = "memory"
+    
+    # Voice Engine Configuration
+    # Maximum TTS syntheses running at once (bounds GPU/CPU memory of a real engine)
+    TTS_MAX_CONCURRENCY: int = 4
+    
     # Application Configuration
     LOG_LEVEL: str = "INFO"
     ENVIRONMENT: str = "development"
@@ -6,9 +6,10 @@ Autonomous scheduling with load balancing, demand forecasting, and escalation.
 from app.scheduling.scheduler import Scheduler, schedule_appointment
 from app.scheduling.slot_manager import SlotManager
 from app.scheduling.demand_forecaster import DemandForecaster
-from app.scheduling.escalation_engine import EscalationEngine
-from app.scheduling.workshop_manager import WorkshopManager
+from app.scheduling.escalation_engine import EscalationEngine, EscalationResult, SafetyAssessment
+from app.scheduling.workshop_manager import WorkshopManager, WorkshopView
 from app.scheduling.rca_insights import RCAInsights
+from app.scheduling.state_store import RedisStateStore
 
 __all__ = [
     "Scheduler",
@@ -16,6 +17,10 @@ __all__ = [
     "SlotManager",
     "DemandForecaster",
     "EscalationEngine",
+    "EscalationResult",
+    "SafetyAssessment",
     "WorkshopManager",
+    "WorkshopView",
     "RCAInsights",
+    "RedisStateStore",
 ]
@@ -3,14 +3,16 @@ Demand Forecaster for AuroraSync OS.
 Predicts service demand using time-series forecasting.
 """
 
-from typing import Dict, Any, List, Optional
-from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, Tuple
+from datetime import date, datetime, timedelta
 import logging
 import numpy as np
 
 
 logger = logging.getLogger(__name__)
 
+DAY_NAMES = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+
 
 class DemandForecaster:
     """
@@ -19,10 +21,26 @@ class DemandForecaster:
     In production, this would use Prophet or ARIMA.
     """
     
+    # Moving-average window (days)
+    WINDOW_SIZE = 7
+    
+    # Day-of-week demand multipliers (Monday=0 ... Sunday=6)
+    WEEKDAY_MULTIPLIERS = np.array([1.2, 1.0, 1.0, 1.0, 1.0, 0.7, 0.7])
+    
+    # Load percentage thresholds separating low / moderate / high status
+    LOAD_STATUS_THRESHOLDS = np.array([50, 80])
+    LOAD_STATUSES = ("low", "moderate", "high")
+    
+    # Number of days kept in the precomputed date table
+    DATE_TABLE_DAYS = 14
+    
     def __init__(self):
         """Initialize demand forecaster."""
         # Historical demand data (mock)
         self.historical_demand = self._generate_mock_historical_data()
+        self._ws_ids, self._ws_index, self._ws_stats = self._build_workshop_stats()
+        self._date_table_start: Optional[date] = None
+        self._date_table: List[Tuple[str, str]] = []
         logger.info("Demand Forecaster initialized")
     
     def _generate_mock_historical_data(self) -> Dict[str, List[int]]:
@@ -47,6 +65,61 @@ class DemandForecaster:
         
         return data
     
+    def _build_workshop_stats(self):
+        """Precompute moving-average statistics for all workshops as arrays."""
+        ws_ids = list(self.historical_demand.keys())
+        ws_index = {ws_id: i for i, ws_id in enumerate(ws_ids)}
+        
+        recent = np.array(
+            [self.historical_demand[ws_id][-self.WINDOW_SIZE:] for ws_id in ws_ids],
+            dtype=np.float64
+        ).reshape(len(ws_ids), -1)
+        
+        ws_stats = {
+            "avg": recent.mean(axis=1),
+            "trend": (recent[:, -1] - recent[:, 0]) / self.WINDOW_SIZE,
+            "std": recent.std(axis=1)
+        }
+        return ws_ids, ws_index, ws_stats
+    
+    def _forecast_dates(self, start_date: date, days_ahead: int) -> List[Tuple[str, str]]:
+        """Get (ISO date, weekday name) pairs, rebuilt only when the day changes."""
+        if start_date != self._date_table_start or days_ahead > len(self._date_table):
+            start_wd = start_date.weekday()
+            self._date_table = [
+                ((start_date + timedelta(days=i)).isoformat(), DAY_NAMES[(start_wd + i) % 7])
+                for i in range(max(days_ahead, self.DATE_TABLE_DAYS))
+            ]
+            self._date_table_start = start_date
+        return self._date_table[:days_ahead]
+    
+    def forecast_demand_batch(
+        self,
+        days_ahead: int = 7,
+        start_date: Optional[date] = None
+    ) -> np.ndarray:
+        """
+        Forecast demand for all workshops in a single broadcasted pass.
+        
+        Args:
+            days_ahead: Number of days to forecast
+            start_date: First forecast day (defaults to now)
+        
+        Returns:
+            Array of shape (n_workshops, days_ahead), rows ordered as
+            ``self._ws_ids``
+        """
+        start_date = start_date or datetime.now().date()
+        days = np.arange(days_ahead)
+        mult = self.WEEKDAY_MULTIPLIERS[(start_date.weekday() + days) % 7]
+        
+        # Fused in place: (avg + trend * day) * mult, clipped at zero
+        forecasts = np.multiply.outer(self._ws_stats["trend"], days)
+        forecasts += self._ws_stats["avg"][:, None]
+        forecasts *= mult
+        np.maximum(forecasts, 0, out=forecasts)
+        return forecasts.astype(np.int32)
+    
     def forecast_demand(
         self,
         workshop_id: str,
@@ -62,45 +135,27 @@ class DemandForecaster:
         Returns:
             List of daily forecasts
         """
-        if workshop_id not in self.historical_demand:
+        ws_idx = self._ws_index.get(workshop_id)
+        if ws_idx is None:
             # Return default forecast
             return self._default_forecast(days_ahead)
         
-        historical = self.historical_demand[workshop_id]
-        
-        # Simple moving average forecast
-        window_size = 7
-        recent_data = historical[-window_size:]
-        avg_demand = np.mean(recent_data)
-        trend = (recent_data[-1] - recent_data[0]) / window_size
+        # Moving average + trend + day-of-week seasonality, one row of the batch
+        start_date = datetime.now().date()
+        forecast_row = self.forecast_demand_batch(days_ahead, start_date)[ws_idx]
+        std_dev = self._ws_stats["std"][ws_idx]
         
         forecasts = []
-        for day in range(days_ahead):
-            # Forecast with trend
-            forecast_value = avg_demand + (trend * day)
-            
-            # Add day-of-week seasonality
-            future_date = datetime.now() + timedelta(days=day)
-            day_of_week = future_date.weekday()
-            
-            # Weekend adjustment (lower demand)
-            if day_of_week >= 5:
-                forecast_value *= 0.7
-            
-            # Monday adjustment (higher demand)
-            if day_of_week == 0:
-                forecast_value *= 1.2
-            
-            forecast_value = max(0, int(forecast_value))
+        for day, (date_str, day_name) in enumerate(self._forecast_dates(start_date, days_ahead)):
+            forecast_value = int(forecast_row[day])
             
             # Calculate confidence interval
-            std_dev = np.std(recent_data)
             lower_bound = max(0, int(forecast_value - std_dev))
             upper_bound = int(forecast_value + std_dev)
             
             forecasts.append({
-                "date": future_date.strftime("%Y-%m-%d"),
-                "day_of_week": future_date.strftime("%A"),
+                "date": date_str,
+                "day_of_week": day_name,
                 "forecast_demand": forecast_value,
                 "lower_bound": lower_bound,
                 "upper_bound": upper_bound,
@@ -172,41 +227,39 @@ class DemandForecaster:
         
         # Calculate load percentages (assuming capacity of 10 per day)
         capacity = 10
-        load_curve = []
+        demand = np.fromiter((f["forecast_demand"] for f in forecasts), dtype=np.float64, count=len(forecasts))
+        load = np.minimum(100, demand / capacity * 100)
+        statuses = np.searchsorted(self.LOAD_STATUS_THRESHOLDS, load, side="right")
         
-        for forecast in forecasts:
-            load_percentage = min(100, (forecast["forecast_demand"] / capacity) * 100)
-            
-            if load_percentage < 50:
-                status = "low"
-            elif load_percentage < 80:
-                status = "moderate"
-            else:
-                status = "high"
-            
-            load_curve.append({
+        # Aggregates come straight from the array, before the per-day dicts are built
+        average_load = round(float(load.mean()), 1)
+        peak_idx = int(load.argmax())
+        
+        load_curve = [
+            {
                 "date": forecast["date"],
                 "demand": forecast["forecast_demand"],
                 "capacity": capacity,
-                "load_percentage": round(load_percentage, 1),
-                "status": status
-            })
+                "load_percentage": round(float(load_percentage), 1),
+                "status": self.LOAD_STATUSES[status]
+            }
+            for forecast, load_percentage, status in zip(forecasts, load, statuses)
+        ]
         
         return {
             "workshop_id": workshop_id,
             "load_curve": load_curve,
-            "average_load": round(np.mean([lc["load_percentage"] for lc in load_curve]), 1),
-            "peak_day": max(load_curve, key=lambda x: x["load_percentage"])
+            "average_load": average_load,
+            "peak_day": load_curve[peak_idx]
         }
     
     def _default_forecast(self, days_ahead: int) -> List[Dict[str, Any]]:
         """Generate default forecast."""
         forecasts = []
-        for day in range(days_ahead):
-            future_date = datetime.now() + timedelta(days=day)
+        for date_str, day_name in self._forecast_dates(datetime.now().date(), days_ahead):
             forecasts.append({
-                "date": future_date.strftime("%Y-%m-%d"),
-                "day_of_week": future_date.strftime("%A"),
+                "date": date_str,
+                "day_of_week": day_name,
                 "forecast_demand": 8,
                 "lower_bound": 5,
                 "upper_bound": 11,
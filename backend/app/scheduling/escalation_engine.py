@@ -3,13 +3,56 @@ Escalation Engine for AuroraSync OS.
 Handles critical failure escalation and emergency scheduling.
 """
 
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, Tuple, Union
+from dataclasses import dataclass
 import logging
 
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass(slots=True)
+class EscalationResult:
+    """Escalation decision for a single failure prediction."""
+    severity: str
+    should_escalate: bool
+    actions: Tuple[str, ...]
+    recommended_timeframe: str
+    override_preferences: bool
+    reasoning: str
+    escalation_id: Optional[str] = None
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to a JSON-serializable dict."""
+        return {
+            "severity": self.severity,
+            "should_escalate": self.should_escalate,
+            "actions": list(self.actions),
+            "recommended_timeframe": self.recommended_timeframe,
+            "override_preferences": self.override_preferences,
+            "reasoning": self.reasoning,
+            "escalation_id": self.escalation_id
+        }
+
+
+@dataclass(slots=True)
+class SafetyAssessment:
+    """Drive-safety assessment for a vehicle."""
+    safe_to_drive: Union[bool, str]
+    recommendation: str
+    reason: str
+    max_distance_km: Optional[int]
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to a JSON-serializable dict."""
+        return {
+            "safe_to_drive": self.safe_to_drive,
+            "recommendation": self.recommendation,
+            "reason": self.reason,
+            "max_distance_km": self.max_distance_km
+        }
+
+
 class EscalationEngine:
     """
     Evaluates failure severity and escalates critical cases.
@@ -44,6 +87,38 @@ class EscalationEngine:
         "EMERGENCY": 5
     }
     
+    # Required actions per severity level
+    SEVERITY_ACTIONS = {
+        "EMERGENCY": (
+            "OVERRIDE_SCHEDULING",
+            "FORCE_EARLIEST_SLOT",
+            "SEND_URGENT_VOICE_ALERT",
+            "NOTIFY_WORKSHOP_EMERGENCY",
+            "RECOMMEND_TOW_SERVICE",
+            "DISABLE_VEHICLE_IF_POSSIBLE"
+        ),
+        "CRITICAL": (
+            "PRIORITIZE_SCHEDULING",
+            "USE_EMERGENCY_SLOT",
+            "SEND_URGENT_VOICE_ALERT",
+            "NOTIFY_WORKSHOP_PRIORITY",
+            "RECOMMEND_IMMEDIATE_SERVICE"
+        ),
+        "HIGH": (
+            "EXPEDITE_SCHEDULING",
+            "SEND_VOICE_ALERT",
+            "RECOMMEND_EARLY_SERVICE"
+        ),
+        "MEDIUM": (
+            "NORMAL_SCHEDULING",
+            "SEND_VOICE_NOTIFICATION"
+        ),
+        "LOW": (
+            "NORMAL_SCHEDULING",
+            "SEND_REMINDER"
+        )
+    }
+    
     def __init__(self):
         """Initialize escalation engine."""
         self.escalation_count = 0
@@ -55,7 +130,7 @@ class EscalationEngine:
         component: str,
         probability: float,
         additional_context: Optional[Dict[str, Any]] = None
-    ) -> Dict[str, Any]:
+    ) -> EscalationResult:
         """
         Evaluate if a case should be escalated.
         
@@ -95,15 +170,15 @@ class EscalationEngine:
                 f"Severity: {severity}, Probability: {probability:.2f}"
             )
         
-        return {
-            "severity": severity,
-            "should_escalate": should_escalate,
-            "actions": actions,
-            "recommended_timeframe": self._get_timeframe(severity, thresholds),
-            "override_preferences": severity == "EMERGENCY",
-            "reasoning": self._generate_reasoning(severity, component, probability, thresholds),
-            "escalation_id": f"ESC-{self.escalation_count:04d}" if should_escalate else None
-        }
+        return EscalationResult(
+            severity=severity,
+            should_escalate=should_escalate,
+            actions=actions,
+            recommended_timeframe=self._get_timeframe(severity, thresholds),
+            override_preferences=severity == "EMERGENCY",
+            reasoning=self._generate_reasoning(severity, component, probability, thresholds),
+            escalation_id=f"ESC-{self.escalation_count:04d}" if should_escalate else None
+        )
     
     def _calculate_severity(
         self,
@@ -142,49 +217,9 @@ class EscalationEngine:
         severity: str,
         component: str,
         probability: float
-    ) -> List[str]:
+    ) -> Tuple[str, ...]:
         """Determine required actions based on severity."""
-        actions = []
-        
-        if severity == "EMERGENCY":
-            actions.extend([
-                "OVERRIDE_SCHEDULING",
-                "FORCE_EARLIEST_SLOT",
-                "SEND_URGENT_VOICE_ALERT",
-                "NOTIFY_WORKSHOP_EMERGENCY",
-                "RECOMMEND_TOW_SERVICE",
-                "DISABLE_VEHICLE_IF_POSSIBLE"
-            ])
-        
-        elif severity == "CRITICAL":
-            actions.extend([
-                "PRIORITIZE_SCHEDULING",
-                "USE_EMERGENCY_SLOT",
-                "SEND_URGENT_VOICE_ALERT",
-                "NOTIFY_WORKSHOP_PRIORITY",
-                "RECOMMEND_IMMEDIATE_SERVICE"
-            ])
-        
-        elif severity == "HIGH":
-            actions.extend([
-                "EXPEDITE_SCHEDULING",
-                "SEND_VOICE_ALERT",
-                "RECOMMEND_EARLY_SERVICE"
-            ])
-        
-        elif severity == "MEDIUM":
-            actions.extend([
-                "NORMAL_SCHEDULING",
-                "SEND_VOICE_NOTIFICATION"
-            ])
-        
-        else:  # LOW
-            actions.extend([
-                "NORMAL_SCHEDULING",
-                "SEND_REMINDER"
-            ])
-        
-        return actions
+        return self.SEVERITY_ACTIONS.get(severity, self.SEVERITY_ACTIONS["LOW"])
     
     def _get_timeframe(
         self,
@@ -248,7 +283,7 @@ class EscalationEngine:
         component: str,
         probability: float,
         severity: str
-    ) -> Dict[str, Any]:
+    ) -> SafetyAssessment:
         """
         Check if it's safe to drive.
         
@@ -261,36 +296,36 @@ class EscalationEngine:
             Safety assessment
         """
         if severity == "EMERGENCY":
-            return {
-                "safe_to_drive": False,
-                "recommendation": "DO NOT DRIVE",
-                "reason": f"{component} failure imminent. Arrange tow service immediately.",
-                "max_distance_km": 0
-            }
+            return SafetyAssessment(
+                safe_to_drive=False,
+                recommendation="DO NOT DRIVE",
+                reason=f"{component} failure imminent. Arrange tow service immediately.",
+                max_distance_km=0
+            )
         
         elif severity == "CRITICAL":
-            return {
-                "safe_to_drive": "limited",
-                "recommendation": "DRIVE TO SERVICE CENTER ONLY",
-                "reason": f"{component} at high risk. Avoid highways and long distances.",
-                "max_distance_km": 10
-            }
+            return SafetyAssessment(
+                safe_to_drive="limited",
+                recommendation="DRIVE TO SERVICE CENTER ONLY",
+                reason=f"{component} at high risk. Avoid highways and long distances.",
+                max_distance_km=10
+            )
         
         elif severity == "HIGH":
-            return {
-                "safe_to_drive": "with_caution",
-                "recommendation": "DRIVE WITH CAUTION",
-                "reason": f"{component} showing significant wear. Avoid aggressive driving.",
-                "max_distance_km": 50
-            }
+            return SafetyAssessment(
+                safe_to_drive="with_caution",
+                recommendation="DRIVE WITH CAUTION",
+                reason=f"{component} showing significant wear. Avoid aggressive driving.",
+                max_distance_km=50
+            )
         
         else:
-            return {
-                "safe_to_drive": True,
-                "recommendation": "SAFE TO DRIVE",
-                "reason": f"{component} condition acceptable. Schedule service soon.",
-                "max_distance_km": None
-            }
+            return SafetyAssessment(
+                safe_to_drive=True,
+                recommendation="SAFE TO DRIVE",
+                reason=f"{component} condition acceptable. Schedule service soon.",
+                max_distance_km=None
+            )
 
 
 # Global escalation engine instance
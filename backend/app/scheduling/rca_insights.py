@@ -6,7 +6,9 @@ Analyzes failure patterns and generates manufacturing feedback.
 from typing import Dict, Any, List, Optional
 from datetime import datetime, timedelta
 import logging
+import time
 from collections import Counter
+import numpy as np
 
 
 logger = logging.getLogger(__name__)
@@ -17,13 +19,72 @@ class RCAInsights:
     Generates RCA/CAPA insights from failure patterns.
     """
     
-    def __init__(self):
+    # Maximum predictions kept; oldest entries are overwritten once full
+    PREDICTION_CAPACITY = 1 << 16
+    
+    # Initial ring buffer size; doubled as predictions arrive, up to the capacity
+    INITIAL_PREDICTION_SIZE = 1024
+    
+    # Ring buffer columns, one array per prediction field
+    _PREDICTION_COLUMNS = (
+        ("_pred_vid", np.int64),
+        ("_pred_component", np.int32),
+        ("_pred_probability", np.float32),
+        ("_pred_epoch", np.float64),
+        ("_pred_logged", np.float64),
+        ("_pred_validated", bool)
+    )
+    
+    # Grace period after the predicted date before a miss counts (seconds)
+    VALIDATION_GRACE_SECONDS = 7 * 24 * 3600
+    
+    def __init__(self, prediction_capacity: int = PREDICTION_CAPACITY):
         """Initialize RCA insights."""
         # Mock failure history (in production, from database)
         self.failure_history: List[Dict[str, Any]] = []
-        self.prediction_history: List[Dict[str, Any]] = []
+        
+        # Prediction history as a ring buffer (one array per field), allocated
+        # small and grown on demand
+        self._pred_cap = prediction_capacity
+        self._pred_n = 0
+        size = min(self.INITIAL_PREDICTION_SIZE, prediction_capacity)
+        for name, dtype in self._PREDICTION_COLUMNS:
+            setattr(self, name, np.zeros(size, dtype=dtype))
+        
+        # String <-> integer code tables for the ring buffer; compacted to the
+        # codes still in the buffer once they outgrow it
+        self._vehicle_codes: Dict[str, int] = {}
+        self._vehicle_names: List[str] = []
+        self._component_codes: Dict[str, int] = {}
+        self._component_names: List[str] = []
         logger.info("RCA Insights initialized")
     
+    @staticmethod
+    def _intern(codes: Dict[str, int], names: List[str], value: str) -> int:
+        """Get the integer code for a string, assigning a new one if needed."""
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(names)
+            names.append(value)
+        return code
+    
+    def _grow_predictions(self):
+        """Double the ring buffer, up to the prediction capacity."""
+        size = min(2 * len(self._pred_vid), self._pred_cap)
+        for name, dtype in self._PREDICTION_COLUMNS:
+            column = np.zeros(size, dtype=dtype)
+            old = getattr(self, name)
+            column[:len(old)] = old
+            setattr(self, name, column)
+    
+    def _compact_codes(self, column: np.ndarray, codes: Dict[str, int], names: List[str]):
+        """Renumber a code table to the codes still in the buffer, dropping the rest."""
+        count = min(self._pred_n, self._pred_cap)
+        live, column[:count] = np.unique(column[:count], return_inverse=True)
+        names[:] = [names[code] for code in live.tolist()]
+        codes.clear()
+        codes.update((name, code) for code, name in enumerate(names))
+    
     def log_prediction(
         self,
         vehicle_id: str,
@@ -32,14 +93,46 @@ class RCAInsights:
         predicted_date: str
     ):
         """Log a prediction for later validation."""
-        self.prediction_history.append({
-            "vehicle_id": vehicle_id,
-            "component": component,
-            "probability": probability,
-            "predicted_date": predicted_date,
-            "prediction_timestamp": datetime.now().isoformat(),
-            "validated": False
-        })
+        if self._pred_n == len(self._pred_vid) and self._pred_n < self._pred_cap:
+            self._grow_predictions()
+        
+        # Overwritten entries leave dead codes behind; never keep more than
+        # two per buffer slot
+        if len(self._vehicle_names) >= 2 * self._pred_cap:
+            self._compact_codes(self._pred_vid, self._vehicle_codes, self._vehicle_names)
+        if len(self._component_names) >= 2 * self._pred_cap:
+            self._compact_codes(self._pred_component, self._component_codes, self._component_names)
+        
+        idx = self._pred_n % self._pred_cap
+        self._pred_vid[idx] = self._intern(self._vehicle_codes, self._vehicle_names, vehicle_id)
+        self._pred_component[idx] = self._intern(self._component_codes, self._component_names, component)
+        self._pred_probability[idx] = probability
+        self._pred_epoch[idx] = datetime.fromisoformat(predicted_date).timestamp()
+        self._pred_logged[idx] = time.time()
+        self._pred_validated[idx] = False
+        self._pred_n += 1
+    
+    @property
+    def prediction_history(self) -> List[Dict[str, Any]]:
+        """
+        Logged predictions still in the buffer, oldest first.
+        
+        Built on access; dates come back as naive ISO timestamps and
+        probabilities at the buffer's float32 precision.
+        """
+        count = min(self._pred_n, self._pred_cap)
+        start = self._pred_n % self._pred_cap if self._pred_n > self._pred_cap else 0
+        return [
+            {
+                "vehicle_id": self._vehicle_names[self._pred_vid[idx]],
+                "component": self._component_names[self._pred_component[idx]],
+                "probability": float(self._pred_probability[idx]),
+                "predicted_date": datetime.fromtimestamp(self._pred_epoch[idx]).isoformat(),
+                "prediction_timestamp": datetime.fromtimestamp(self._pred_logged[idx]).isoformat(),
+                "validated": bool(self._pred_validated[idx])
+            }
+            for idx in ((start + i) % count for i in range(count))
+        ]
     
     def log_actual_failure(
         self,
@@ -125,39 +218,36 @@ class RCAInsights:
         Returns:
             Validation metrics
         """
-        validated_count = 0
-        true_positives = 0
-        false_positives = 0
+        count = min(self._pred_n, self._pred_cap)
+        vid = self._pred_vid[:count]
+        component = self._pred_component[:count]
+        validated = self._pred_validated[:count]
+        
+        # (vehicle, component) keys of failures that match a logged prediction
+        failure_keys = [
+            (self._vehicle_codes[f["vehicle_id"]] << 32) | self._component_codes[f["component"]]
+            for f in self.failure_history
+            if f["vehicle_id"] in self._vehicle_codes
+            and f["component"] in self._component_codes
+        ]
+        
+        pending = ~validated
+        matched = np.isin((vid << 32) | component, failure_keys)
+        
+        # Unmatched predictions count as misses once the predicted date has passed
+        expired = self._pred_epoch[:count] + self.VALIDATION_GRACE_SECONDS < datetime.now().timestamp()
         
-        for prediction in self.prediction_history:
-            if prediction["validated"]:
-                continue
-            
-            # Check if there's a matching failure
-            matching_failures = [
-                f for f in self.failure_history
-                if f["vehicle_id"] == prediction["vehicle_id"]
-                and f["component"] == prediction["component"]
-            ]
-            
-            if matching_failures:
-                true_positives += 1
-                prediction["validated"] = True
-            else:
-                # Check if prediction date has passed
-                pred_date = datetime.fromisoformat(prediction["predicted_date"])
-                if datetime.now() > pred_date + timedelta(days=7):
-                    false_positives += 1
-                    prediction["validated"] = True
-            
-            if prediction["validated"]:
-                validated_count += 1
+        hits = pending & matched
+        misses = pending & ~matched & expired
+        validated |= hits | misses
         
-        total_validated = validated_count
+        true_positives = int(hits.sum())
+        false_positives = int(misses.sum())
+        total_validated = true_positives + false_positives
         accuracy = true_positives / max(total_validated, 1)
         
         return {
-            "total_predictions": len(self.prediction_history),
+            "total_predictions": count,
             "validated_predictions": total_validated,
             "true_positives": true_positives,
             "false_positives": false_positives,
@@ -3,8 +3,10 @@ Main Scheduler for AuroraSync OS.
 Orchestrates intelligent appointment scheduling with load balancing and escalation.
 """
 
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Mapping, Optional
 from datetime import datetime
+from types import MappingProxyType
+from functools import lru_cache
 import logging
 
 from app.scheduling.workshop_manager import get_workshop_manager
@@ -15,6 +17,9 @@ from app.scheduling.escalation_engine import get_escalation_engine
 
 logger = logging.getLogger(__name__)
 
+# Slot searches per request before giving up on slots taken by other workers
+MAX_BOOKING_ATTEMPTS = 5
+
 
 class Scheduler:
     """
@@ -29,6 +34,11 @@ class Scheduler:
         self.demand_forecaster = get_demand_forecaster()
         self.escalation_engine = get_escalation_engine()
         self.booking_count = 0
+        
+        # Read-only response fragments that depend only on static inputs;
+        # every response gets its own copy
+        self._workshop_card = lru_cache(maxsize=64)(self._build_workshop_card)
+        self._safety_assessment = lru_cache(maxsize=64)(self._build_safety_assessment)
         logger.info("🗓️  Scheduler initialized")
     
     def schedule_appointment(
@@ -54,6 +64,70 @@ class Scheduler:
         Returns:
             Scheduling result with workshop, slot, and reasoning
         """
+        return self._schedule(
+            vehicle_id,
+            component,
+            risk_level,
+            probability,
+            owner_preferences,
+            vehicle_location,
+            datetime.now().isoformat()
+        )
+    
+    def schedule_appointments(self, requests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Schedule appointments for several vehicles in one call (fleet use).
+        
+        Requests are booked one after another in the given order, so each one
+        sees the load and bookings of the previous ones. Demand forecasts are
+        shared between requests for the same workshop, component and risk level,
+        and all results carry the same creation timestamp.
+        
+        Args:
+            requests: Scheduling requests, each with the keyword arguments of
+                schedule_appointment (vehicle_id, component, risk_level,
+                probability and optionally owner_preferences, vehicle_location)
+        
+        Returns:
+            Scheduling results, in request order
+        """
+        logger.info(f"Scheduling batch of {len(requests)} requests")
+        created_at = datetime.now().isoformat()
+        forecasts: Dict[tuple, Dict[str, Any]] = {}
+        
+        return [
+            self._schedule(
+                request["vehicle_id"],
+                request["component"],
+                request["risk_level"],
+                request["probability"],
+                request.get("owner_preferences"),
+                request.get("vehicle_location"),
+                created_at,
+                forecasts
+            )
+            for request in requests
+        ]
+    
+    def _schedule(
+        self,
+        vehicle_id: str,
+        component: str,
+        risk_level: str,
+        probability: float,
+        owner_preferences: Optional[Dict[str, Any]],
+        vehicle_location: Optional[str],
+        created_at: str,
+        forecasts: Optional[Dict[tuple, Dict[str, Any]]] = None
+    ) -> Dict[str, Any]:
+        """
+        Schedule a single appointment.
+        
+        Args:
+            created_at: Creation timestamp for the result
+            forecasts: Demand forecasts already computed in this batch, keyed by
+                (workshop_id, component, risk_level); filled in as a side effect
+        """
         self.booking_count += 1
         logger.info(
             f"Scheduling request #{self.booking_count}: {vehicle_id} - "
@@ -67,10 +141,10 @@ class Scheduler:
             probability
         )
         
-        is_emergency = escalation["severity"] in ["CRITICAL", "EMERGENCY"]
-        should_override = escalation["override_preferences"]
+        is_emergency = escalation.severity in ["CRITICAL", "EMERGENCY"]
+        should_override = escalation.override_preferences
         
-        logger.info(f"Escalation: {escalation['severity']} - {escalation['reasoning']}")
+        logger.info(f"Escalation: {escalation.severity} - {escalation.reasoning}")
         
         # Step 2: Find best workshop
         preferred_city = None
@@ -91,38 +165,49 @@ class Scheduler:
         
         logger.info(f"Selected workshop: {workshop_id} - {workshop_selection['reasoning']}")
         
-        # Step 3: Get demand forecast
-        demand_forecast = self.demand_forecaster.predict_optimal_slot(
-            workshop_id,
-            component,
-            risk_level
-        )
+        # Step 3: Get demand forecast (shared within a batch)
+        forecast_key = (workshop_id, component, risk_level)
+        demand_forecast = forecasts.get(forecast_key) if forecasts is not None else None
+        if demand_forecast is None:
+            demand_forecast = self.demand_forecaster.predict_optimal_slot(
+                workshop_id,
+                component,
+                risk_level
+            )
+            if forecasts is not None:
+                forecasts[forecast_key] = demand_forecast
         
-        # Step 4: Find optimal slot
-        slot = self.slot_manager.find_optimal_slot(
-            workshop_id,
-            workshop_data,
-            risk_level,
-            owner_preferences if not should_override else None,
-            is_emergency
-        )
+        # Step 4 + 5: Find the optimal slot and book it; if another worker took
+        # it in the meantime, the next search no longer offers it
+        booking = None
+        for _ in range(MAX_BOOKING_ATTEMPTS):
+            slot = self.slot_manager.find_optimal_slot(
+                workshop_id,
+                workshop_data,
+                risk_level,
+                owner_preferences if not should_override else None,
+                is_emergency
+            )
+            if not slot:
+                break
+            
+            slot_time = slot["slot_datetime"]
+            booking = self.slot_manager.book_slot(
+                workshop_id,
+                slot_time,
+                vehicle_id,
+                component
+            )
+            if booking is not None:
+                break
         
-        if not slot:
+        if booking is None:
             return {
                 "status": "error",
                 "error": "No available slots found",
                 "workshop_id": workshop_id
             }
         
-        # Step 5: Book the slot
-        slot_time = datetime.fromisoformat(slot["slot_time"])
-        booking = self.slot_manager.book_slot(
-            workshop_id,
-            slot_time,
-            vehicle_id,
-            component
-        )
-        
         # Step 6: Update workshop load
         load_delta = 0.1 if not is_emergency else 0.15
         self.workshop_manager.update_load(workshop_id, load_delta)
@@ -135,14 +220,7 @@ class Scheduler:
         return {
             "status": "success",
             "booking_id": booking["booking_id"],
-            "assigned_workshop": {
-                "id": workshop_id,
-                "name": workshop_data["name"],
-                "city": workshop_data["city"],
-                "address": f"{workshop_data['name']}, {workshop_data['city']}",
-                "phone": "+91-1800-XXX-XXXX",
-                "rating": workshop_data["rating"]
-            },
+            "assigned_workshop": dict(self._workshop_card(workshop_id)),
             "slot": {
                 "date": slot_time.strftime("%Y-%m-%d"),
                 "time": slot_time.strftime("%H:%M"),
@@ -151,29 +229,53 @@ class Scheduler:
                 "is_emergency": is_emergency,
                 "estimated_duration": 60
             },
-            "priority": escalation["severity"],
+            "priority": escalation.severity,
             "escalation": {
-                "severity": escalation["severity"],
-                "should_escalate": escalation["should_escalate"],
-                "recommended_timeframe": escalation["recommended_timeframe"],
-                "actions": escalation["actions"],
-                "escalation_id": escalation.get("escalation_id")
+                "severity": escalation.severity,
+                "should_escalate": escalation.should_escalate,
+                "recommended_timeframe": escalation.recommended_timeframe,
+                "actions": list(escalation.actions),
+                "escalation_id": escalation.escalation_id
             },
             "reasoning": {
                 "workshop_selection": workshop_selection["reasoning"],
-                "escalation": escalation["reasoning"],
+                "escalation": escalation.reasoning,
                 "demand_forecast": demand_forecast["reasoning"],
                 "slot_match_score": slot.get("match_score", 0)
             },
-            "safety_assessment": self.escalation_engine.check_safety_to_drive(
-                component,
-                probability,
-                escalation["severity"]
-            ),
-            "demand_forecast": demand_forecast,
+            "safety_assessment": dict(self._safety_assessment(component, escalation.severity)),
+            "demand_forecast": {
+                **demand_forecast,
+                "alternative_dates": list(demand_forecast["alternative_dates"])
+            },
             "preferences_honored": not should_override,
-            "created_at": datetime.now().isoformat()
+            "created_at": created_at
         }
+    
+    def _build_workshop_card(self, workshop_id: str) -> Mapping[str, Any]:
+        """Build the assigned-workshop summary (memoized per workshop)."""
+        workshop_data = self.workshop_manager.WORKSHOPS[workshop_id]
+        return MappingProxyType({
+            "id": workshop_id,
+            "name": workshop_data["name"],
+            "city": workshop_data["city"],
+            "address": f"{workshop_data['name']}, {workshop_data['city']}",
+            "phone": "+91-1800-XXX-XXXX",
+            "rating": workshop_data["rating"]
+        })
+    
+    def _build_safety_assessment(self, component: str, severity: str) -> Mapping[str, Any]:
+        """
+        Build the drive-safety assessment (memoized per component and severity).
+        
+        The assessment does not depend on the exact probability, only on the
+        severity derived from it.
+        """
+        return MappingProxyType(self.escalation_engine.check_safety_to_drive(
+            component,
+            0.0,
+            severity
+        ).to_dict())
 
 
 # Global scheduler instance
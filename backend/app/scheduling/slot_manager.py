@@ -3,23 +3,86 @@ Slot Manager for AuroraSync OS.
 Manages appointment slots across workshops with capacity and availability.
 """
 
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, FrozenSet, List, Optional, Tuple
 from datetime import datetime, timedelta
+from dataclasses import dataclass
+from functools import lru_cache
+import bisect
+import itertools
 import logging
 
+from app.scheduling.state_store import get_state_store
+from app.scheduling.workshop_manager import get_workshop_manager
+
 
 logger = logging.getLogger(__name__)
 
+# Process-wide booking sequence; next() on itertools.count is atomic under the GIL
+_booking_counter = itertools.count(1)
+
+# Slot type by hour of day: morning (<12), afternoon (12-17), evening (17+)
+SLOT_TYPE_LUT = tuple(
+    "morning" if hour < 12 else "afternoon" if hour < 17 else "evening"
+    for hour in range(24)
+)
+SLOT_TYPES = ("morning", "afternoon", "evening")
+SLOT_TYPE_INDEX = {slot_type: i for i, slot_type in enumerate(SLOT_TYPES)}
+
+# Day-preference bonuses; "today"/"tomorrow" match days_away, "weekend" the weekday
+DAY_PREFERENCE_BONUS = {"today": 40, "tomorrow": 20, "weekend": 25}
+
+
+@dataclass(slots=True)
+class Slot:
+    """A single bookable appointment slot."""
+    slot_time: datetime
+    slot_type: str
+    is_same_day: bool
+    is_emergency: bool
+    availability_score: float
+    workshop_id: str
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to a JSON-serializable dict."""
+        return {
+            "slot_time": self.slot_time.isoformat(),
+            "slot_type": self.slot_type,
+            "is_same_day": self.is_same_day,
+            "is_emergency": self.is_emergency,
+            "availability_score": self.availability_score,
+            "workshop_id": self.workshop_id,
+            "estimated_duration": 60,  # minutes
+            "technician_available": True
+        }
+
 
 class SlotManager:
     """
     Manages appointment slots for workshops.
     """
     
+    # Maximum number of materialized slot grids kept in memory
+    SLOT_CACHE_SIZE = 256
+    
     def __init__(self):
         """Initialize slot manager."""
-        # Booked slots (in production, this would be in database)
-        self.booked_slots: Dict[str, List[datetime]] = {}
+        # Booked slot start times as sorted POSIX timestamps (in production, this would be in database)
+        self.booked_slots: Dict[str, List[int]] = {}
+        
+        # Shared booking store when Redis is enabled (replaces booked_slots)
+        self._state_store = get_state_store()
+        self._workshop_manager = get_workshop_manager()
+        
+        # Per-workshop (emergency hours, [(hour, slot_type), ...]) built once from operating hours
+        self._skeleton_cache: Dict[str, Tuple[FrozenSet[int], List[Tuple[int, str]]]] = {}
+        self._workshop_data: Dict[str, Dict[str, Any]] = {}
+        
+        # Bumped on every booking so cached grids for that workshop go stale
+        self._booked_version: Dict[str, int] = {}
+        self._generate_slots_cached = lru_cache(maxsize=self.SLOT_CACHE_SIZE)(self._build_slots)
+        
+        # Owner-preference bonus tables keyed by (matched slot types, day preference)
+        self._pref_tables: Dict[Tuple[Tuple[bool, ...], str], Tuple] = {}
         logger.info("Slot Manager initialized")
     
     def generate_slots(
@@ -29,7 +92,7 @@ class SlotManager:
         start_date: datetime,
         days: int = 7,
         include_emergency: bool = False
-    ) -> List[Dict[str, Any]]:
+    ) -> List[Slot]:
         """
         Generate available slots for a workshop.
         
@@ -43,66 +106,117 @@ class SlotManager:
         Returns:
             List of available slots
         """
+        if workshop_id not in self._skeleton_cache:
+            self._skeleton_cache[workshop_id] = self._build_skeleton(workshop_id)
+            self._workshop_data[workshop_id] = workshop_data
+        
+        slots = self._generate_slots_cached(
+            workshop_id,
+            start_date.toordinal(),
+            days,
+            include_emergency,
+            self._get_booked_version(workshop_id),
+            datetime.now().toordinal()
+        )
+        return list(slots)
+    
+    def _get_booked_version(self, workshop_id: str) -> int:
+        """Get the booking version used to invalidate cached slot grids."""
+        if self._state_store is not None:
+            return self._state_store.get_booking_version(workshop_id)
+        return self._booked_version.get(workshop_id, 0)
+    
+    def _build_skeleton(
+        self,
+        workshop_id: str
+    ) -> Tuple[FrozenSet[int], List[Tuple[int, str]]]:
+        """Build the emergency hours and per-day (hour, slot_type) skeleton for a workshop."""
+        # Operating hours are pre-parsed by the WorkshopManager
+        start_hour, end_hour = self._workshop_manager.get_operating_hours(workshop_id)
+        
+        # The first two hours of the day are held for emergencies
+        emergency_hours = frozenset((start_hour, start_hour + 1))
+        skeleton = [(hour, SLOT_TYPE_LUT[hour]) for hour in range(start_hour, end_hour)]
+        
+        return emergency_hours, skeleton
+    
+    def _build_slots(
+        self,
+        workshop_id: str,
+        start_ordinal: int,
+        days: int,
+        include_emergency: bool,
+        booked_version: int,
+        today_ordinal: int
+    ) -> Tuple[Slot, ...]:
+        """
+        Materialize the slot grid for a workshop.
+        
+        Memoized through ``_generate_slots_cached``; ``booked_version`` only
+        takes part in the cache key.
+        """
         slots = []
         
-        # Parse operating hours
-        start_hour = int(workshop_data["operating_hours"]["start"].split(":")[0])
-        end_hour = int(workshop_data["operating_hours"]["end"].split(":")[0])
+        emergency_hours, skeleton = self._skeleton_cache[workshop_id]
+        workshop_data = self._workshop_data[workshop_id]
+        start_date = datetime.fromordinal(start_ordinal)
         
-        # Get booked slots for this workshop
-        booked = self.booked_slots.get(workshop_id, [])
+        # Get booked slots for this workshop; only those inside the window matter
+        window_start_ts = int(start_date.timestamp())
+        window_end_ts = int((start_date + timedelta(days=days)).timestamp())
+        if self._state_store is not None:
+            booked_count = self._state_store.count_bookings(workshop_id)
+            booked_in_window = set(
+                self._state_store.get_bookings(workshop_id, window_start_ts, window_end_ts)
+            )
+        else:
+            booked = self.booked_slots.get(workshop_id, [])
+            booked_count = len(booked)
+            window_start = bisect.bisect_left(booked, window_start_ts)
+            window_end = bisect.bisect_left(booked, window_end_ts)
+            booked_in_window = set(booked[window_start:window_end])
         
         # Generate slots for each day
         for day_offset in range(days):
             current_date = start_date + timedelta(days=day_offset)
+            day_ordinal = start_ordinal + day_offset
             
             # Skip if past date
-            if current_date.date() < datetime.now().date():
+            if day_ordinal < today_ordinal:
                 continue
             
+            # Check if same day (today)
+            is_same_day = day_ordinal == today_ordinal
+            
             # Generate hourly slots
-            for hour in range(start_hour, end_hour):
-                # Morning slots (8-12)
-                if start_hour <= hour < 12:
-                    slot_type = "morning"
-                # Afternoon slots (12-17)
-                elif 12 <= hour < 17:
-                    slot_type = "afternoon"
-                # Evening slots (17-20)
-                else:
-                    slot_type = "evening"
-                
-                slot_time = current_date.replace(hour=hour, minute=0, second=0, microsecond=0)
+            for hour, slot_type in skeleton:
+                slot_time = current_date.replace(hour=hour)
                 
                 # Check if slot is booked
-                if slot_time in booked:
+                if booked_in_window and int(slot_time.timestamp()) in booked_in_window:
                     continue
                 
-                # Check if same day (today)
-                is_same_day = slot_time.date() == datetime.now().date()
-                
                 # Check if emergency slot
-                is_emergency = include_emergency and hour in [start_hour, start_hour + 1]
+                is_emergency = include_emergency and hour in emergency_hours
                 
                 # Calculate availability score
                 availability_score = self._calculate_availability_score(
-                    slot_time,
+                    day_ordinal,
                     workshop_data,
-                    len(booked)
+                    booked_count,
+                    today_ordinal
                 )
                 
-                slots.append({
-                    "slot_time": slot_time.isoformat(),
-                    "slot_type": slot_type,
-                    "is_same_day": is_same_day,
-                    "is_emergency": is_emergency,
-                    "availability_score": availability_score,
-                    "workshop_id": workshop_id,
-                    "estimated_duration": 60,  # minutes
-                    "technician_available": True
-                })
-        
-        return slots
+                slots.append(Slot(
+                    slot_time=slot_time,
+                    slot_type=slot_type,
+                    is_same_day=is_same_day,
+                    is_emergency=is_emergency,
+                    availability_score=availability_score,
+                    workshop_id=workshop_id
+                ))
+        
+        return tuple(slots)
     
     def find_optimal_slot(
         self,
@@ -123,10 +237,11 @@ class SlotManager:
             is_emergency: Whether this is an emergency
         
         Returns:
-            Optimal slot or None
+            Optimal slot or None; ``slot_datetime`` holds the parsed slot time
         """
         # Generate slots
         start_date = datetime.now()
+        today_ordinal = start_date.toordinal()
         days = 1 if is_emergency else 7
         
         slots = self.generate_slots(
@@ -140,55 +255,98 @@ class SlotManager:
         if not slots:
             return None
         
-        # Filter and score slots
-        scored_slots = []
+        pref_table = None
+        if owner_preferences:
+            pref_table = self._get_pref_table(
+                owner_preferences.get("preferred_time", "").lower(),
+                owner_preferences.get("preferred_day", "").lower()
+            )
+        
+        # Score slots in a single pass, keeping the first best
+        best_slot = None
+        best_score = float("-inf")
         
         for slot in slots:
+            # A same-day emergency slot beats every later non-emergency slot of the
+            # day: the +50 emergency bonus outweighs the largest time-preference
+            # bonus (+30), and all other terms are equal within a day
+            if (
+                is_emergency
+                and best_slot is not None
+                and best_slot.is_same_day
+                and best_slot.is_emergency
+                and not slot.is_emergency
+            ):
+                break
+            
             score = 0.0
-            slot_time = datetime.fromisoformat(slot["slot_time"])
+            slot_time = slot.slot_time
+            days_away = slot_time.toordinal() - today_ordinal
             
             # Emergency priority
             if is_emergency:
-                if slot["is_same_day"]:
+                if slot.is_same_day:
                     score += 100
-                if slot["is_emergency"]:
+                if slot.is_emergency:
                     score += 50
             
             # Risk-based urgency
             if risk_level == "high":
                 # Prefer earlier slots
-                days_away = (slot_time.date() - datetime.now().date()).days
                 score += max(0, 50 - (days_away * 10))
             
             # Owner preferences
-            if owner_preferences:
-                pref_time = owner_preferences.get("preferred_time", "").lower()
-                pref_day = owner_preferences.get("preferred_day", "").lower()
-                
-                # Time preference
-                if pref_time and pref_time in slot["slot_type"]:
-                    score += 30
-                
-                # Day preference
-                if pref_day == "tomorrow" and days_away == 1:
-                    score += 20
-                elif pref_day == "today" and days_away == 0:
-                    score += 40
-                elif pref_day == "weekend" and slot_time.weekday() >= 5:
-                    score += 25
+            if pref_table is not None:
+                score += pref_table[SLOT_TYPE_INDEX[slot.slot_type]][slot_time.weekday()][min(days_away, 2)]
             
             # Availability score
-            score += slot["availability_score"] * 10
+            score += slot.availability_score * 10
             
-            scored_slots.append({
-                **slot,
-                "match_score": score
-            })
+            if score > best_score:
+                best_slot = slot
+                best_score = score
+        
+        return {
+            **best_slot.to_dict(),
+            "slot_datetime": best_slot.slot_time,
+            "match_score": best_score
+        }
+    
+    def _get_pref_table(self, pref_time: str, pref_day: str) -> Tuple:
+        """
+        Get the owner-preference bonus table for a preference pair.
         
-        # Sort by score
-        scored_slots.sort(key=lambda x: x["match_score"], reverse=True)
+        The table is indexed as ``[slot_type_index][weekday][min(days_away, 2)]``
+        and combines the time bonus (+30 when ``pref_time`` is part of the slot
+        type) with the day bonus for today (+40), tomorrow (+20) or weekend (+25).
+        """
+        # Key on what the preferences actually match so arbitrary input stays bounded
+        time_matches = tuple(bool(pref_time) and pref_time in slot_type for slot_type in SLOT_TYPES)
+        if pref_day not in DAY_PREFERENCE_BONUS:
+            pref_day = ""
+        
+        key = (time_matches, pref_day)
+        table = self._pref_tables.get(key)
+        if table is None:
+            day_bonus = DAY_PREFERENCE_BONUS.get(pref_day, 0)
+            table = tuple(
+                tuple(
+                    tuple(
+                        (30 if time_match else 0)
+                        + (day_bonus if (
+                            (pref_day == "today" and days_away == 0)
+                            or (pref_day == "tomorrow" and days_away == 1)
+                            or (pref_day == "weekend" and weekday >= 5)
+                        ) else 0)
+                        for days_away in range(3)
+                    )
+                    for weekday in range(7)
+                )
+                for time_match in time_matches
+            )
+            self._pref_tables[key] = table
         
-        return scored_slots[0] if scored_slots else None
+        return table
     
     def book_slot(
         self,
@@ -196,7 +354,7 @@ class SlotManager:
         slot_time: datetime,
         vehicle_id: str,
         service_type: str
-    ) -> Dict[str, Any]:
+    ) -> Optional[Dict[str, Any]]:
         """
         Book a slot.
         
@@ -207,15 +365,25 @@ class SlotManager:
             service_type: Service type
         
         Returns:
-            Booking confirmation
+            Booking confirmation, or None if the slot is already booked
+            (e.g. by another worker sharing the state store)
         """
-        # Add to booked slots
-        if workshop_id not in self.booked_slots:
-            self.booked_slots[workshop_id] = []
-        
-        self.booked_slots[workshop_id].append(slot_time)
+        # Add to booked slots, keeping them sorted and unique
+        ts = int(slot_time.timestamp())
+        if self._state_store is not None:
+            if not self._state_store.add_booking(workshop_id, ts):
+                logger.warning(f"Slot already booked at {workshop_id} on {slot_time}")
+                return None
+        else:
+            booked = self.booked_slots.setdefault(workshop_id, [])
+            pos = bisect.bisect_left(booked, ts)
+            if pos < len(booked) and booked[pos] == ts:
+                logger.warning(f"Slot already booked at {workshop_id} on {slot_time}")
+                return None
+            booked.insert(pos, ts)
+            self._booked_version[workshop_id] = self._booked_version.get(workshop_id, 0) + 1
         
-        booking_id = f"BOOK-{datetime.now().strftime('%Y%m%d%H%M%S')}"
+        booking_id = f"BOOK-{next(_booking_counter):06d}"
         
         logger.info(f"Booked slot: {booking_id} for {vehicle_id} at {workshop_id} on {slot_time}")
         
@@ -231,9 +399,10 @@ class SlotManager:
     
     def _calculate_availability_score(
         self,
-        slot_time: datetime,
+        slot_ordinal: int,
         workshop_data: Dict[str, Any],
-        booked_count: int
+        booked_count: int,
+        today_ordinal: int
     ) -> float:
         """Calculate availability score for a slot."""
         score = 1.0
@@ -244,7 +413,7 @@ class SlotManager:
             score *= 0.5
         
         # Prefer slots not too far in the future
-        days_away = (slot_time.date() - datetime.now().date()).days
+        days_away = slot_ordinal - today_ordinal
         if days_away > 3:
             score *= 0.8
         
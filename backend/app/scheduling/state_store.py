@@ -0,0 +1,154 @@
+"""
+Shared Scheduler State for AuroraSync OS.
+Keeps workshop load, emergency-slot usage and bookings in Redis so that
+multiple API workers make scheduling decisions against the same state.
+"""
+
+from typing import Dict, List, Optional
+import logging
+
+from app.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+class RedisStateStore:
+    """
+    Redis-backed scheduler state.
+    All writes are atomic (Lua scripts / ZADD NX) so concurrent workers never
+    over-allocate emergency slots or double-book a slot.
+    """
+    
+    # Redis keys
+    LOAD_KEY = "aurorasync:scheduler:load"
+    EMERGENCY_KEY = "aurorasync:scheduler:emergency_used"
+    BOOKING_VERSION_KEY = "aurorasync:scheduler:booking_version"
+    BOOKINGS_KEY = "aurorasync:scheduler:bookings:{workshop_id}"
+    
+    # Add delta to a workshop load, clamped to [0, 1]
+    INCR_LOAD_SCRIPT = """
+local load = tonumber(redis.call('HGET', KEYS[1], ARGV[1]) or '0') + tonumber(ARGV[2])
+if load < 0 then load = 0 elseif load > 1 then load = 1 end
+redis.call('HSET', KEYS[1], ARGV[1], load)
+return tostring(load)
+"""
+    
+    # Take an emergency slot if one is left; returns the new count or -1
+    USE_EMERGENCY_SCRIPT = """
+local used = tonumber(redis.call('HGET', KEYS[1], ARGV[1]) or '0')
+if used < tonumber(ARGV[2]) then
+    return redis.call('HINCRBY', KEYS[1], ARGV[1], 1)
+end
+return -1
+"""
+    
+    # Book a slot if it is free, bumping the workshop's booking version only
+    # then; returns 1 if booked, 0 if already booked
+    ADD_BOOKING_SCRIPT = """
+local added = redis.call('ZADD', KEYS[1], 'NX', ARGV[2], ARGV[2])
+if added == 1 then
+    redis.call('HINCRBY', KEYS[2], ARGV[1], 1)
+end
+return added
+"""
+    
+    def __init__(self, client):
+        """
+        Initialize Redis state store.
+        
+        Args:
+            client: Connected ``redis.Redis`` client
+        """
+        self.client = client
+        self._incr_load = client.register_script(self.INCR_LOAD_SCRIPT)
+        self._use_emergency = client.register_script(self.USE_EMERGENCY_SCRIPT)
+        self._add_booking = client.register_script(self.ADD_BOOKING_SCRIPT)
+        logger.info("Redis scheduler state store initialized")
+    
+    def incr_load(self, workshop_id: str, delta: float) -> float:
+        """Atomically add to a workshop's load; returns the new load."""
+        return float(self._incr_load(keys=[self.LOAD_KEY], args=[workshop_id, delta]))
+    
+    def get_loads(self) -> Dict[str, float]:
+        """Get current load for every workshop that has one."""
+        return {
+            ws_id.decode(): float(load)
+            for ws_id, load in self.client.hgetall(self.LOAD_KEY).items()
+        }
+    
+    def use_emergency(self, workshop_id: str, capacity: int) -> Optional[int]:
+        """Atomically take an emergency slot; returns the new used count or None if none left."""
+        used = int(self._use_emergency(keys=[self.EMERGENCY_KEY], args=[workshop_id, capacity]))
+        return used if used >= 0 else None
+    
+    def get_emergency_used(self) -> Dict[str, int]:
+        """Get emergency slots used today for every workshop that used one."""
+        return {
+            ws_id.decode(): int(used)
+            for ws_id, used in self.client.hgetall(self.EMERGENCY_KEY).items()
+        }
+    
+    def reset_emergency(self):
+        """Reset emergency slot usage for all workshops."""
+        self.client.delete(self.EMERGENCY_KEY)
+    
+    def add_booking(self, workshop_id: str, slot_ts: int) -> bool:
+        """Atomically record a booking; returns False if the slot was already booked."""
+        added = self._add_booking(
+            keys=[self.BOOKINGS_KEY.format(workshop_id=workshop_id), self.BOOKING_VERSION_KEY],
+            args=[workshop_id, slot_ts]
+        )
+        return bool(added)
+    
+    def get_bookings(self, workshop_id: str, start_ts: int, end_ts: int) -> List[int]:
+        """Get booked slot timestamps in [start_ts, end_ts)."""
+        return [
+            int(ts)
+            for ts in self.client.zrangebyscore(
+                self.BOOKINGS_KEY.format(workshop_id=workshop_id),
+                start_ts,
+                f"({end_ts}"
+            )
+        ]
+    
+    def count_bookings(self, workshop_id: str) -> int:
+        """Get the total number of bookings for a workshop."""
+        return self.client.zcard(self.BOOKINGS_KEY.format(workshop_id=workshop_id))
+    
+    def get_booking_version(self, workshop_id: str) -> int:
+        """Get the booking version (bumped on every new booking) for a workshop."""
+        return int(self.client.hget(self.BOOKING_VERSION_KEY, workshop_id) or 0)
+
+
+# Global state store instance
+_state_store = None
+_state_store_checked = False
+
+
+def get_state_store() -> Optional[RedisStateStore]:
+    """
+    Get singleton shared state store.
+    
+    Returns:
+        Redis state store, or None when scheduler state is kept in-process
+        (``SCHEDULER_STATE_BACKEND`` is not "redis" or Redis is unavailable)
+    """
+    global _state_store, _state_store_checked
+    if _state_store_checked:
+        return _state_store
+    _state_store_checked = True
+    
+    if settings.SCHEDULER_STATE_BACKEND != "redis":
+        return None
+    
+    try:
+        import redis
+        
+        client = redis.Redis.from_url(settings.REDIS_URL)
+        client.ping()
+        _state_store = RedisStateStore(client)
+    except Exception as e:
+        logger.warning(f"Redis scheduler state unavailable, using in-process state: {e}")
+    
+    return _state_store
@@ -3,13 +3,64 @@ Workshop Manager for AuroraSync OS.
 Manages multiple service centers with capacity, load, and availability.
 """
 
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Set, Tuple
 from datetime import datetime, timedelta
 import logging
+import time
+import numpy as np
+
+from app.scheduling.state_store import get_state_store
 
 
 logger = logging.getLogger(__name__)
 
+# Workshop selection reasoning for every (low load, high parts, excellent rating) combination
+_REASONING_LUT = {
+    (load, parts, rating): "Selected based on: " + ", ".join(
+        phrase
+        for flag, phrase in (
+            (load, "low current load"),
+            (parts, "high parts availability"),
+            (rating, "excellent rating")
+        )
+        if flag
+    )
+    for load in (False, True)
+    for parts in (False, True)
+    for rating in (False, True)
+}
+
+
+class WorkshopView:
+    """
+    Read-only view of a workshop with its live load and status.
+    Static fields are read straight from the workshop entry; the merged dict
+    is only materialized when serialized via to_dict().
+    """
+    
+    __slots__ = ("_manager", "_workshop_id")
+    
+    DYNAMIC_FIELDS = frozenset({"current_load", "load_percentage", "emergency_slots_available", "status"})
+    
+    def __init__(self, manager: "WorkshopManager", workshop_id: str):
+        self._manager = manager
+        self._workshop_id = workshop_id
+    
+    def __getitem__(self, key: str) -> Any:
+        if key in self.DYNAMIC_FIELDS:
+            return self._manager._dynamic_fields(self._workshop_id)[key]
+        return self._manager._public_data[self._workshop_id][key]
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Get the workshop details as a dict."""
+        return self._manager._materialize(self._workshop_id)
+
 
 class WorkshopManager:
     """
@@ -110,40 +161,132 @@ class WorkshopManager:
         }
     }
     
+    # How long local copies of shared (Redis) state are trusted, in seconds
+    STATE_REFRESH_SECONDS = 0.5
+    
     def __init__(self):
         """Initialize workshop manager."""
-        # Current load tracking (in production, this would be in Redis)
-        self.current_loads = {ws_id: 0.0 for ws_id in self.WORKSHOPS.keys()}
-        self.emergency_slots_used = {ws_id: 0 for ws_id in self.WORKSHOPS.keys()}
+        # (start hour, end hour) per workshop, parsed once so slot generation
+        # never touches the raw strings; WORKSHOPS itself stays pure config
+        self._operating_hours: Dict[str, Tuple[int, int]] = {
+            ws_id: (
+                int(ws["operating_hours"]["start"][:2]),
+                int(ws["operating_hours"]["end"][:2])
+            )
+            for ws_id, ws in self.WORKSHOPS.items()
+        }
+        
+        # Public view of each workshop (a copy of its WORKSHOPS entry)
+        self._public_data = {ws_id: dict(ws) for ws_id, ws in self.WORKSHOPS.items()}
+        
+        # Struct-of-arrays view of WORKSHOPS, one row per workshop
+        self._ws_ids = list(self.WORKSHOPS.keys())
+        self._idx = {ws_id: i for i, ws_id in enumerate(self._ws_ids)}
+        workshops = [self.WORKSHOPS[ws_id] for ws_id in self._ws_ids]
+        
+        self._ratings = np.array([ws["rating"] for ws in workshops], dtype=np.float64)
+        self._capacities = np.array([ws["technician_capacity"] for ws in workshops], dtype=np.float64)
+        self._emergency_caps = np.array([ws["emergency_slots_per_day"] for ws in workshops], dtype=np.int32)
+        # City names normalized once, so city matching never touches the raw strings
+        self._cities = np.array([ws["city"].lower() for ws in workshops])
+        self._city_set = set(self._cities.tolist())
+        
+        components = {
+            component
+            for ws in workshops
+            for component in (*ws["specializations"], *ws["parts_availability"])
+        }
+        self._parts = {
+            component: np.array(
+                [ws["parts_availability"].get(component, 0) for ws in workshops],
+                dtype=np.float64
+            )
+            for component in components
+        }
+        self._specialized = {
+            component: np.array([component in ws["specializations"] for ws in workshops])
+            for component in components
+        }
+        
+        # Load-independent score vectors and candidate order keyed by (component, city)
+        self._static_scores: Dict[Tuple[str, Optional[str]], Tuple[np.ndarray, List[int]]] = {}
+        
+        # Current load tracking; a local copy of the shared state when Redis is enabled
+        self.current_loads = np.zeros(len(workshops), dtype=np.float64)
+        self.emergency_slots_used = np.zeros(len(workshops), dtype=np.int32)
+        self._state_store = get_state_store()
+        self._state_synced_at = float("-inf")
+        
+        # Status per workshop, kept in sync by update_load
+        self._status = {ws_id: self._get_workshop_status(ws_id) for ws_id in self._ws_ids}
+        
+        # Lightweight per-workshop views; the merged dict is only built by
+        # to_dict() and reused until the workshop is marked dirty
+        self._views = {ws_id: WorkshopView(self, ws_id) for ws_id in self._ws_ids}
+        self._cached_view: Dict[str, Dict[str, Any]] = {}
+        self._dirty: Set[str] = set(self._ws_ids)
         logger.info(f"Workshop Manager initialized with {len(self.WORKSHOPS)} workshops")
     
-    def get_all_workshops(self) -> List[Dict[str, Any]]:
+    def _sync_shared_state(self):
+        """Refresh local load / emergency arrays from the shared store when stale."""
+        if self._state_store is None:
+            return
+        
+        now = time.monotonic()
+        if now - self._state_synced_at < self.STATE_REFRESH_SECONDS:
+            return
+        
+        loads = self._state_store.get_loads()
+        emergency_used = self._state_store.get_emergency_used()
+        for ws_id, idx in self._idx.items():
+            self.current_loads[idx] = loads.get(ws_id, 0.0)
+            self.emergency_slots_used[idx] = emergency_used.get(ws_id, 0)
+            self._status[ws_id] = self._get_workshop_status(ws_id)
+        
+        self._dirty.update(self._ws_ids)
+        self._state_synced_at = now
+    
+    def get_all_workshops(self) -> List["WorkshopView"]:
         """Get all workshops with current status."""
-        workshops = []
-        for ws_id, ws_data in self.WORKSHOPS.items():
-            workshops.append({
-                **ws_data,
-                "current_load": self.current_loads[ws_id],
-                "load_percentage": round(self.current_loads[ws_id] * 100, 1),
-                "emergency_slots_available": ws_data["emergency_slots_per_day"] - self.emergency_slots_used[ws_id],
-                "status": self._get_workshop_status(ws_id)
-            })
-        return workshops
+        self._sync_shared_state()
+        return [self._views[ws_id] for ws_id in self._ws_ids]
     
-    def get_workshop(self, workshop_id: str) -> Optional[Dict[str, Any]]:
+    def get_workshop(self, workshop_id: str) -> Optional["WorkshopView"]:
         """Get specific workshop details."""
-        if workshop_id not in self.WORKSHOPS:
-            return None
-        
-        ws_data = self.WORKSHOPS[workshop_id]
+        view = self._views.get(workshop_id)
+        if view is not None:
+            self._sync_shared_state()
+        return view
+    
+    def get_operating_hours(self, workshop_id: str) -> Tuple[int, int]:
+        """Get a workshop's opening and closing hour (closing hour exclusive)."""
+        return self._operating_hours[workshop_id]
+    
+    def _dynamic_fields(self, workshop_id: str) -> Dict[str, Any]:
+        """Get the current load and status fields of a workshop."""
+        idx = self._idx[workshop_id]
+        load = float(self.current_loads[idx])
         return {
-            **ws_data,
-            "current_load": self.current_loads[workshop_id],
-            "load_percentage": round(self.current_loads[workshop_id] * 100, 1),
-            "emergency_slots_available": ws_data["emergency_slots_per_day"] - self.emergency_slots_used[workshop_id],
-            "status": self._get_workshop_status(workshop_id)
+            "current_load": load,
+            "load_percentage": round(load * 100, 1),
+            "emergency_slots_available": int(self._emergency_caps[idx] - self.emergency_slots_used[idx]),
+            "status": self._status[workshop_id]
         }
     
+    def _materialize(self, workshop_id: str) -> Dict[str, Any]:
+        """
+        Get the full workshop details dict, rebuilt only when marked dirty.
+        
+        Callers get a shallow copy, so they cannot change the cached view.
+        """
+        if workshop_id in self._dirty:
+            self._cached_view[workshop_id] = {
+                **self._public_data[workshop_id],
+                **self._dynamic_fields(workshop_id)
+            }
+            self._dirty.discard(workshop_id)
+        return dict(self._cached_view[workshop_id])
+    
     def find_best_workshop(
         self,
         component: str,
@@ -163,110 +306,140 @@ class WorkshopManager:
         Returns:
             Best workshop with reasoning
         """
-        candidates = []
+        if component not in self._specialized:
+            return self._fallback_workshop()
         
-        for ws_id, ws_data in self.WORKSHOPS.items():
-            # Check if workshop handles this component
-            if component not in ws_data["specializations"]:
-                continue
+        self._sync_shared_state()
+        static_scores, order = self._get_static_scores(
+            component,
+            preferred_city.lower() if preferred_city else None
+        )
+        
+        # Streaming max over candidates in descending static-score order. Only the
+        # load term (0-30, lower load is better) changes at runtime, so once a
+        # candidate's static score + 30 falls below the best total, none of the
+        # remaining ones can win.
+        best = -1
+        best_score = -np.inf
+        for idx in order:
+            if static_scores[idx] + 30 < best_score:
+                break
             
-            # Check parts availability
-            parts_avail = ws_data["parts_availability"].get(component, 0)
-            if parts_avail < 0.5:
+            # Emergencies also need a free emergency slot
+            if is_emergency and self.emergency_slots_used[idx] >= self._emergency_caps[idx]:
                 continue
             
-            # Check emergency slot availability
-            if is_emergency:
-                emergency_avail = ws_data["emergency_slots_per_day"] - self.emergency_slots_used[ws_id]
-                if emergency_avail <= 0:
-                    continue
-            
-            # Calculate score
-            score = 0.0
-            
-            # Load factor (lower is better)
-            load_score = (1.0 - self.current_loads[ws_id]) * 30
-            score += load_score
-            
-            # Parts availability
-            parts_score = parts_avail * 25
-            score += parts_score
-            
-            # Rating
-            rating_score = (ws_data["rating"] / 5.0) * 20
-            score += rating_score
-            
-            # Capacity
-            capacity_score = (ws_data["technician_capacity"] / 10.0) * 15
-            score += capacity_score
-            
-            # City preference
-            if preferred_city and ws_data["city"].lower() == preferred_city.lower():
-                score += 10
-            
-            candidates.append({
-                "workshop_id": ws_id,
-                "workshop_data": ws_data,
-                "score": score,
-                "load_score": load_score,
-                "parts_score": parts_score,
-                "rating_score": rating_score
-            })
+            score = static_scores[idx] + (1.0 - self.current_loads[idx]) * 30
+            if score > best_score or (score == best_score and idx < best):
+                best = idx
+                best_score = score
         
-        if not candidates:
-            # Fallback to any workshop
-            ws_id = list(self.WORKSHOPS.keys())[0]
-            return {
-                "workshop_id": ws_id,
-                "workshop_data": self.WORKSHOPS[ws_id],
-                "score": 0,
-                "reasoning": "Fallback: No optimal workshop found, using default"
-            }
+        if best < 0:
+            return self._fallback_workshop()
         
-        # Sort by score
-        candidates.sort(key=lambda x: x["score"], reverse=True)
-        best = candidates[0]
+        # Reasoning from (low load, high parts availability, excellent rating) flags
+        reasoning = _REASONING_LUT[(
+            (1.0 - self.current_loads[best]) * 30 > 20,
+            self._parts[component][best] * 25 > 20,
+            (self._ratings[best] / 5.0) * 20 > 15
+        )]
         
-        # Generate reasoning
-        reasoning_parts = []
-        if best["load_score"] > 20:
-            reasoning_parts.append("low current load")
-        if best["parts_score"] > 20:
-            reasoning_parts.append("high parts availability")
-        if best["rating_score"] > 15:
-            reasoning_parts.append("excellent rating")
+        ws_id = self._ws_ids[best]
+        return {
+            "workshop_id": ws_id,
+            "workshop_data": self.WORKSHOPS[ws_id],
+            "score": float(best_score),
+            "reasoning": reasoning
+        }
+    
+    def _get_static_scores(
+        self,
+        component: str,
+        city_lc: Optional[str]
+    ) -> Tuple[np.ndarray, List[int]]:
+        """
+        Get the load-independent part of the workshop score.
         
-        reasoning = f"Selected based on: {', '.join(reasoning_parts)}"
+        Parts, rating, capacity and city bonus never change at runtime, so the
+        vector is computed once per (component, city). Workshops that cannot
+        service the component score -inf and are left out of the returned
+        candidate order (highest static score first).
+        """
+        if city_lc not in self._city_set:
+            city_lc = None
         
+        key = (component, city_lc)
+        cached = self._static_scores.get(key)
+        if cached is None:
+            parts_avail = self._parts[component]
+            static_scores = (
+                parts_avail * 25
+                + (self._ratings / 5.0) * 20
+                + (self._capacities / 10.0) * 15
+            )
+            if city_lc:
+                static_scores += (self._cities == city_lc) * 10
+            
+            # Workshop must handle the component and have parts in stock
+            eligible = self._specialized[component] & (parts_avail >= 0.5)
+            static_scores[~eligible] = -np.inf
+            
+            order = [
+                int(idx) for idx in np.argsort(-static_scores, kind="stable")
+                if eligible[idx]
+            ]
+            cached = self._static_scores[key] = (static_scores, order)
+        
+        return cached
+    
+    def _fallback_workshop(self) -> Dict[str, Any]:
+        """Fallback to any workshop when no candidate qualifies."""
+        ws_id = self._ws_ids[0]
         return {
-            "workshop_id": best["workshop_id"],
-            "workshop_data": best["workshop_data"],
-            "score": best["score"],
-            "reasoning": reasoning
+            "workshop_id": ws_id,
+            "workshop_data": self.WORKSHOPS[ws_id],
+            "score": 0,
+            "reasoning": "Fallback: No optimal workshop found, using default"
         }
     
     def update_load(self, workshop_id: str, load_delta: float):
         """Update workshop load."""
-        if workshop_id in self.current_loads:
-            self.current_loads[workshop_id] = max(0.0, min(1.0, self.current_loads[workshop_id] + load_delta))
-            logger.info(f"Updated load for {workshop_id}: {self.current_loads[workshop_id]:.2f}")
+        idx = self._idx.get(workshop_id)
+        if idx is not None:
+            if self._state_store is not None:
+                self.current_loads[idx] = self._state_store.incr_load(workshop_id, load_delta)
+            else:
+                self.current_loads[idx] = max(0.0, min(1.0, self.current_loads[idx] + load_delta))
+            self._status[workshop_id] = self._get_workshop_status(workshop_id)
+            self._dirty.add(workshop_id)
+            logger.info(f"Updated load for {workshop_id}: {self.current_loads[idx]:.2f}")
     
     def use_emergency_slot(self, workshop_id: str) -> bool:
         """Use an emergency slot."""
-        if workshop_id not in self.WORKSHOPS:
+        idx = self._idx.get(workshop_id)
+        if idx is None:
             return False
         
-        ws_data = self.WORKSHOPS[workshop_id]
-        if self.emergency_slots_used[workshop_id] < ws_data["emergency_slots_per_day"]:
-            self.emergency_slots_used[workshop_id] += 1
-            logger.info(f"Used emergency slot at {workshop_id}: {self.emergency_slots_used[workshop_id]}/{ws_data['emergency_slots_per_day']}")
+        if self._state_store is not None:
+            used = self._state_store.use_emergency(workshop_id, int(self._emergency_caps[idx]))
+            if used is None:
+                return False
+            self.emergency_slots_used[idx] = used
+            self._dirty.add(workshop_id)
+            logger.info(f"Used emergency slot at {workshop_id}: {used}/{self._emergency_caps[idx]}")
+            return True
+        
+        if self.emergency_slots_used[idx] < self._emergency_caps[idx]:
+            self.emergency_slots_used[idx] += 1
+            self._dirty.add(workshop_id)
+            logger.info(f"Used emergency slot at {workshop_id}: {self.emergency_slots_used[idx]}/{self._emergency_caps[idx]}")
             return True
         
         return False
     
     def _get_workshop_status(self, workshop_id: str) -> str:
         """Get workshop status based on load."""
-        load = self.current_loads[workshop_id]
+        load = self.current_loads[self._idx[workshop_id]]
         if load < 0.5:
             return "available"
         elif load < 0.8:
@@ -276,7 +449,10 @@ class WorkshopManager:
     
     def reset_daily_counters(self):
         """Reset daily counters (emergency slots, etc.)."""
-        self.emergency_slots_used = {ws_id: 0 for ws_id in self.WORKSHOPS.keys()}
+        if self._state_store is not None:
+            self._state_store.reset_emergency()
+        self.emergency_slots_used[:] = 0
+        self._dirty.update(self._ws_ids)
         logger.info("Reset daily workshop counters")
 
 
@@ -4,8 +4,8 @@ Conversational AI system for customer engagement via voice.
 """
 
 from app.voice_engine.voice_agent import VoiceAgent
-from app.voice_engine.tts_provider import TTSProvider, generate_tts
-from app.voice_engine.stt_provider import STTProvider, transcribe_audio
+from app.voice_engine.tts_provider import TTSProvider, TTSResult, generate_tts
+from app.voice_engine.stt_provider import STTProvider, TranscriptionResult, transcribe_audio
 from app.voice_engine.flow_manager import FlowManager
 from app.voice_engine.message_templates import MessageTemplates
 from app.voice_engine.conversation_scenarios import ConversationScenarios
@@ -13,8 +13,10 @@ from app.voice_engine.conversation_scenarios import ConversationScenarios
 __all__ = [
     "VoiceAgent",
     "TTSProvider",
+    "TTSResult",
     "generate_tts",
     "STTProvider",
+    "TranscriptionResult",
     "transcribe_audio",
     "FlowManager",
     "MessageTemplates",
@@ -3,8 +3,11 @@ Conversation Scenarios for Voice Agent.
 Defines conversation flows and branching logic.
 """
 
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Mapping, Optional, Tuple
+from types import MappingProxyType
 from enum import Enum
+import bisect
+import re
 
 
 class ScenarioType(Enum):
@@ -27,13 +30,275 @@ class ToneType(Enum):
     EMPATHETIC = "empathetic"
 
 
+class Intent(Enum):
+    """Enumeration of user response intents."""
+    CONFIRM = "confirm"
+    DECLINE = "decline"
+    SAFETY = "safety"
+    COST = "cost"
+    UNKNOWN = "unknown"
+
+
+# Intent keywords, highest priority first
+_INTENT_KEYWORDS: List[Tuple[Intent, List[str]]] = [
+    (Intent.CONFIRM, ["yes", "ok", "sure", "book"]),
+    (Intent.DECLINE, ["no", "not now", "later"]),
+    (Intent.SAFETY, ["safe", "drive", "risk"]),
+    (Intent.COST, ["cost", "price", "expensive"]),
+]
+
+# One named group per intent; the zero-width lookahead makes finditer see
+# overlapping keywords too ("nok" has both "no" and "ok")
+_INTENT_PATTERN = re.compile("(?=(?:{}))".format("|".join(
+    f"(?P<{intent.value}>{'|'.join(re.escape(word) for word in words)})"
+    for intent, words in _INTENT_KEYWORDS
+)))
+
+
+def normalize_response(user_response: str) -> str:
+    """Lowercase and trim a user response for keyword matching."""
+    return user_response.lower().strip()
+
+
+def classify_user_intent(response_lower: str) -> Intent:
+    """
+    Get the intent of a user response.
+    
+    A response containing keywords of several intents gets the highest-priority
+    one. Keywords match as substrings, in a single scan of the response.
+    
+    Args:
+        response_lower: User response passed through normalize_response
+    
+    Returns:
+        Detected intent, or Intent.UNKNOWN
+    """
+    best_rank = len(_INTENT_KEYWORDS) + 1
+    for match in _INTENT_PATTERN.finditer(response_lower):
+        rank = _INTENT_PATTERN.groupindex[match.lastgroup]
+        if rank < best_rank:
+            best_rank = rank
+            if rank == 1:
+                break
+    if best_rank > len(_INTENT_KEYWORDS):
+        return Intent.UNKNOWN
+    return _INTENT_KEYWORDS[best_rank - 1][0]
+
+
+def classify_user_intents(responses: List[str]) -> List[Intent]:
+    """
+    Get the intents of a batch of user responses (e.g. from parallel calls).
+    
+    Identical responses (after normalization) are classified only once, which
+    covers the short affirmatives and refusals that make up most turns.
+    
+    Args:
+        responses: User responses
+    
+    Returns:
+        Detected intents, in response order
+    """
+    seen: Dict[str, Intent] = {}
+    intents = []
+    for response in responses:
+        response_lower = normalize_response(response)
+        intent = seen.get(response_lower)
+        if intent is None:
+            intent = seen[response_lower] = classify_user_intent(response_lower)
+        intents.append(intent)
+    return intents
+
+
+def _read_only(table: Dict[str, Dict[str, Any]]) -> Dict[str, Mapping[str, Any]]:
+    """Wrap each entry of a lookup table in a read-only view so it can be shared."""
+    return {key: MappingProxyType(value) for key, value in table.items()}
+
+
+# Scenario configurations, built once and shared by all callers
+_SCENARIO_CONFIGS: Dict[str, Mapping[str, Any]] = _read_only({
+    "predicted_failure": {
+        "tone": "polite",
+        "max_turns": 5,
+        "requires_confirmation": True,
+        "fallback_scenarios": ["booking_recovery", "safety_check"],
+        "expected_responses": [
+            "yes", "no", "not now", "tell me more",
+            "is it safe", "how much", "when"
+        ],
+        "voice": "Aurora_Indian_Female",
+        "speaking_rate": 1.0,
+        "priority": "medium"
+    },
+    
+    "urgent_alert": {
+        "tone": "urgent",
+        "max_turns": 3,
+        "requires_confirmation": True,
+        "fallback_scenarios": ["safety_check"],
+        "expected_responses": ["yes", "no", "what should I do"],
+        "voice": "Aurora_Urgent_Alert",
+        "speaking_rate": 1.2,
+        "priority": "critical"
+    },
+    
+    "appointment_reminder": {
+        "tone": "friendly",
+        "max_turns": 3,
+        "requires_confirmation": True,
+        "fallback_scenarios": ["booking_recovery"],
+        "expected_responses": ["yes", "no", "reschedule", "cancel"],
+        "voice": "Aurora_Default",
+        "speaking_rate": 1.0,
+        "priority": "low"
+    },
+    
+    "booking_recovery": {
+        "tone": "empathetic",
+        "max_turns": 5,
+        "requires_confirmation": True,
+        "fallback_scenarios": ["cost_inquiry"],
+        "expected_responses": [
+            "morning", "afternoon", "evening", "weekend",
+            "next week", "not interested"
+        ],
+        "voice": "Aurora_Indian_Female",
+        "speaking_rate": 0.95,
+        "priority": "medium"
+    },
+    
+    "post_service_feedback": {
+        "tone": "friendly",
+        "max_turns": 4,
+        "requires_confirmation": False,
+        "fallback_scenarios": [],
+        "expected_responses": [
+            "1", "2", "3", "4", "5",
+            "satisfied", "not satisfied", "issue resolved"
+        ],
+        "voice": "Aurora_Default",
+        "speaking_rate": 1.0,
+        "priority": "low"
+    },
+    
+    "safety_check": {
+        "tone": "technical",
+        "max_turns": 2,
+        "requires_confirmation": False,
+        "fallback_scenarios": ["predicted_failure"],
+        "expected_responses": ["ok", "understood", "what next"],
+        "voice": "Aurora_Indian_Male",
+        "speaking_rate": 0.9,
+        "priority": "high"
+    },
+    
+    "cost_inquiry": {
+        "tone": "technical",
+        "max_turns": 3,
+        "requires_confirmation": False,
+        "fallback_scenarios": ["predicted_failure"],
+        "expected_responses": [
+            "ok", "too expensive", "any discount",
+            "payment options", "proceed"
+        ],
+        "voice": "Aurora_Indian_Male",
+        "speaking_rate": 0.95,
+        "priority": "medium"
+    }
+})
+
+# Scenarios whose delivery changes for high-risk predictions
+_HIGH_RISK_CONFIGS: Dict[str, Mapping[str, Any]] = _read_only({
+    "predicted_failure": {
+        **_SCENARIO_CONFIGS["predicted_failure"],
+        "tone": "urgent",
+        "speaking_rate": 1.1,
+        "priority": "high"
+    }
+})
+
+# Service timeframe by failure probability: below 0.3, 0.3-0.5, 0.5-0.8, 0.8 and above
+_TIMEFRAME_THRESHOLDS = (0.3, 0.5, 0.8)
+_TIMEFRAMES = ("2-4 weeks", "1-2 weeks", "3-7 days", "24-48 hours")
+
+# Repair cost estimates per component
+_COST_ESTIMATES: Dict[str, Mapping[str, Any]] = _read_only({
+    "brake_system": {
+        "cost_min": 3000,
+        "cost_max": 8000,
+        "parts_cost": 4000,
+        "labor_cost": 2000,
+        "diagnostic_cost": 500,
+        "savings": 15000,
+        "warranty_period": "6 months"
+    },
+    "engine": {
+        "cost_min": 10000,
+        "cost_max": 50000,
+        "parts_cost": 30000,
+        "labor_cost": 15000,
+        "diagnostic_cost": 1000,
+        "savings": 100000,
+        "warranty_period": "1 year"
+    },
+    "battery": {
+        "cost_min": 5000,
+        "cost_max": 15000,
+        "parts_cost": 8000,
+        "labor_cost": 2000,
+        "diagnostic_cost": 500,
+        "savings": 5000,
+        "warranty_period": "1 year"
+    },
+    "tyre": {
+        "cost_min": 4000,
+        "cost_max": 20000,
+        "parts_cost": 12000,
+        "labor_cost": 2000,
+        "diagnostic_cost": 500,
+        "savings": 10000,
+        "warranty_period": "6 months"
+    }
+})
+
+
+# Next action per (scenario, intent)
+_INTENT_TABLE: Dict[Tuple[str, Intent], Mapping[str, Any]] = {
+    ("predicted_failure", Intent.CONFIRM): MappingProxyType({
+        "action": "confirm_booking",
+        "next_scenario": None,
+        "message": "Great! I'll book that appointment for you."
+    }),
+    ("predicted_failure", Intent.DECLINE): MappingProxyType({
+        "action": "offer_alternatives",
+        "next_scenario": "booking_recovery",
+        "message": "I understand. Let me offer some alternative times."
+    }),
+    ("predicted_failure", Intent.SAFETY): MappingProxyType({
+        "action": "safety_info",
+        "next_scenario": "safety_check",
+        "message": "Let me explain the safety implications."
+    }),
+    ("predicted_failure", Intent.COST): MappingProxyType({
+        "action": "cost_info",
+        "next_scenario": "cost_inquiry",
+        "message": "Let me break down the estimated costs."
+    })
+}
+
+_DEFAULT_BRANCH: Mapping[str, Any] = MappingProxyType({
+    "action": "continue",
+    "next_scenario": None,
+    "message": "I understand. How can I help you further?"
+})
+
+
 class ConversationScenarios:
     """
     Manages conversation scenarios and their configurations.
     """
     
     @staticmethod
-    def get_scenario_config(scenario: str, risk_level: str = "medium") -> Dict[str, Any]:
+    def get_scenario_config(scenario: str, risk_level: str = "medium") -> Mapping[str, Any]:
         """
         Get configuration for a conversation scenario.
         
@@ -42,100 +307,13 @@ class ConversationScenarios:
             risk_level: Risk level (low, medium, high)
         
         Returns:
-            Scenario configuration
+            Scenario configuration (read-only, shared between calls)
         """
-        configs = {
-            "predicted_failure": {
-                "tone": "urgent" if risk_level == "high" else "polite",
-                "max_turns": 5,
-                "requires_confirmation": True,
-                "fallback_scenarios": ["booking_recovery", "safety_check"],
-                "expected_responses": [
-                    "yes", "no", "not now", "tell me more",
-                    "is it safe", "how much", "when"
-                ],
-                "voice": "Aurora_Indian_Female",
-                "speaking_rate": 1.0 if risk_level != "high" else 1.1,
-                "priority": "high" if risk_level == "high" else "medium"
-            },
-            
-            "urgent_alert": {
-                "tone": "urgent",
-                "max_turns": 3,
-                "requires_confirmation": True,
-                "fallback_scenarios": ["safety_check"],
-                "expected_responses": ["yes", "no", "what should I do"],
-                "voice": "Aurora_Urgent_Alert",
-                "speaking_rate": 1.2,
-                "priority": "critical"
-            },
-            
-            "appointment_reminder": {
-                "tone": "friendly",
-                "max_turns": 3,
-                "requires_confirmation": True,
-                "fallback_scenarios": ["booking_recovery"],
-                "expected_responses": ["yes", "no", "reschedule", "cancel"],
-                "voice": "Aurora_Default",
-                "speaking_rate": 1.0,
-                "priority": "low"
-            },
-            
-            "booking_recovery": {
-                "tone": "empathetic",
-                "max_turns": 5,
-                "requires_confirmation": True,
-                "fallback_scenarios": ["cost_inquiry"],
-                "expected_responses": [
-                    "morning", "afternoon", "evening", "weekend",
-                    "next week", "not interested"
-                ],
-                "voice": "Aurora_Indian_Female",
-                "speaking_rate": 0.95,
-                "priority": "medium"
-            },
-            
-            "post_service_feedback": {
-                "tone": "friendly",
-                "max_turns": 4,
-                "requires_confirmation": False,
-                "fallback_scenarios": [],
-                "expected_responses": [
-                    "1", "2", "3", "4", "5",
-                    "satisfied", "not satisfied", "issue resolved"
-                ],
-                "voice": "Aurora_Default",
-                "speaking_rate": 1.0,
-                "priority": "low"
-            },
-            
-            "safety_check": {
-                "tone": "technical",
-                "max_turns": 2,
-                "requires_confirmation": False,
-                "fallback_scenarios": ["predicted_failure"],
-                "expected_responses": ["ok", "understood", "what next"],
-                "voice": "Aurora_Indian_Male",
-                "speaking_rate": 0.9,
-                "priority": "high"
-            },
-            
-            "cost_inquiry": {
-                "tone": "technical",
-                "max_turns": 3,
-                "requires_confirmation": False,
-                "fallback_scenarios": ["predicted_failure"],
-                "expected_responses": [
-                    "ok", "too expensive", "any discount",
-                    "payment options", "proceed"
-                ],
-                "voice": "Aurora_Indian_Male",
-                "speaking_rate": 0.95,
-                "priority": "medium"
-            }
-        }
-        
-        return configs.get(scenario, configs["predicted_failure"])
+        if scenario not in _SCENARIO_CONFIGS:
+            scenario = "predicted_failure"
+        if risk_level == "high" and scenario in _HIGH_RISK_CONFIGS:
+            return _HIGH_RISK_CONFIGS[scenario]
+        return _SCENARIO_CONFIGS[scenario]
     
     @staticmethod
     def get_context_for_scenario(
@@ -197,61 +375,15 @@ class ConversationScenarios:
     @staticmethod
     def _get_timeframe(probability: float) -> str:
         """Get timeframe based on failure probability."""
-        if probability >= 0.8:
-            return "24-48 hours"
-        elif probability >= 0.5:
-            return "3-7 days"
-        elif probability >= 0.3:
-            return "1-2 weeks"
-        else:
-            return "2-4 weeks"
+        return _TIMEFRAMES[bisect.bisect_right(_TIMEFRAME_THRESHOLDS, probability)]
     
     @staticmethod
-    def _get_cost_estimate(component: str) -> Dict[str, Any]:
+    def _get_cost_estimate(component: str) -> Mapping[str, Any]:
         """Get cost estimate for a component."""
-        estimates = {
-            "brake_system": {
-                "cost_min": 3000,
-                "cost_max": 8000,
-                "parts_cost": 4000,
-                "labor_cost": 2000,
-                "diagnostic_cost": 500,
-                "savings": 15000,
-                "warranty_period": "6 months"
-            },
-            "engine": {
-                "cost_min": 10000,
-                "cost_max": 50000,
-                "parts_cost": 30000,
-                "labor_cost": 15000,
-                "diagnostic_cost": 1000,
-                "savings": 100000,
-                "warranty_period": "1 year"
-            },
-            "battery": {
-                "cost_min": 5000,
-                "cost_max": 15000,
-                "parts_cost": 8000,
-                "labor_cost": 2000,
-                "diagnostic_cost": 500,
-                "savings": 5000,
-                "warranty_period": "1 year"
-            },
-            "tyre": {
-                "cost_min": 4000,
-                "cost_max": 20000,
-                "parts_cost": 12000,
-                "labor_cost": 2000,
-                "diagnostic_cost": 500,
-                "savings": 10000,
-                "warranty_period": "6 months"
-            }
-        }
-        
-        return estimates.get(component, estimates["brake_system"])
+        return _COST_ESTIMATES.get(component, _COST_ESTIMATES["brake_system"])
     
     @staticmethod
-    def get_response_branches(scenario: str, user_response: str) -> Dict[str, Any]:
+    def get_response_branches(scenario: str, user_response: str) -> Mapping[str, Any]:
         """
         Get next action based on user response.
         
@@ -260,40 +392,9 @@ class ConversationScenarios:
             user_response: User's response (normalized)
         
         Returns:
-            Next action configuration
+            Next action configuration (read-only, shared between calls)
         """
-        response_lower = user_response.lower().strip()
-        
-        # Predicted failure responses
-        if scenario == "predicted_failure":
-            if any(word in response_lower for word in ["yes", "ok", "sure", "book"]):
-                return {
-                    "action": "confirm_booking",
-                    "next_scenario": None,
-                    "message": "Great! I'll book that appointment for you."
-                }
-            elif any(word in response_lower for word in ["no", "not now", "later"]):
-                return {
-                    "action": "offer_alternatives",
-                    "next_scenario": "booking_recovery",
-                    "message": "I understand. Let me offer some alternative times."
-                }
-            elif any(word in response_lower for word in ["safe", "drive"]):
-                return {
-                    "action": "safety_info",
-                    "next_scenario": "safety_check",
-                    "message": "Let me explain the safety implications."
-                }
-            elif any(word in response_lower for word in ["cost", "price", "expensive"]):
-                return {
-                    "action": "cost_info",
-                    "next_scenario": "cost_inquiry",
-                    "message": "Let me break down the estimated costs."
-                }
+        intent = classify_user_intent(normalize_response(user_response))
         
         # Default: continue conversation
-        return {
-            "action": "continue",
-            "next_scenario": None,
-            "message": "I understand. How can I help you further?"
-        }
+        return _INTENT_TABLE.get((scenario, intent), _DEFAULT_BRANCH)
@@ -0,0 +1,99 @@
+"""
+Shared Conversation Storage for Voice Agent.
+Keeps conversations in Redis so that multi-turn conversations can continue
+on any API worker, and expired ones are evicted by Redis itself.
+"""
+
+from typing import Dict, Any, Optional
+import json
+import logging
+
+from app.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+def _encode_default(obj: Any) -> Any:
+    """Serialize records (to_dict); anything else is rejected like json does."""
+    to_dict = getattr(obj, "to_dict", None)
+    if to_dict is None:
+        raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+    return to_dict()
+
+
+# Shared compact encoder; json.dumps with keyword arguments builds a new
+# encoder on every call
+_ENCODER = json.JSONEncoder(separators=(",", ":"), default=_encode_default)
+
+
+class RedisConversationStore:
+    """
+    Redis-backed conversation storage.
+    Each conversation is a JSON blob with a TTL matching its expiry, so no
+    cleanup scan is ever needed.
+    """
+    
+    # Redis key
+    CONVERSATION_KEY = "aurorasync:conversation:{conversation_id}"
+    
+    def __init__(self, client):
+        """
+        Initialize Redis conversation store.
+        
+        Args:
+            client: Connected ``redis.Redis`` client
+        """
+        self.client = client
+        logger.info("Redis conversation store initialized")
+    
+    def get(self, conversation_id: str) -> Optional[Dict[str, Any]]:
+        """Get a stored conversation record, or None if missing or expired."""
+        data = self.client.get(self.CONVERSATION_KEY.format(conversation_id=conversation_id))
+        return json.loads(data) if data is not None else None
+    
+    def save(self, conversation_id: str, record: Dict[str, Any], expires_ts: float):
+        """Store a conversation record that Redis evicts at expires_ts (POSIX seconds)."""
+        self.client.set(
+            self.CONVERSATION_KEY.format(conversation_id=conversation_id),
+            _ENCODER.encode(record),
+            exat=max(1, int(expires_ts))
+        )
+    
+    def delete(self, conversation_id: str):
+        """Delete a stored conversation."""
+        self.client.delete(self.CONVERSATION_KEY.format(conversation_id=conversation_id))
+
+
+# Global conversation store instance
+_conversation_store = None
+_conversation_store_checked = False
+
+
+def get_conversation_store() -> Optional[RedisConversationStore]:
+    """
+    Get singleton shared conversation store.
+    
+    Returns:
+        Redis conversation store, or None when conversations are kept
+        in-process (``CONVERSATION_STORE_BACKEND`` is not "redis" or Redis is
+        unavailable)
+    """
+    global _conversation_store, _conversation_store_checked
+    if _conversation_store_checked:
+        return _conversation_store
+    _conversation_store_checked = True
+    
+    if settings.CONVERSATION_STORE_BACKEND != "redis":
+        return None
+    
+    try:
+        import redis
+        
+        client = redis.Redis.from_url(settings.REDIS_URL)
+        client.ping()
+        _conversation_store = RedisConversationStore(client)
+    except Exception as e:
+        logger.warning(f"Redis conversation store unavailable, using in-process storage: {e}")
+    
+    return _conversation_store
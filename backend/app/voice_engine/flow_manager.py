@@ -3,14 +3,67 @@ Conversation Flow Manager for Voice Agent.
 Manages multi-turn conversations and state.
 """
 
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Mapping, Optional, Tuple
+from types import MappingProxyType
+from dataclasses import dataclass
 from datetime import datetime, timedelta
+import functools
+import heapq
 import logging
+import time
 from enum import Enum
 
+from app.voice_engine.conversation_scenarios import (
+    Intent,
+    classify_user_intent,
+    classify_user_intents,
+    normalize_response
+)
+from app.voice_engine.conversation_store import get_conversation_store
+
 
 logger = logging.getLogger(__name__)
 
+# Next action per user intent
+_NEXT_ACTIONS: Dict[Intent, Mapping[str, Any]] = {
+    Intent.CONFIRM: MappingProxyType({
+        "action": "confirm",
+        "next_scenario": None,
+        "message": "Proceeding with confirmation"
+    }),
+    Intent.DECLINE: MappingProxyType({
+        "action": "offer_alternatives",
+        "next_scenario": "booking_recovery",
+        "message": "Offering alternative options"
+    }),
+    Intent.SAFETY: MappingProxyType({
+        "action": "provide_safety_info",
+        "next_scenario": "safety_check",
+        "message": "Providing safety information"
+    }),
+    Intent.COST: MappingProxyType({
+        "action": "provide_cost_info",
+        "next_scenario": "cost_inquiry",
+        "message": "Providing cost information"
+    })
+}
+
+_CONTINUE_ACTION: Mapping[str, Any] = MappingProxyType({
+    "action": "continue",
+    "next_scenario": None,
+    "message": "Continuing conversation"
+})
+
+_END_ACTION: Mapping[str, Any] = MappingProxyType({
+    "action": "end",
+    "message": "Conversation ended"
+})
+
+_NOT_FOUND_ACTION: Mapping[str, Any] = MappingProxyType({
+    "action": "error",
+    "message": "Conversation not found"
+})
+
 
 class ConversationState(Enum):
     """Conversation states."""
@@ -22,6 +75,62 @@ class ConversationState(Enum):
     ABANDONED = "abandoned"
 
 
+# States in which a conversation does not continue
+_TERMINAL_STATES = frozenset({
+    ConversationState.COMPLETED,
+    ConversationState.FAILED,
+    ConversationState.ABANDONED
+})
+
+
+@dataclass(slots=True)
+class Turn:
+    """A single turn in a conversation."""
+    turn_number: int
+    speaker: str
+    message: str
+    audio_metadata: Optional[Dict[str, Any]]
+    intent: Optional[str]
+    timestamp: str
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to a JSON-serializable dict."""
+        return {
+            "turn_number": self.turn_number,
+            "speaker": self.speaker,
+            "message": self.message,
+            "audio_metadata": self.audio_metadata,
+            "intent": self.intent,
+            "timestamp": self.timestamp
+        }
+
+
+@dataclass(slots=True)
+class ConversationSummary:
+    """Summary of a conversation's progress and outcome."""
+    conversation_id: str
+    scenario: str
+    state: ConversationState
+    turn_count: int
+    started_at: str
+    updated_at: str
+    outcome: Optional[str]
+    summary: Optional[str]
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to a JSON-serializable dict."""
+        return {
+            "conversation_id": self.conversation_id,
+            "scenario": self.scenario,
+            "state": self.state.value,
+            "turn_count": self.turn_count,
+            "started_at": self.started_at,
+            "updated_at": self.updated_at,
+            "outcome": self.outcome,
+            "summary": self.summary
+        }
+
+
 class FlowManager:
     """
     Manages conversation flows and state.
@@ -31,22 +140,149 @@ class FlowManager:
     - State persistence
     - Branching logic
     - Timeout handling
+    
+    Conversations are stored column-wise: one dict per field, keyed by
+    conversation ID. State and expiry checks touch only the columns they
+    need; the full conversation dict is assembled on demand.
     """
     
     def __init__(self):
         """Initialize flow manager."""
         # In-memory conversation storage
         # In production, this would use Redis or a database
-        self.conversations: Dict[str, Dict[str, Any]] = {}
+        self._scenario: Dict[str, str] = {}
+        self._state: Dict[str, ConversationState] = {}
+        self._context: Dict[str, Dict[str, Any]] = {}
+        # Compact slotted turn records; serialized only when the conversation
+        # is assembled (get_conversation, or a write to the shared store)
+        self._turns: Dict[str, List[Turn]] = {}
+        self._turn_count: Dict[str, int] = {}
+        self._max_turns: Dict[str, int] = {}
+        self._started_at: Dict[str, str] = {}
+        self._updated_at: Dict[str, str] = {}
+        self._expires_iso: Dict[str, str] = {}
+        self._outcome: Dict[str, Dict[str, Any]] = {}
         self.conversation_timeout = timedelta(minutes=30)
+        
+        # Expiry deadline (POSIX seconds) per conversation, so expiry checks
+        # never re-parse the ISO "expires_at" strings
+        self._expires_at: Dict[str, float] = {}
+        
+        # Min-heap of (deadline, conversation_id); entries whose deadline no
+        # longer matches _expires_at (conversation restarted) are stale
+        self._deadlines: List[Tuple[float, str]] = []
+        
+        # Shared store (Redis) when configured; the columns above then act as
+        # a local copy refreshed on every access
+        self._store = get_conversation_store()
         logger.info("Flow Manager initialized")
     
+    @property
+    def conversations(self) -> Dict[str, Dict[str, Any]]:
+        """All conversations, assembled into their dict form."""
+        return {conv_id: self._assemble(conv_id) for conv_id in self._state}
+    
+    def _assemble(self, conversation_id: str) -> Dict[str, Any]:
+        """Build the conversation dict from the per-field columns."""
+        return {
+            "conversation_id": conversation_id,
+            "scenario": self._scenario[conversation_id],
+            "state": self._state[conversation_id].value,
+            "context": self._context[conversation_id],
+            "turns": [turn.to_dict() for turn in self._turns[conversation_id]],
+            "current_turn": self._turn_count[conversation_id],
+            "max_turns": self._max_turns[conversation_id],
+            "started_at": self._started_at[conversation_id],
+            "updated_at": self._updated_at[conversation_id],
+            "expires_at": self._expires_iso[conversation_id],
+            **self._outcome.get(conversation_id, {})
+        }
+    
+    def _refresh(self, conversation_id: str) -> bool:
+        """
+        Bring a conversation's local columns up to date with the shared store.
+        
+        Returns:
+            True if the conversation exists
+        """
+        if self._store is None:
+            return conversation_id in self._state
+        
+        record = self._store.get(conversation_id)
+        if record is None:
+            self._drop(conversation_id)
+            return False
+        
+        expires_ts = record["expires_ts"]
+        if self._expires_at.get(conversation_id) != expires_ts:
+            heapq.heappush(self._deadlines, (expires_ts, conversation_id))
+        
+        conversation = record["conversation"]
+        self._scenario[conversation_id] = conversation["scenario"]
+        self._state[conversation_id] = ConversationState(conversation["state"])
+        self._context[conversation_id] = conversation["context"]
+        self._turns[conversation_id] = [Turn(**turn) for turn in conversation["turns"]]
+        self._turn_count[conversation_id] = conversation["current_turn"]
+        self._max_turns[conversation_id] = conversation["max_turns"]
+        self._started_at[conversation_id] = conversation["started_at"]
+        self._updated_at[conversation_id] = conversation["updated_at"]
+        self._expires_iso[conversation_id] = conversation["expires_at"]
+        self._expires_at[conversation_id] = expires_ts
+        if "outcome" in conversation:
+            self._outcome[conversation_id] = {
+                "outcome": conversation["outcome"],
+                "summary": conversation["summary"],
+                "completed_at": conversation["completed_at"]
+            }
+        else:
+            self._outcome.pop(conversation_id, None)
+        return True
+    
+    def _persist(self, conversation_id: str) -> ConversationSummary:
+        """
+        Write a conversation through to the shared store; returns its summary.
+        
+        The full conversation dict is only assembled when there is a store to
+        write it to, so in-memory mutators stay O(1) in the number of turns.
+        """
+        if self._store is not None:
+            expires_ts = self._expires_at[conversation_id]
+            self._store.save(
+                conversation_id,
+                {"conversation": self._assemble(conversation_id), "expires_ts": expires_ts},
+                expires_ts
+            )
+        return self._summarize(conversation_id)
+    
+    def _summarize(self, conversation_id: str) -> ConversationSummary:
+        """Build the summary of a loaded conversation from the per-field columns."""
+        outcome = self._outcome.get(conversation_id, {})
+        return ConversationSummary(
+            conversation_id=conversation_id,
+            scenario=self._scenario[conversation_id],
+            state=self._state[conversation_id],
+            turn_count=self._turn_count[conversation_id],
+            started_at=self._started_at[conversation_id],
+            updated_at=self._updated_at[conversation_id],
+            outcome=outcome.get("outcome"),
+            summary=outcome.get("summary")
+        )
+    
+    def _drop(self, conversation_id: str):
+        """Remove a conversation from every column (no-op if it is not stored)."""
+        for column in (
+            self._scenario, self._state, self._context, self._turns,
+            self._turn_count, self._max_turns, self._started_at, self._updated_at,
+            self._expires_iso, self._expires_at, self._outcome
+        ):
+            column.pop(conversation_id, None)
+    
     def start_conversation(
         self,
         conversation_id: str,
         scenario: str,
         context: Dict[str, Any]
-    ) -> Dict[str, Any]:
+    ) -> ConversationSummary:
         """
         Start a new conversation.
         
@@ -56,25 +292,27 @@ class FlowManager:
             context: Initial context data
         
         Returns:
-            Conversation state
+            Conversation summary (use to_dict() to serialize)
         """
-        conversation = {
-            "conversation_id": conversation_id,
-            "scenario": scenario,
-            "state": ConversationState.INITIATED.value,
-            "context": context,
-            "turns": [],
-            "current_turn": 0,
-            "max_turns": context.get("max_turns", 5),
-            "started_at": datetime.utcnow().isoformat() + "Z",
-            "updated_at": datetime.utcnow().isoformat() + "Z",
-            "expires_at": (datetime.utcnow() + self.conversation_timeout).isoformat() + "Z"
-        }
-        
-        self.conversations[conversation_id] = conversation
-        logger.info(f"Started conversation: {conversation_id} (scenario: {scenario})")
-        
-        return conversation
+        now_ts = time.time()
+        expires_ts = now_ts + self.conversation_timeout.total_seconds()
+        started_at = datetime.utcfromtimestamp(now_ts).isoformat() + "Z"
+        
+        self._scenario[conversation_id] = scenario
+        self._state[conversation_id] = ConversationState.INITIATED
+        self._context[conversation_id] = context
+        self._turns[conversation_id] = []
+        self._turn_count[conversation_id] = 0
+        self._max_turns[conversation_id] = context.get("max_turns", 5)
+        self._started_at[conversation_id] = started_at
+        self._updated_at[conversation_id] = started_at
+        self._expires_iso[conversation_id] = datetime.utcfromtimestamp(expires_ts).isoformat() + "Z"
+        self._outcome.pop(conversation_id, None)
+        self._expires_at[conversation_id] = expires_ts
+        heapq.heappush(self._deadlines, (expires_ts, conversation_id))
+        logger.info("Started conversation: %s (scenario: %s)", conversation_id, scenario)
+        
+        return self._persist(conversation_id)
     
     def add_turn(
         self,
@@ -83,7 +321,7 @@ class FlowManager:
         message: str,
         audio_metadata: Optional[Dict[str, Any]] = None,
         intent: Optional[str] = None
-    ) -> Dict[str, Any]:
+    ) -> ConversationSummary:
         """
         Add a turn to the conversation.
         
@@ -95,38 +333,65 @@ class FlowManager:
             intent: Detected intent (optional)
         
         Returns:
-            Updated conversation state
+            Updated conversation summary (use to_dict() to serialize)
         """
-        if conversation_id not in self.conversations:
+        if not self._refresh(conversation_id):
             raise ValueError(f"Conversation not found: {conversation_id}")
         
-        conversation = self.conversations[conversation_id]
-        
-        turn = {
-            "turn_number": len(conversation["turns"]) + 1,
-            "speaker": speaker,
-            "message": message,
-            "audio_metadata": audio_metadata,
-            "intent": intent,
-            "timestamp": datetime.utcnow().isoformat() + "Z"
-        }
+        turn_number = self._turn_count[conversation_id] + 1
+        self._turn_count[conversation_id] = turn_number
+        now_iso = datetime.utcnow().isoformat() + "Z"
+        
+        turn = Turn(
+            turn_number=turn_number,
+            speaker=speaker,
+            message=message,
+            audio_metadata=audio_metadata,
+            intent=intent,
+            timestamp=now_iso
+        )
         
-        conversation["turns"].append(turn)
-        conversation["current_turn"] = len(conversation["turns"])
-        conversation["updated_at"] = datetime.utcnow().isoformat() + "Z"
+        self._turns[conversation_id].append(turn)
+        self._updated_at[conversation_id] = now_iso
         
         # Update state
         if speaker == "agent":
-            conversation["state"] = ConversationState.WAITING_RESPONSE.value
+            self._state[conversation_id] = ConversationState.WAITING_RESPONSE
         else:
-            conversation["state"] = ConversationState.IN_PROGRESS.value
+            self._state[conversation_id] = ConversationState.IN_PROGRESS
         
-        logger.info(
-            f"Added turn {turn['turn_number']} to conversation {conversation_id}: "
-            f"{speaker} - {message[:50]}..."
-        )
+        # Hot path: skip building the log arguments when INFO is disabled
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "Added turn %d to conversation %s: %s - %.50s...",
+                turn_number, conversation_id, speaker, message
+            )
         
-        return conversation
+        return self._persist(conversation_id)
+    
+    def set_turn_audio(
+        self,
+        conversation_id: str,
+        turn_number: int,
+        audio_metadata: Dict[str, Any]
+    ) -> ConversationSummary:
+        """
+        Attach audio to an existing turn (e.g. once batched synthesis is done).
+        
+        Args:
+            conversation_id: Conversation ID
+            turn_number: Turn number (1-based)
+            audio_metadata: Audio metadata
+        
+        Returns:
+            Updated conversation summary (use to_dict() to serialize)
+        """
+        if not self._refresh(conversation_id):
+            raise ValueError(f"Conversation not found: {conversation_id}")
+        
+        self._turns[conversation_id][turn_number - 1].audio_metadata = audio_metadata
+        
+        return self._persist(conversation_id)
     
     def get_conversation(self, conversation_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -138,13 +403,15 @@ class FlowManager:
         Returns:
             Conversation state or None
         """
-        return self.conversations.get(conversation_id)
+        if not self._refresh(conversation_id):
+            return None
+        return self._assemble(conversation_id)
     
     def update_context(
         self,
         conversation_id: str,
         context_updates: Dict[str, Any]
-    ) -> Dict[str, Any]:
+    ) -> ConversationSummary:
         """
         Update conversation context.
         
@@ -153,18 +420,17 @@ class FlowManager:
             context_updates: Context updates
         
         Returns:
-            Updated conversation state
+            Updated conversation summary (use to_dict() to serialize)
         """
-        if conversation_id not in self.conversations:
+        if not self._refresh(conversation_id):
             raise ValueError(f"Conversation not found: {conversation_id}")
         
-        conversation = self.conversations[conversation_id]
-        conversation["context"].update(context_updates)
-        conversation["updated_at"] = datetime.utcnow().isoformat() + "Z"
+        self._context[conversation_id].update(context_updates)
+        self._updated_at[conversation_id] = datetime.utcnow().isoformat() + "Z"
         
-        logger.info(f"Updated context for conversation {conversation_id}")
+        logger.info("Updated context for conversation %s", conversation_id)
         
-        return conversation
+        return self._persist(conversation_id)
     
     def should_continue(self, conversation_id: str) -> bool:
         """
@@ -176,28 +442,24 @@ class FlowManager:
         Returns:
             True if conversation should continue
         """
-        conversation = self.get_conversation(conversation_id)
-        
-        if not conversation:
+        if not self._refresh(conversation_id):
             return False
-        
+        return self._is_active(conversation_id)
+    
+    def _is_active(self, conversation_id: str) -> bool:
+        """Check turn limit, expiry and state of a loaded conversation."""
         # Check if max turns reached
-        if conversation["current_turn"] >= conversation["max_turns"]:
-            logger.info(f"Conversation {conversation_id} reached max turns")
+        if self._turn_count[conversation_id] >= self._max_turns[conversation_id]:
+            logger.info("Conversation %s reached max turns", conversation_id)
             return False
         
         # Check if expired
-        expires_at = datetime.fromisoformat(conversation["expires_at"].replace("Z", ""))
-        if datetime.utcnow() > expires_at:
-            logger.info(f"Conversation {conversation_id} expired")
+        if time.time() > self._expires_at[conversation_id]:
+            logger.info("Conversation %s expired", conversation_id)
             return False
         
         # Check state
-        if conversation["state"] in [
-            ConversationState.COMPLETED.value,
-            ConversationState.FAILED.value,
-            ConversationState.ABANDONED.value
-        ]:
+        if self._state[conversation_id] in _TERMINAL_STATES:
             return False
         
         return True
@@ -207,7 +469,7 @@ class FlowManager:
         conversation_id: str,
         outcome: str,
         summary: Optional[str] = None
-    ) -> Dict[str, Any]:
+    ) -> ConversationSummary:
         """
         Mark conversation as completed.
         
@@ -217,27 +479,29 @@ class FlowManager:
             summary: Optional summary
         
         Returns:
-            Final conversation state
+            Final conversation summary (use to_dict() to serialize)
         """
-        if conversation_id not in self.conversations:
+        if not self._refresh(conversation_id):
             raise ValueError(f"Conversation not found: {conversation_id}")
         
-        conversation = self.conversations[conversation_id]
-        conversation["state"] = ConversationState.COMPLETED.value
-        conversation["outcome"] = outcome
-        conversation["summary"] = summary
-        conversation["completed_at"] = datetime.utcnow().isoformat() + "Z"
-        conversation["updated_at"] = datetime.utcnow().isoformat() + "Z"
+        now_iso = datetime.utcnow().isoformat() + "Z"
+        self._state[conversation_id] = ConversationState.COMPLETED
+        self._outcome[conversation_id] = {
+            "outcome": outcome,
+            "summary": summary,
+            "completed_at": now_iso
+        }
+        self._updated_at[conversation_id] = now_iso
         
-        logger.info(f"Completed conversation {conversation_id}: {outcome}")
+        logger.info("Completed conversation %s: %s", conversation_id, outcome)
         
-        return conversation
+        return self._persist(conversation_id)
     
     def get_next_action(
         self,
         conversation_id: str,
         user_response: Optional[str] = None
-    ) -> Dict[str, Any]:
+    ) -> Mapping[str, Any]:
         """
         Determine next action based on conversation state.
         
@@ -246,90 +510,82 @@ class FlowManager:
             user_response: User's last response (optional)
         
         Returns:
-            Next action configuration
+            Next action configuration (read-only, shared between calls)
         """
-        conversation = self.get_conversation(conversation_id)
-        
-        if not conversation:
-            return {
-                "action": "error",
-                "message": "Conversation not found"
-            }
+        if not self._refresh(conversation_id):
+            return _NOT_FOUND_ACTION
         
         # Check if should continue
-        if not self.should_continue(conversation_id):
-            return {
-                "action": "end",
-                "message": "Conversation ended"
-            }
+        if not self._is_active(conversation_id):
+            return _END_ACTION
         
         # Analyze user response if provided
         if user_response:
-            response_lower = user_response.lower()
-            
-            # Positive responses
-            if any(word in response_lower for word in ["yes", "ok", "sure", "book"]):
-                return {
-                    "action": "confirm",
-                    "next_scenario": None,
-                    "message": "Proceeding with confirmation"
-                }
-            
-            # Negative responses
-            elif any(word in response_lower for word in ["no", "not now", "later"]):
-                return {
-                    "action": "offer_alternatives",
-                    "next_scenario": "booking_recovery",
-                    "message": "Offering alternative options"
-                }
-            
-            # Safety inquiry
-            elif any(word in response_lower for word in ["safe", "drive", "risk"]):
-                return {
-                    "action": "provide_safety_info",
-                    "next_scenario": "safety_check",
-                    "message": "Providing safety information"
-                }
-            
-            # Cost inquiry
-            elif any(word in response_lower for word in ["cost", "price", "expensive"]):
-                return {
-                    "action": "provide_cost_info",
-                    "next_scenario": "cost_inquiry",
-                    "message": "Providing cost information"
-                }
+            intent = classify_user_intent(normalize_response(user_response))
+            if intent in _NEXT_ACTIONS:
+                return _NEXT_ACTIONS[intent]
         
         # Default: continue conversation
-        return {
-            "action": "continue",
-            "next_scenario": None,
-            "message": "Continuing conversation"
-        }
+        return _CONTINUE_ACTION
+    
+    def get_next_actions(
+        self,
+        responses: List[Tuple[str, Optional[str]]]
+    ) -> List[Mapping[str, Any]]:
+        """
+        Determine next actions for several conversations at once.
+        
+        Args:
+            responses: (conversation_id, user_response) pairs
+        
+        Returns:
+            Next action configurations, in the order of responses
+        """
+        actions: List[Mapping[str, Any]] = []
+        pending: List[Tuple[int, str]] = []
+        for conversation_id, user_response in responses:
+            if not self._refresh(conversation_id):
+                actions.append(_NOT_FOUND_ACTION)
+            elif not self._is_active(conversation_id):
+                actions.append(_END_ACTION)
+            else:
+                actions.append(_CONTINUE_ACTION)
+                if user_response:
+                    pending.append((len(actions) - 1, user_response))
+        
+        # Classify all user responses in one batch
+        intents = classify_user_intents([user_response for _, user_response in pending])
+        for (position, _), intent in zip(pending, intents):
+            actions[position] = _NEXT_ACTIONS.get(intent, _CONTINUE_ACTION)
+        
+        return actions
     
     def cleanup_expired(self) -> int:
         """
         Clean up expired conversations.
         
+        With a shared store Redis evicts expired conversations itself; this
+        only drops local copies.
+        
         Returns:
             Number of conversations cleaned up
         """
-        now = datetime.utcnow()
-        expired = []
+        now_ts = time.time()
+        expired = 0
         
-        for conv_id, conversation in self.conversations.items():
-            expires_at = datetime.fromisoformat(conversation["expires_at"].replace("Z", ""))
-            if now > expires_at:
-                expired.append(conv_id)
-        
-        for conv_id in expired:
-            del self.conversations[conv_id]
+        # Only pop deadlines that have passed; live conversations are never visited
+        while self._deadlines and self._deadlines[0][0] < now_ts:
+            expires_ts, conv_id = heapq.heappop(self._deadlines)
+            if self._expires_at.get(conv_id) == expires_ts:
+                self._drop(conv_id)
+                expired += 1
         
         if expired:
-            logger.info(f"Cleaned up {len(expired)} expired conversations")
+            logger.info("Cleaned up %d expired conversations", expired)
         
-        return len(expired)
+        return expired
     
-    def get_conversation_summary(self, conversation_id: str) -> Dict[str, Any]:
+    def get_conversation_summary(self, conversation_id: str) -> Optional["ConversationSummary"]:
         """
         Get conversation summary.
         
@@ -337,32 +593,14 @@ class FlowManager:
             conversation_id: Conversation ID
         
         Returns:
-            Conversation summary
+            Conversation summary (use to_dict() to serialize) or None
         """
-        conversation = self.get_conversation(conversation_id)
-        
-        if not conversation:
-            return {"error": "Conversation not found"}
-        
-        return {
-            "conversation_id": conversation_id,
-            "scenario": conversation["scenario"],
-            "state": conversation["state"],
-            "turn_count": len(conversation["turns"]),
-            "started_at": conversation["started_at"],
-            "updated_at": conversation["updated_at"],
-            "outcome": conversation.get("outcome"),
-            "summary": conversation.get("summary")
-        }
-
-
-# Global flow manager instance
-_flow_manager = None
+        if not self._refresh(conversation_id):
+            return None
+        return self._summarize(conversation_id)
 
 
+@functools.cache
 def get_flow_manager() -> FlowManager:
-    """Get singleton flow manager instance."""
-    global _flow_manager
-    if _flow_manager is None:
-        _flow_manager = FlowManager()
-    return _flow_manager
+    """Get singleton flow manager instance (created on first call)."""
+    return FlowManager()
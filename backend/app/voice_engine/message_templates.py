@@ -3,8 +3,80 @@ Message Templates for Voice Conversations.
 Provides dynamic templates for different scenarios and tones.
 """
 
-from typing import Dict, Any
+from typing import Dict, Any, List, Mapping, Optional, Tuple
 from string import Template
+from functools import lru_cache
+
+
+class CompiledTemplate:
+    """
+    Drop-in for ``string.Template`` whose placeholders are parsed once.
+    
+    ``Template.safe_substitute`` runs its regex over the whole text on every
+    call; here the text is split into literal chunks and placeholder names at
+    construction, so rendering is a single join.
+    """
+    
+    __slots__ = ("template", "_literals", "_placeholders")
+    
+    def __init__(self, template: str):
+        """
+        Compile a template.
+        
+        Args:
+            template: Template text using ``$name`` / ``${name}`` placeholders
+        """
+        self.template = template
+        
+        literals: List[str] = []
+        placeholders: List[Tuple[str, str]] = []
+        chunk = []
+        pos = 0
+        for match in Template.pattern.finditer(template):
+            chunk.append(template[pos:match.start()])
+            name = match.group("named") or match.group("braced")
+            if name is not None:
+                literals.append("".join(chunk))
+                placeholders.append((name, match.group()))
+                chunk = []
+            elif match.group("escaped") is not None:
+                chunk.append(Template.delimiter)
+            else:
+                chunk.append(match.group())
+            pos = match.end()
+        chunk.append(template[pos:])
+        literals.append("".join(chunk))
+        
+        self._literals = tuple(literals)
+        self._placeholders = tuple(placeholders)
+    
+    @property
+    def names(self) -> Tuple[str, ...]:
+        """Placeholder names used by the template, in order of appearance."""
+        return tuple(dict.fromkeys(name for name, _ in self._placeholders))
+    
+    def safe_substitute(self, mapping: Mapping[str, Any]) -> str:
+        """
+        Render the template, leaving placeholders missing from mapping as-is.
+        
+        Args:
+            mapping: Placeholder values
+        
+        Returns:
+            Rendered text (same result as ``Template.safe_substitute``)
+        """
+        literals = self._literals
+        if not self._placeholders:
+            return literals[0]
+        
+        parts = [literals[0]]
+        for (name, raw), literal in zip(self._placeholders, literals[1:]):
+            try:
+                parts.append(str(mapping[name]))
+            except KeyError:
+                parts.append(raw)
+            parts.append(literal)
+        return "".join(parts)
 
 
 class MessageTemplates:
@@ -15,26 +87,26 @@ class MessageTemplates:
     
     # Predicted Failure Warning - Gentle Tone
     PREDICTED_FAILURE_GENTLE = {
-        "greeting": Template("🔮 Namaste ${owner_name}, this is Aurora - your vehicle's guardian angel and predictive maintenance wizard!"),
-        "issue": Template(
+        "greeting": CompiledTemplate("🔮 Namaste ${owner_name}, this is Aurora - your vehicle's guardian angel and predictive maintenance wizard!"),
+        "issue": CompiledTemplate(
             "We've detected some early signs of ${component} wear in your ${vehicle_model}. "
             "Our AI analysis shows a ${probability}% probability of potential issues developing "
             "within the next ${timeframe}."
         ),
-        "explanation": Template(
+        "explanation": CompiledTemplate(
             "This is based on continuous monitoring of your vehicle's telematics data. "
             "The good news is we caught this early, so we can prevent any major problems."
         ),
-        "recommendation": Template(
+        "recommendation": CompiledTemplate(
             "We recommend scheduling an inspection at your earliest convenience. "
             "This is a ${risk_level} priority situation, and addressing it now will help avoid "
             "more costly repairs later."
         ),
-        "offer": Template(
+        "offer": CompiledTemplate(
             "We've found an available slot at ${workshop_name} on ${recommended_slot}. "
             "Would this work for you?"
         ),
-        "closing": Template(
+        "closing": CompiledTemplate(
             "We're here to keep your vehicle running smoothly. "
             "Can I go ahead and book this appointment for you?"
         )
@@ -42,43 +114,43 @@ class MessageTemplates:
     
     # Predicted Failure Warning - Urgent Tone
     PREDICTED_FAILURE_URGENT = {
-        "greeting": Template("🚨 RED ALERT! ${owner_name}, this is Aurora with a critical message about your ${vehicle_model}."),
-        "issue": Template(
+        "greeting": CompiledTemplate("🚨 RED ALERT! ${owner_name}, this is Aurora with a critical message about your ${vehicle_model}."),
+        "issue": CompiledTemplate(
             "We've detected a critical ${component} issue that requires immediate attention. "
             "Our AI predicts a ${probability}% chance of failure within ${timeframe}."
         ),
-        "risk": Template(
+        "risk": CompiledTemplate(
             "This is a ${risk_level} priority alert. Continuing to drive may be unsafe and "
             "could lead to complete ${component} failure."
         ),
-        "recommendation": Template(
+        "recommendation": CompiledTemplate(
             "We strongly recommend you stop driving and schedule immediate service. "
             "Your safety is our top priority."
         ),
-        "offer": Template(
+        "offer": CompiledTemplate(
             "We have an emergency slot available at ${workshop_name} ${recommended_slot}. "
             "This is the earliest available appointment."
         ),
-        "closing": Template(
+        "closing": CompiledTemplate(
             "Shall I book this emergency service appointment for you right away?"
         )
     }
     
     # Appointment Reminder
     APPOINTMENT_REMINDER = {
-        "greeting": Template("⏰ Hi ${owner_name}! Aurora here - your friendly neighborhood reminder bot!"),
-        "reminder": Template(
+        "greeting": CompiledTemplate("⏰ Hi ${owner_name}! Aurora here - your friendly neighborhood reminder bot!"),
+        "reminder": CompiledTemplate(
             "Your ${vehicle_model} is scheduled for ${service_type} at ${workshop_name} "
             "on ${appointment_date} at ${appointment_time}."
         ),
-        "preparation": Template(
+        "preparation": CompiledTemplate(
             "The estimated service time is ${duration} minutes. "
             "Please bring your vehicle registration and any relevant documents."
         ),
-        "confirmation": Template(
+        "confirmation": CompiledTemplate(
             "Can you confirm you'll be able to make this appointment?"
         ),
-        "closing": Template(
+        "closing": CompiledTemplate(
             "Great! We'll see you ${appointment_date}. If anything changes, "
             "please call us at ${workshop_phone}."
         )
@@ -86,48 +158,48 @@ class MessageTemplates:
     
     # Declined Appointment Recovery
     BOOKING_RECOVERY = {
-        "greeting": Template("🎯 Hi ${owner_name}! Aurora again - I noticed the ${original_slot} didn't work out. No worries, life happens!"),
-        "empathy": Template(
+        "greeting": CompiledTemplate("🎯 Hi ${owner_name}! Aurora again - I noticed the ${original_slot} didn't work out. No worries, life happens!"),
+        "empathy": CompiledTemplate(
             "I completely understand scheduling can be challenging. "
             "Let me help you find a more convenient time."
         ),
-        "importance": Template(
+        "importance": CompiledTemplate(
             "Given the ${risk_level} priority of your ${component} issue, "
             "it's important we get this addressed within ${timeframe}."
         ),
-        "alternatives": Template(
+        "alternatives": CompiledTemplate(
             "I have several alternative slots available: "
             "${alternate_slots}. "
             "Would any of these work better for your schedule?"
         ),
-        "flexibility": Template(
+        "flexibility": CompiledTemplate(
             "We can also arrange for a pickup service if that would be more convenient. "
             "Or we can schedule an evening or weekend appointment."
         ),
-        "closing": Template(
+        "closing": CompiledTemplate(
             "What would work best for you? I'm here to make this as easy as possible."
         )
     }
     
     # Post-Service Feedback
     POST_SERVICE_FEEDBACK = {
-        "greeting": Template("⭐ Hello ${owner_name}! Aurora here, doing my quality check rounds!"),
-        "service_recap": Template(
+        "greeting": CompiledTemplate("⭐ Hello ${owner_name}! Aurora here, doing my quality check rounds!"),
+        "service_recap": CompiledTemplate(
             "Your ${vehicle_model} was serviced at ${workshop_name} on ${service_date} "
             "for ${service_type}."
         ),
-        "satisfaction": Template(
+        "satisfaction": CompiledTemplate(
             "On a scale of 1 to 5, how satisfied are you with the service you received?"
         ),
-        "issue_resolution": Template(
+        "issue_resolution": CompiledTemplate(
             "Has the ${component} issue been completely resolved? "
             "Are you experiencing any remaining concerns?"
         ),
-        "prediction_accuracy": Template(
+        "prediction_accuracy": CompiledTemplate(
             "Our AI predicted a ${component} issue, and the service confirmed ${actual_finding}. "
             "This helps us improve our prediction accuracy."
         ),
-        "closing": Template(
+        "closing": CompiledTemplate(
             "Thank you for your feedback. We're continuously improving our service. "
             "Is there anything else I can help you with today?"
         )
@@ -135,16 +207,16 @@ class MessageTemplates:
     
     # Safety Check Question
     SAFETY_CHECK = {
-        "question": Template("Is it safe to drive?"),
-        "low_risk": Template(
+        "question": CompiledTemplate("Is it safe to drive?"),
+        "low_risk": CompiledTemplate(
             "Based on our analysis, your vehicle is currently safe to drive for short distances. "
             "However, we recommend scheduling service within ${timeframe} to prevent the issue from worsening."
         ),
-        "medium_risk": Template(
+        "medium_risk": CompiledTemplate(
             "You can drive to the service center, but we recommend avoiding long trips or highway driving. "
             "The ${component} issue could worsen with extended use."
         ),
-        "high_risk": Template(
+        "high_risk": CompiledTemplate(
             "We strongly advise against driving. The ${component} failure risk is ${probability}%, "
             "which could lead to a breakdown or safety hazard. "
             "We recommend arranging a tow or pickup service."
@@ -153,36 +225,62 @@ class MessageTemplates:
     
     # Cost Inquiry
     COST_INQUIRY = {
-        "question": Template("How much will this cost?"),
-        "estimate": Template(
+        "question": CompiledTemplate("How much will this cost?"),
+        "estimate": CompiledTemplate(
             "Based on the ${component} issue, the estimated cost is between ${cost_min} and ${cost_max} rupees. "
             "This includes parts and labor."
         ),
-        "breakdown": Template(
+        "breakdown": CompiledTemplate(
             "The cost breakdown is: Parts ${parts_cost} rupees, Labor ${labor_cost} rupees, "
             "and diagnostic fee ${diagnostic_cost} rupees."
         ),
-        "savings": Template(
+        "savings": CompiledTemplate(
             "By addressing this now, you're saving approximately ${savings} rupees "
             "compared to waiting until complete failure."
         ),
-        "warranty": Template(
+        "warranty": CompiledTemplate(
             "All repairs come with a ${warranty_period} warranty. "
             "We also offer flexible payment options if needed."
         )
     }
     
-    # Alternate Slot Offer
-    ALTERNATE_SLOTS = {
-        "morning": Template("Tomorrow morning at 9 AM"),
-        "afternoon": Template("Tomorrow afternoon at 2 PM"),
-        "evening": Template("This evening at 6 PM"),
-        "weekend": Template("This Saturday at 10 AM"),
-        "next_week": Template("Next Monday at 11 AM")
+    # Alternate Slot Offer (fixed phrases, no placeholders)
+    ALTERNATE_SLOTS: Dict[str, str] = {
+        "morning": "Tomorrow morning at 9 AM",
+        "afternoon": "Tomorrow afternoon at 2 PM",
+        "evening": "This evening at 6 PM",
+        "weekend": "This Saturday at 10 AM",
+        "next_week": "Next Monday at 11 AM"
+    }
+    
+    # Templates by scenario and tone (built once, not per lookup)
+    _SCENARIO_MAP = {
+        "predicted_failure": {
+            "gentle": PREDICTED_FAILURE_GENTLE,
+            "urgent": PREDICTED_FAILURE_URGENT
+        },
+        "appointment_reminder": {
+            "gentle": APPOINTMENT_REMINDER,
+            "friendly": APPOINTMENT_REMINDER
+        },
+        "booking_recovery": {
+            "gentle": BOOKING_RECOVERY,
+            "friendly": BOOKING_RECOVERY
+        },
+        "post_service_feedback": {
+            "gentle": POST_SERVICE_FEEDBACK,
+            "friendly": POST_SERVICE_FEEDBACK
+        },
+        "safety_check": {
+            "technical": SAFETY_CHECK
+        },
+        "cost_inquiry": {
+            "technical": COST_INQUIRY
+        }
     }
     
     @classmethod
-    def get_template(cls, scenario: str, tone: str = "gentle") -> Dict[str, Template]:
+    def get_template(cls, scenario: str, tone: str = "gentle") -> Dict[str, CompiledTemplate]:
         """
         Get message template for a scenario.
         
@@ -193,36 +291,25 @@ class MessageTemplates:
         Returns:
             Dictionary of message templates
         """
-        scenario_map = {
-            "predicted_failure": {
-                "gentle": cls.PREDICTED_FAILURE_GENTLE,
-                "urgent": cls.PREDICTED_FAILURE_URGENT
-            },
-            "appointment_reminder": {
-                "gentle": cls.APPOINTMENT_REMINDER,
-                "friendly": cls.APPOINTMENT_REMINDER
-            },
-            "booking_recovery": {
-                "gentle": cls.BOOKING_RECOVERY,
-                "friendly": cls.BOOKING_RECOVERY
-            },
-            "post_service_feedback": {
-                "gentle": cls.POST_SERVICE_FEEDBACK,
-                "friendly": cls.POST_SERVICE_FEEDBACK
-            },
-            "safety_check": {
-                "technical": cls.SAFETY_CHECK
-            },
-            "cost_inquiry": {
-                "technical": cls.COST_INQUIRY
-            }
-        }
-        
-        scenario_templates = scenario_map.get(scenario, {})
+        scenario_templates = cls._SCENARIO_MAP.get(scenario, {})
         return scenario_templates.get(tone, scenario_templates.get("gentle", {}))
     
     @classmethod
-    def render_template(cls, template_dict: Dict[str, Template], context: Dict[str, Any]) -> Dict[str, str]:
+    def get_message_template(cls, scenario: str, tone: str = "gentle") -> CompiledTemplate:
+        """
+        Get all parts of a scenario's message as one template.
+        
+        Args:
+            scenario: Scenario name
+            tone: Tone to use
+        
+        Returns:
+            Space-joined template (shared, compiled once per scenario and tone)
+        """
+        return _joined_template(scenario, tone)
+    
+    @classmethod
+    def render_template(cls, template_dict: Dict[str, CompiledTemplate], context: Dict[str, Any]) -> Dict[str, str]:
         """
         Render templates with context data.
         
@@ -233,20 +320,27 @@ class MessageTemplates:
         Returns:
             Dictionary of rendered messages
         """
-        rendered = {}
-        for key, template in template_dict.items():
-            try:
-                rendered[key] = template.safe_substitute(context)
-            except Exception as e:
-                rendered[key] = f"[Template error: {e}]"
-        
-        return rendered
+        return {
+            key: cls._render_part(template, context)
+            for key, template in template_dict.items()
+        }
+    
+    @staticmethod
+    def _render_part(template: CompiledTemplate, context: Mapping[str, Any]) -> str:
+        """Render one template, reporting errors inline."""
+        try:
+            return template.safe_substitute(context)
+        except Exception as e:
+            return f"[Template error: {e}]"
     
     @classmethod
     def build_full_message(cls, scenario: str, tone: str, context: Dict[str, Any]) -> str:
         """
         Build a complete message from templates.
         
+        Messages are memoized on the values of the placeholders the scenario
+        actually uses, so repeat greetings and reminders are a cache hit.
+        
         Args:
             scenario: Scenario name
             tone: Tone to use
@@ -255,13 +349,59 @@ class MessageTemplates:
         Returns:
             Complete message string
         """
-        templates = cls.get_template(scenario, tone)
-        rendered = cls.render_template(templates, context)
-        
-        # Join all parts with appropriate spacing
-        message_parts = []
-        for key in templates.keys():
-            if key in rendered:
-                message_parts.append(rendered[key])
-        
-        return " ".join(message_parts)
+        try:
+            values = tuple(
+                str(value) if value is not _MISSING else None
+                for value in (context.get(name, _MISSING) for name in _message_placeholders(scenario, tone))
+            )
+        except Exception:
+            # Unprintable context value: render uncached to report the template error
+            return cls._build_full_message(scenario, tone, context)
+        return _build_cached(scenario, tone, values)
+    
+    @classmethod
+    def _build_full_message(cls, scenario: str, tone: str, context: Dict[str, Any]) -> str:
+        """Render all parts of a message in one pass (uncached)."""
+        try:
+            return _joined_template(scenario, tone).safe_substitute(context)
+        except Exception:
+            # Render part by part so only the failing part reports the error
+            return " ".join(
+                cls._render_part(template, context)
+                for template in cls.get_template(scenario, tone).values()
+            )
+    
+    @staticmethod
+    def clear_cache():
+        """Clear memoized messages (e.g. after editing templates at runtime)."""
+        _build_cached.cache_clear()
+        _message_placeholders.cache_clear()
+        _joined_template.cache_clear()
+
+
+# Marks placeholders missing from the context
+_MISSING = object()
+
+
+@lru_cache(maxsize=64)
+def _joined_template(scenario: str, tone: str) -> CompiledTemplate:
+    """Get all parts of a scenario's message as one space-joined template."""
+    templates = MessageTemplates.get_template(scenario, tone)
+    return CompiledTemplate(" ".join(template.template for template in templates.values()))
+
+
+@lru_cache(maxsize=64)
+def _message_placeholders(scenario: str, tone: str) -> Tuple[str, ...]:
+    """Get the placeholder names used by a scenario's templates."""
+    return _joined_template(scenario, tone).names
+
+
+@lru_cache(maxsize=1024)
+def _build_cached(scenario: str, tone: str, values: Tuple[Optional[str], ...]) -> str:
+    """Build a message from placeholder values (None for missing ones)."""
+    context = {
+        name: value
+        for name, value in zip(_message_placeholders(scenario, tone), values)
+        if value is not None
+    }
+    return MessageTemplates._build_full_message(scenario, tone, context)
@@ -3,14 +3,184 @@ Speech-to-Text (STT) Provider for AuroraSync OS.
 Mock implementation for demo purposes.
 """
 
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Pattern, Tuple
 import logging
-from datetime import datetime
+import re
+import threading
+from dataclasses import dataclass
+from functools import lru_cache
+
+from app.voice_engine.timestamps import now_iso
 
 
 logger = logging.getLogger(__name__)
 
 
+def _compile_keywords(groups: List[Tuple[str, List[str]]]) -> Pattern:
+    """
+    Compile keyword groups into one pattern with a named group per entry.
+    
+    The zero-width lookahead lets finditer report overlapping keywords, and at
+    any position the earliest-listed group that matches wins.
+    """
+    return re.compile("(?=(?:{}))".format("|".join(
+        f"(?P<{name}>{'|'.join(re.escape(word) for word in words)})"
+        for name, words in groups
+    )))
+
+
+def _first_group(pattern: Pattern, text: str) -> Optional[str]:
+    """Get the earliest-listed group with a keyword anywhere in text, or None."""
+    best_name = None
+    best_rank = len(pattern.groupindex) + 1
+    for match in pattern.finditer(text):
+        rank = pattern.groupindex[match.lastgroup]
+        if rank < best_rank:
+            best_name, best_rank = match.lastgroup, rank
+            if rank == 1:
+                break
+    return best_name
+
+
+# Simple keyword-based intents, in priority order
+_INTENT_KEYWORDS: List[Tuple[str, List[str]]] = [
+    ("confirm", ["yes", "yeah", "sure", "okay", "ok", "definitely", "book"]),
+    ("decline", ["no", "nope", "not now", "maybe later", "not interested"]),
+    ("safety_inquiry", ["safe", "drive", "dangerous", "risk"]),
+    ("cost_inquiry", ["cost", "price", "expensive", "how much"]),
+    ("reschedule", ["reschedule", "different time", "another day", "change"]),
+    ("time_preference", ["morning", "afternoon", "evening", "weekend"]),
+    ("satisfaction", ["satisfied", "happy", "good", "excellent"]),
+    ("dissatisfaction", ["not satisfied", "unhappy", "poor", "bad"]),
+]
+
+# Entity keywords, in priority order within each entity
+_ENTITY_KEYWORDS: List[Tuple[str, List[str]]] = [
+    ("morning", ["morning"]),
+    ("afternoon", ["afternoon"]),
+    ("evening", ["evening"]),
+    ("level_5", ["very satisfied", "excellent"]),
+    ("level_4", ["satisfied", "good"]),
+    ("level_3", ["okay", "fine"]),
+]
+
+# Entity and value for each entity keyword group
+_ENTITY_VALUES: Dict[str, Tuple[str, Any]] = {
+    "morning": ("time_preference", "morning"),
+    "afternoon": ("time_preference", "afternoon"),
+    "evening": ("time_preference", "evening"),
+    "level_5": ("satisfaction_level", 5),
+    "level_4": ("satisfaction_level", 4),
+    "level_3": ("satisfaction_level", 3),
+}
+
+# Mock transcriptions for common responses
+_MOCK_TRANSCRIPTIONS: Dict[str, List[str]] = {
+    "yes": ["yes", "yeah", "sure", "okay", "ok", "definitely", "absolutely"],
+    "no": ["no", "nope", "not now", "maybe later", "not interested"],
+    "safety": ["is it safe to drive", "can I drive", "is it dangerous", "should I stop driving"],
+    "cost": ["how much will it cost", "what's the price", "cost estimate", "how expensive"],
+    "reschedule": ["can we reschedule", "different time", "another day", "not available"],
+    "morning": ["morning works", "morning is good", "9 am", "10 am"],
+    "afternoon": ["afternoon works", "afternoon is good", "2 pm", "3 pm"],
+    "evening": ["evening works", "evening is good", "6 pm", "7 pm"],
+    "satisfied": ["very satisfied", "satisfied", "happy with service", "good service"],
+    "not_satisfied": ["not satisfied", "unhappy", "poor service", "disappointed"]
+}
+
+# Mock transcriptions returned in turn, with their word counts and
+# simulated durations (~0.5 seconds per word)
+_MOCK_RESPONSES: Tuple[Tuple[str, int, float], ...] = tuple(
+    (text, len(text.split()), round(len(text.split()) * 0.5, 2))
+    for text in (
+        "Yes, please book the appointment",
+        "Is it safe to drive?",
+        "How much will this cost?",
+        "Can we reschedule for tomorrow?",
+        "I'm very satisfied with the service",
+        "No, not right now",
+        "Morning works better for me",
+        "What are my options?",
+        "Okay, go ahead",
+        "Tell me more about the issue"
+    )
+)
+
+# Simulated confidence scores, cycled by transcription count
+_MOCK_CONFIDENCES: Tuple[float, ...] = tuple(round(0.85 + i * 0.01, 2) for i in range(10))
+
+# Each keyword table is matched in a single scan of the text
+_INTENT_PATTERN = _compile_keywords(_INTENT_KEYWORDS)
+_ENTITY_PATTERN = _compile_keywords(_ENTITY_KEYWORDS)
+
+# Intent of a reply that is exactly one keyword ("yes", "no", "ok", ...),
+# resolved at import so the most common replies skip the scan
+_KEYWORD_INTENTS: Dict[str, str] = {
+    word: _first_group(_INTENT_PATTERN, word)
+    for _, words in _INTENT_KEYWORDS
+    for word in words
+}
+
+
+def _entity_items(text_lower: str) -> Tuple[Tuple[str, Any], ...]:
+    """Get (entity, value) pairs found in lowercased text, in entity order."""
+    # Keep the highest-priority keyword group per entity
+    best_groups: Dict[str, str] = {}
+    for match in _ENTITY_PATTERN.finditer(text_lower):
+        group = match.lastgroup
+        entity = _ENTITY_VALUES[group][0]
+        best = best_groups.get(entity)
+        if best is None or _ENTITY_PATTERN.groupindex[group] < _ENTITY_PATTERN.groupindex[best]:
+            best_groups[entity] = group
+    
+    return tuple(
+        _ENTITY_VALUES[group]
+        for group in sorted(best_groups.values(), key=_ENTITY_PATTERN.groupindex.get)
+    )
+
+
+@lru_cache(maxsize=1024)
+def _analyze_text(text_lower: str) -> Tuple[str, float, Tuple[Tuple[str, Any], ...]]:
+    """
+    Get (intent, confidence, entity pairs) for lowercased text.
+    
+    Memoized: voice replies repeat heavily, so most turns skip matching.
+    """
+    detected_intent = _KEYWORD_INTENTS.get(text_lower)
+    if detected_intent is None:
+        detected_intent = _first_group(_INTENT_PATTERN, text_lower)
+    if detected_intent is None:
+        return "unknown", 0.5, _entity_items(text_lower)
+    return detected_intent, 0.85, _entity_items(text_lower)
+
+
+@dataclass(slots=True, frozen=True)
+class TranscriptionResult:
+    """Transcribed text and its metadata."""
+    text: str
+    confidence: float
+    language: str
+    duration: float
+    word_count: int
+    transcribed_at: str
+    model: str
+    is_mock: bool = True
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to a JSON-serializable dict."""
+        return {
+            "text": self.text,
+            "confidence": self.confidence,
+            "language": self.language,
+            "language_detected": self.language,
+            "duration": self.duration,
+            "word_count": self.word_count,
+            "transcribed_at": self.transcribed_at,
+            "model": self.model,
+            "is_mock": self.is_mock
+        }
+
+
 class STTProvider:
     """
     Speech-to-Text provider for transcribing audio.
@@ -24,19 +194,8 @@ class STTProvider:
     - AssemblyAI
     """
     
-    # Mock transcriptions for common responses
-    MOCK_TRANSCRIPTIONS = {
-        "yes": ["yes", "yeah", "sure", "okay", "ok", "definitely", "absolutely"],
-        "no": ["no", "nope", "not now", "maybe later", "not interested"],
-        "safety": ["is it safe to drive", "can I drive", "is it dangerous", "should I stop driving"],
-        "cost": ["how much will it cost", "what's the price", "cost estimate", "how expensive"],
-        "reschedule": ["can we reschedule", "different time", "another day", "not available"],
-        "morning": ["morning works", "morning is good", "9 am", "10 am"],
-        "afternoon": ["afternoon works", "afternoon is good", "2 pm", "3 pm"],
-        "evening": ["evening works", "evening is good", "6 pm", "7 pm"],
-        "satisfied": ["very satisfied", "satisfied", "happy with service", "good service"],
-        "not_satisfied": ["not satisfied", "unhappy", "poor service", "disappointed"]
-    }
+    # Mock transcriptions (module constant, kept on the class for callers)
+    MOCK_TRANSCRIPTIONS = _MOCK_TRANSCRIPTIONS
     
     def __init__(self):
         """Initialize STT provider."""
@@ -48,7 +207,7 @@ class STTProvider:
         audio_file: Any,
         language: str = "en-IN",
         model: str = "default"
-    ) -> Dict[str, Any]:
+    ) -> TranscriptionResult:
         """
         Transcribe audio file to text.
         
@@ -58,7 +217,7 @@ class STTProvider:
             model: Model to use for transcription
         
         Returns:
-            Dictionary with transcription results:
+            Transcription result (use to_dict() to serialize):
                 - text: Transcribed text
                 - confidence: Confidence score (0.0 to 1.0)
                 - language: Detected language
@@ -66,51 +225,77 @@ class STTProvider:
                 - words: Word-level timestamps (optional)
         """
         self.transcription_count += 1
+        response = self._mock_transcription(self.transcription_count, language, model, now_iso())
         
-        # For demo, return mock transcription based on count
-        mock_responses = [
-            "Yes, please book the appointment",
-            "Is it safe to drive?",
-            "How much will this cost?",
-            "Can we reschedule for tomorrow?",
-            "I'm very satisfied with the service",
-            "No, not right now",
-            "Morning works better for me",
-            "What are my options?",
-            "Okay, go ahead",
-            "Tell me more about the issue"
-        ]
+        logger.info(
+            "Transcribed audio #%d: '%s' (confidence: %.2f)",
+            self.transcription_count, response.text, response.confidence
+        )
         
-        # Cycle through mock responses
-        text = mock_responses[self.transcription_count % len(mock_responses)]
+        return response
+    
+    def transcribe_batch(
+        self,
+        audio_files: List[Any],
+        language: str = "en-IN",
+        model: str = "default"
+    ) -> List[TranscriptionResult]:
+        """
+        Transcribe several audio files in one call.
         
-        # Simulate confidence score
-        confidence = 0.85 + (self.transcription_count % 10) * 0.01
+        The batch shares one timestamp and one log line (in production, one
+        request to the STT service's batch endpoint).
         
-        # Simulate duration
-        duration = len(text.split()) * 0.5  # ~0.5 seconds per word
+        Args:
+            audio_files: Audio files
+            language: Language code (default: en-IN for Indian English)
+            model: Model to use for transcription
         
-        response = {
-            "text": text,
-            "confidence": round(confidence, 2),
-            "language": language,
-            "language_detected": language,
-            "duration": round(duration, 2),
-            "word_count": len(text.split()),
-            "transcribed_at": datetime.utcnow().isoformat() + "Z",
-            "model": model,
-            "is_mock": True
-        }
+        Returns:
+            Transcription results, in audio_files order
+        """
+        first = self.transcription_count + 1
+        self.transcription_count += len(audio_files)
+        transcribed_at = now_iso()
         
-        logger.info(f"Transcribed audio #{self.transcription_count}: '{text}' (confidence: {confidence:.2f})")
+        results = [
+            self._mock_transcription(count, language, model, transcribed_at)
+            for count in range(first, self.transcription_count + 1)
+        ]
         
-        return response
+        logger.info("Transcribed %d audio files (#%d-#%d)", len(results), first, self.transcription_count)
+        
+        return results
+    
+    def _mock_transcription(
+        self,
+        count: int,
+        language: str,
+        model: str,
+        transcribed_at: str
+    ) -> TranscriptionResult:
+        """Build the mock transcription for the count-th audio."""
+        # For demo, cycle through mock responses based on count
+        text, word_count, duration = _MOCK_RESPONSES[count % len(_MOCK_RESPONSES)]
+        
+        # Simulate confidence score
+        confidence = _MOCK_CONFIDENCES[count % len(_MOCK_CONFIDENCES)]
+        
+        return TranscriptionResult(
+            text=text,
+            confidence=confidence,
+            language=language,
+            duration=duration,
+            word_count=word_count,
+            transcribed_at=transcribed_at,
+            model=model
+        )
     
     def transcribe_audio_stream(
         self,
         audio_stream: Any,
         language: str = "en-IN"
-    ) -> Dict[str, Any]:
+    ) -> TranscriptionResult:
         """
         Transcribe streaming audio (real-time).
         
@@ -134,70 +319,32 @@ class STTProvider:
         Returns:
             Intent detection results
         """
-        text_lower = text.lower()
-        
-        # Simple keyword-based intent detection
-        intents = {
-            "confirm": ["yes", "yeah", "sure", "okay", "ok", "definitely", "book"],
-            "decline": ["no", "nope", "not now", "maybe later", "not interested"],
-            "safety_inquiry": ["safe", "drive", "dangerous", "risk"],
-            "cost_inquiry": ["cost", "price", "expensive", "how much"],
-            "reschedule": ["reschedule", "different time", "another day", "change"],
-            "time_preference": ["morning", "afternoon", "evening", "weekend"],
-            "satisfaction": ["satisfied", "happy", "good", "excellent"],
-            "dissatisfaction": ["not satisfied", "unhappy", "poor", "bad"]
-        }
-        
-        detected_intent = "unknown"
-        confidence = 0.5
-        
-        for intent, keywords in intents.items():
-            if any(keyword in text_lower for keyword in keywords):
-                detected_intent = intent
-                confidence = 0.85
-                break
+        detected_intent, confidence, entities = _analyze_text(text.lower())
         
         return {
             "intent": detected_intent,
             "confidence": confidence,
             "text": text,
-            "entities": self._extract_entities(text)
+            "entities": dict(entities)
         }
     
     def _extract_entities(self, text: str) -> Dict[str, Any]:
         """Extract entities from text (mock implementation)."""
-        entities = {}
-        
-        text_lower = text.lower()
-        
-        # Extract time preferences
-        if "morning" in text_lower:
-            entities["time_preference"] = "morning"
-        elif "afternoon" in text_lower:
-            entities["time_preference"] = "afternoon"
-        elif "evening" in text_lower:
-            entities["time_preference"] = "evening"
-        
-        # Extract satisfaction level
-        if any(word in text_lower for word in ["very satisfied", "excellent"]):
-            entities["satisfaction_level"] = 5
-        elif any(word in text_lower for word in ["satisfied", "good"]):
-            entities["satisfaction_level"] = 4
-        elif any(word in text_lower for word in ["okay", "fine"]):
-            entities["satisfaction_level"] = 3
-        
-        return entities
+        return dict(_analyze_text(text.lower())[2])
 
 
 # Global STT provider instance
 _stt_provider = None
+_stt_provider_lock = threading.Lock()
 
 
 def get_stt_provider() -> STTProvider:
-    """Get singleton STT provider instance."""
+    """Get singleton STT provider instance (safe to call from any thread)."""
     global _stt_provider
     if _stt_provider is None:
-        _stt_provider = STTProvider()
+        with _stt_provider_lock:
+            if _stt_provider is None:
+                _stt_provider = STTProvider()
     return _stt_provider
 
 
@@ -205,7 +352,7 @@ def transcribe_audio(
     audio_file: Any,
     language: str = "en-IN",
     model: str = "default"
-) -> Dict[str, Any]:
+) -> TranscriptionResult:
     """
     Convenience function to transcribe audio.
     
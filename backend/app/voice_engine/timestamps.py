@@ -0,0 +1,29 @@
+"""
+Timestamp helpers for the Voice Engine.
+Mock providers stamp every response; formatting a datetime per call costs
+more than the rest of the mock work, so stamps are cached per second.
+"""
+
+from typing import Tuple
+from datetime import datetime
+import time
+
+
+# (epoch second, formatted stamp) of the last call
+_stamp_cache: Tuple[int, str] = (-1, "")
+
+
+def now_iso() -> str:
+    """
+    Get the current UTC time as an ISO 8601 string with a "Z" suffix.
+    
+    Second resolution; the string is formatted once per second.
+    
+    Returns:
+        Timestamp such as "2024-01-15T10:30:00Z"
+    """
+    global _stamp_cache
+    second = int(time.time())
+    if second != _stamp_cache[0]:
+        _stamp_cache = (second, datetime.utcfromtimestamp(second).isoformat() + "Z")
+    return _stamp_cache[1]
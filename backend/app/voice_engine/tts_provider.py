@@ -3,16 +3,108 @@ Text-to-Speech (TTS) Provider for AuroraSync OS.
 Mock implementation for demo purposes.
 """
 
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterator, List, Optional
 import hashlib
 import base64
-from datetime import datetime
+from collections import OrderedDict
+from dataclasses import dataclass
 import logging
+import re
+import threading
+
+from app.config import settings
+from app.voice_engine.timestamps import now_iso
 
 
 logger = logging.getLogger(__name__)
 
 
+# Available voices
+_VOICES: Dict[str, Dict[str, str]] = {
+    "Aurora_Default": {
+        "name": "Aurora Default",
+        "language": "en-IN",
+        "gender": "female",
+        "description": "Standard female voice with Indian English accent"
+    },
+    "Aurora_Indian_Female": {
+        "name": "Aurora Indian Female",
+        "language": "hi-IN",
+        "gender": "female",
+        "description": "Warm, empathetic female voice"
+    },
+    "Aurora_Indian_Male": {
+        "name": "Aurora Indian Male",
+        "language": "hi-IN",
+        "gender": "male",
+        "description": "Professional male voice for technical information"
+    },
+    "Aurora_Urgent_Alert": {
+        "name": "Aurora Urgent Alert",
+        "language": "en-IN",
+        "gender": "female",
+        "description": "Urgent but calm voice for critical alerts"
+    }
+}
+
+# Base64 of the mock audio marker; its 15 bytes encode without padding, so
+# the (hex, hence base64-safe) audio ID can be appended as-is
+_MOCK_AUDIO_PREFIX_B64 = base64.b64encode(b"MOCK_TTS_AUDIO:").decode('ascii')
+
+# Sample encoding per output sample rate: 16-bit PCM, except 8 kHz
+# telephony audio, which is 8-bit G.711 mu-law (half the bytes)
+_CODECS: Dict[int, str] = {
+    8000: "mulaw",
+    16000: "pcm_s16le",
+    24000: "pcm_s16le"
+}
+
+# Whitespace following sentence-ending punctuation
+_SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+")
+
+
+@dataclass(slots=True, frozen=True)
+class TTSResult:
+    """Generated speech audio and its metadata (shared via the audio cache, so frozen)."""
+    voice: str
+    voice_info: Dict[str, str]
+    text: str
+    text_length: int
+    word_count: int
+    audio_url: str
+    audio_base64: str
+    audio_id: str
+    duration: float
+    format: str
+    sample_rate: int
+    codec: str
+    speaking_rate: float
+    pitch: float
+    generated_at: str
+    is_mock: bool = True
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to a JSON-serializable dict."""
+        return {
+            "voice": self.voice,
+            "voice_info": self.voice_info,
+            "text": self.text,
+            "text_length": self.text_length,
+            "word_count": self.word_count,
+            "audio_url": self.audio_url,
+            "audio_base64": self.audio_base64,
+            "audio_id": self.audio_id,
+            "duration": self.duration,
+            "format": self.format,
+            "sample_rate": self.sample_rate,
+            "codec": self.codec,
+            "speaking_rate": self.speaking_rate,
+            "pitch": self.pitch,
+            "generated_at": self.generated_at,
+            "is_mock": self.is_mock
+        }
+
+
 class TTSProvider:
     """
     Text-to-Speech provider with multiple voice options.
@@ -26,37 +118,25 @@ class TTSProvider:
     - Coqui TTS
     """
     
-    # Available voices
-    VOICES = {
-        "Aurora_Default": {
-            "name": "Aurora Default",
-            "language": "en-IN",
-            "gender": "female",
-            "description": "Standard female voice with Indian English accent"
-        },
-        "Aurora_Indian_Female": {
-            "name": "Aurora Indian Female",
-            "language": "hi-IN",
-            "gender": "female",
-            "description": "Warm, empathetic female voice"
-        },
-        "Aurora_Indian_Male": {
-            "name": "Aurora Indian Male",
-            "language": "hi-IN",
-            "gender": "male",
-            "description": "Professional male voice for technical information"
-        },
-        "Aurora_Urgent_Alert": {
-            "name": "Aurora Urgent Alert",
-            "language": "en-IN",
-            "gender": "female",
-            "description": "Urgent but calm voice for critical alerts"
-        }
-    }
+    # Available voices (module constant, kept on the class for callers)
+    VOICES = _VOICES
+    
+    # Maximum cached responses (least recently used are evicted)
+    AUDIO_CACHE_SIZE = 512
+    
+    # Output sample rates (Hz); 8 kHz is telephony (PSTN) audio
+    SAMPLE_RATES = (8000, 16000, 24000)
+    DEFAULT_SAMPLE_RATE = 24000
     
     def __init__(self):
         """Initialize TTS provider."""
-        self.audio_cache = {}
+        self.audio_cache: OrderedDict[str, TTSResult] = OrderedDict()
+        # Word counts by text, shared across voices and rates
+        self._word_counts: OrderedDict[str, int] = OrderedDict()
+        # Sync routes run in a thread pool: guard the caches, and bound how
+        # many syntheses run at once
+        self._cache_lock = threading.Lock()
+        self._synthesis_slots = threading.BoundedSemaphore(settings.TTS_MAX_CONCURRENCY)
         logger.info("TTS Provider initialized with mock audio generation")
     
     def generate_tts(
@@ -64,112 +144,294 @@ class TTSProvider:
         text: str,
         voice: str = "Aurora_Default",
         speaking_rate: float = 1.0,
-        pitch: float = 0.0
-    ) -> Dict[str, Any]:
+        pitch: float = 0.0,
+        sample_rate: int = 24000
+    ) -> TTSResult:
         """
         Generate text-to-speech audio.
         
+        Audio is produced at the requested sample rate here, once, so callers
+        (e.g. telephony at 8 kHz) never resample it themselves.
+        
         Args:
             text: Text to convert to speech
             voice: Voice to use (default: Aurora_Default)
             speaking_rate: Speaking rate (0.5 to 2.0, default: 1.0)
             pitch: Voice pitch (-20 to 20, default: 0)
+            sample_rate: Output sample rate in Hz (one of SAMPLE_RATES, default: 24000)
         
         Returns:
-            Dictionary with audio metadata:
+            Audio result (use to_dict() to serialize) with metadata:
                 - voice: Voice used
                 - text: Original text
                 - audio_url: URL to audio file (mock)
                 - audio_base64: Base64 encoded audio (mock)
                 - duration: Estimated duration in seconds
                 - format: Audio format
+                - codec: Sample encoding (pcm_s16le, or mulaw at 8 kHz)
         """
-        # Validate voice
-        if voice not in self.VOICES:
-            logger.warning(f"Unknown voice '{voice}', using Aurora_Default")
-            voice = "Aurora_Default"
+        voice = self._resolve_voice(voice)
+        sample_rate = self._resolve_sample_rate(sample_rate)
         
-        # Generate unique audio ID based on text and voice
-        audio_id = self._generate_audio_id(text, voice)
+        # Generate unique audio ID based on text and synthesis settings
+        audio_id = self._generate_audio_id(text, voice, speaking_rate, pitch, sample_rate)
         
         # Check cache
-        if audio_id in self.audio_cache:
-            logger.info(f"Returning cached audio for ID: {audio_id}")
-            return self.audio_cache[audio_id]
+        with self._cache_lock:
+            cached = self.audio_cache.get(audio_id)
+            if cached is not None:
+                self.audio_cache.move_to_end(audio_id)
+        if cached is not None:
+            logger.info("Returning cached audio for ID: %s", audio_id)
+            return cached
+        
+        with self._synthesis_slots:
+            response = self._synthesize(text, voice, speaking_rate, pitch, sample_rate, audio_id)
+        
+        # Cache response, evicting the least recently used one when full
+        with self._cache_lock:
+            self.audio_cache[audio_id] = response
+            if len(self.audio_cache) > self.AUDIO_CACHE_SIZE:
+                self.audio_cache.popitem(last=False)
+        
+        logger.info("Generated TTS audio: %s (%.1fs)", audio_id, response.duration)
+        
+        return response
+    
+    def generate_tts_batch(
+        self,
+        texts: List[str],
+        voice: str = "Aurora_Default",
+        speaking_rate: float = 1.0,
+        pitch: float = 0.0,
+        sample_rate: int = 24000
+    ) -> List[TTSResult]:
+        """
+        Generate text-to-speech audio for several texts with the same settings.
+        
+        Cached texts are served from the cache; the rest are synthesized
+        together (shortest first, so a batching engine pads least) while
+        holding a single synthesis slot.
+        
+        Args:
+            texts: Texts to convert to speech
+            voice: Voice to use (default: Aurora_Default)
+            speaking_rate: Speaking rate (0.5 to 2.0, default: 1.0)
+            pitch: Voice pitch (-20 to 20, default: 0)
+            sample_rate: Output sample rate in Hz (one of SAMPLE_RATES, default: 24000)
+        
+        Returns:
+            Audio results, in texts order
+        """
+        voice = self._resolve_voice(voice)
+        sample_rate = self._resolve_sample_rate(sample_rate)
+        audio_ids = [
+            self._generate_audio_id(text, voice, speaking_rate, pitch, sample_rate)
+            for text in texts
+        ]
+        
+        # Serve cached audio; collect the distinct texts still to synthesize
+        results: Dict[str, TTSResult] = {}
+        misses: Dict[str, str] = {}
+        with self._cache_lock:
+            for audio_id, text in zip(audio_ids, texts):
+                cached = self.audio_cache.get(audio_id)
+                if cached is not None:
+                    self.audio_cache.move_to_end(audio_id)
+                    results[audio_id] = cached
+                else:
+                    misses[audio_id] = text
+        
+        if misses:
+            batch = sorted(misses.items(), key=lambda item: len(item[1]))
+            with self._synthesis_slots:
+                synthesized = [
+                    self._synthesize(text, voice, speaking_rate, pitch, sample_rate, audio_id)
+                    for audio_id, text in batch
+                ]
+            
+            with self._cache_lock:
+                for response in synthesized:
+                    results[response.audio_id] = response
+                    self.audio_cache[response.audio_id] = response
+                while len(self.audio_cache) > self.AUDIO_CACHE_SIZE:
+                    self.audio_cache.popitem(last=False)
+        
+        logger.info("Generated TTS batch: %d texts, %d synthesized", len(texts), len(misses))
+        
+        return [results[audio_id] for audio_id in audio_ids]
+    
+    def _resolve_voice(self, voice: str) -> str:
+        """Validate a voice, falling back to Aurora_Default."""
+        if voice not in _VOICES:
+            logger.warning("Unknown voice '%s', using Aurora_Default", voice)
+            return "Aurora_Default"
+        return voice
+    
+    def _resolve_sample_rate(self, sample_rate: int) -> int:
+        """Validate an output sample rate, falling back to DEFAULT_SAMPLE_RATE."""
+        if sample_rate not in self.SAMPLE_RATES:
+            logger.warning("Unsupported sample rate %s, using %d", sample_rate, self.DEFAULT_SAMPLE_RATE)
+            return self.DEFAULT_SAMPLE_RATE
+        return sample_rate
+    
+    def _synthesize(
+        self,
+        text: str,
+        voice: str,
+        speaking_rate: float,
+        pitch: float,
+        sample_rate: int,
+        audio_id: str
+    ) -> TTSResult:
+        """
+        Synthesize audio (mock); in production, the call to the TTS engine.
+        
+        In production the engine is asked for sample_rate directly, or its
+        native output is resampled here (polyphase filter) exactly once, and
+        float samples are quantized to the rate's codec (see _CODECS) before
+        the audio is cached or sent.
+        """
+        word_count = self._get_word_count(text)
         
         # Estimate duration (rough: ~150 words per minute)
-        word_count = len(text.split())
         duration = (word_count / 150) * 60 / speaking_rate
         
         # Generate mock audio URL
         audio_url = f"/api/v1/voice/audio/{audio_id}.wav"
         
         # Generate mock base64 audio (just a placeholder)
-        audio_base64 = self._generate_mock_audio_base64(text)
+        audio_base64 = self._generate_mock_audio_base64(audio_id)
         
         # Create response
-        response = {
-            "voice": voice,
-            "voice_info": self.VOICES[voice],
-            "text": text,
-            "text_length": len(text),
-            "word_count": word_count,
-            "audio_url": audio_url,
-            "audio_base64": audio_base64,
-            "audio_id": audio_id,
-            "duration": round(duration, 2),
-            "format": "wav",
-            "sample_rate": 24000,
-            "speaking_rate": speaking_rate,
-            "pitch": pitch,
-            "generated_at": datetime.utcnow().isoformat() + "Z",
-            "is_mock": True
-        }
+        response = TTSResult(
+            voice=voice,
+            voice_info=_VOICES[voice],
+            text=text,
+            text_length=len(text),
+            word_count=word_count,
+            audio_url=audio_url,
+            audio_base64=audio_base64,
+            audio_id=audio_id,
+            duration=round(duration, 2),
+            format="wav",
+            sample_rate=sample_rate,
+            codec=_CODECS[sample_rate],
+            speaking_rate=speaking_rate,
+            pitch=pitch,
+            generated_at=now_iso()
+        )
         
-        # Cache response
-        self.audio_cache[audio_id] = response
+        return response
+    
+    def generate_tts_stream(
+        self,
+        text: str,
+        voice: str = "Aurora_Default",
+        speaking_rate: float = 1.0,
+        pitch: float = 0.0,
+        sample_rate: int = 24000
+    ) -> Iterator[TTSResult]:
+        """
+        Generate text-to-speech audio one sentence at a time.
         
-        logger.info(f"Generated TTS audio: {audio_id} ({duration:.1f}s)")
+        Sentences are synthesized lazily, as the caller iterates, so the
+        first chunk is ready without waiting for the whole text.
         
-        return response
+        Args:
+            text: Text to convert to speech
+            voice: Voice to use (default: Aurora_Default)
+            speaking_rate: Speaking rate (0.5 to 2.0, default: 1.0)
+            pitch: Voice pitch (-20 to 20, default: 0)
+            sample_rate: Output sample rate in Hz (one of SAMPLE_RATES, default: 24000)
+        
+        Yields:
+            Audio result for each sentence, in order
+        """
+        for sentence in _SENTENCE_BOUNDARY.split(text.strip()):
+            if sentence:
+                yield self.generate_tts(sentence, voice, speaking_rate, pitch, sample_rate)
+    
+    def _get_word_count(self, text: str) -> int:
+        """Get the word count of text, computed once per text."""
+        with self._cache_lock:
+            word_count = self._word_counts.get(text)
+            if word_count is not None:
+                self._word_counts.move_to_end(text)
+                return word_count
+        
+        word_count = len(text.split())
+        with self._cache_lock:
+            self._word_counts[text] = word_count
+            if len(self._word_counts) > self.AUDIO_CACHE_SIZE:
+                self._word_counts.popitem(last=False)
+        return word_count
     
-    def _generate_audio_id(self, text: str, voice: str) -> str:
-        """Generate unique audio ID."""
-        content = f"{text}:{voice}".encode('utf-8')
-        return hashlib.md5(content).hexdigest()[:16]
+    def _generate_audio_id(
+        self,
+        text: str,
+        voice: str,
+        speaking_rate: float = 1.0,
+        pitch: float = 0.0,
+        sample_rate: int = 24000
+    ) -> str:
+        """
+        Generate unique audio ID.
+        
+        Content-addressed: identical text and settings always map to the same
+        audio, so the ID doubles as the cache key and HTTP ETag.
+        """
+        content = f"{voice}|{speaking_rate}|{pitch}|{sample_rate}|{text}".encode('utf-8')
+        return hashlib.blake2b(content, digest_size=8).hexdigest()
     
-    def _generate_mock_audio_base64(self, text: str) -> str:
+    def _generate_mock_audio_base64(self, audio_id: str) -> str:
         """
         Generate mock base64 audio data.
         
         In production, this would be actual audio data.
-        For demo, we return a placeholder.
+        For demo, we return a placeholder (marker + audio ID, no encoding per call).
+        """
+        return _MOCK_AUDIO_PREFIX_B64 + audio_id
+    
+    def get_cached_audio(self, audio_id: str) -> Optional[TTSResult]:
+        """
+        Get previously generated audio by ID.
+        
+        Args:
+            audio_id: Audio ID
+        
+        Returns:
+            Cached audio result, or None if it was never generated or was evicted
         """
-        # Create a mock WAV header + data
-        mock_data = f"MOCK_AUDIO_DATA:{text[:50]}".encode('utf-8')
-        return base64.b64encode(mock_data).decode('utf-8')
+        with self._cache_lock:
+            return self.audio_cache.get(audio_id)
     
     def get_available_voices(self) -> Dict[str, Dict[str, str]]:
         """Get list of available voices."""
-        return self.VOICES
+        return _VOICES
     
     def clear_cache(self) -> int:
         """Clear audio cache."""
-        count = len(self.audio_cache)
-        self.audio_cache.clear()
-        logger.info(f"Cleared {count} cached audio files")
+        with self._cache_lock:
+            count = len(self.audio_cache)
+            self.audio_cache.clear()
+            self._word_counts.clear()
+        logger.info("Cleared %d cached audio files", count)
         return count
 
 
 # Global TTS provider instance
 _tts_provider = None
+_tts_provider_lock = threading.Lock()
 
 
 def get_tts_provider() -> TTSProvider:
-    """Get singleton TTS provider instance."""
+    """Get singleton TTS provider instance (safe to call from any thread)."""
     global _tts_provider
     if _tts_provider is None:
-        _tts_provider = TTSProvider()
+        with _tts_provider_lock:
+            if _tts_provider is None:
+                _tts_provider = TTSProvider()
     return _tts_provider
 
 
@@ -177,8 +439,9 @@ def generate_tts(
     text: str,
     voice: str = "Aurora_Default",
     speaking_rate: float = 1.0,
-    pitch: float = 0.0
-) -> Dict[str, Any]:
+    pitch: float = 0.0,
+    sample_rate: int = 24000
+) -> TTSResult:
     """
     Convenience function to generate TTS.
     
@@ -187,9 +450,10 @@ def generate_tts(
         voice: Voice to use
         speaking_rate: Speaking rate
         pitch: Voice pitch
+        sample_rate: Output sample rate in Hz
     
     Returns:
-        Audio metadata dictionary
+        Audio result
     """
     provider = get_tts_provider()
-    return provider.generate_tts(text, voice, speaking_rate, pitch)
+    return provider.generate_tts(text, voice, speaking_rate, pitch, sample_rate)
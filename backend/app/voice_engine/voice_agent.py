@@ -3,20 +3,99 @@ Voice Agent for AuroraSync OS.
 Handles voice-based customer interactions.
 """
 
-from typing import Dict, Any, Optional
-import uuid
+from typing import Dict, Any, Callable, Iterator, List, Mapping, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+import os
 import logging
+import threading
 
 from app.agents.base_agent import BaseAgent
-from app.voice_engine.message_templates import MessageTemplates
+from app.voice_engine.message_templates import CompiledTemplate, MessageTemplates
 from app.voice_engine.conversation_scenarios import ConversationScenarios
-from app.voice_engine.tts_provider import get_tts_provider
+from app.voice_engine.tts_provider import TTSResult, get_tts_provider
 from app.voice_engine.stt_provider import get_stt_provider
-from app.voice_engine.flow_manager import get_flow_manager
+from app.voice_engine.flow_manager import ConversationSummary, get_flow_manager
 
 
 logger = logging.getLogger(__name__)
 
+# Fixed agent replies to continue-conversation actions
+_CONFIRM_MESSAGE = "Great! I'll proceed with booking that appointment for you. You'll receive a confirmation shortly."
+_ALTERNATIVES_MESSAGE = "I understand. Let me offer you some alternative time slots that might work better."
+_FALLBACK_MESSAGE = "How else can I help you today?"
+
+# Actions whose replies are synthesized ahead of the user's response (None: fallback)
+_PREWARM_ACTIONS = ("confirm", "offer_alternatives", "provide_safety_info", None)
+
+# Safety replies by risk template key, with the medium-risk reply as default
+_SAFETY_TEMPLATES = MessageTemplates.get_template("safety_check", "technical")
+_SAFETY_DEFAULT = _SAFETY_TEMPLATES["medium_risk"]
+
+# Progressive playback frame sizes (ms): a tiny first frame so playback can
+# start early, then growing frames; the last size repeats
+_FRAME_SCHEDULE_MS = (20, 40, 80, 160, 200)
+
+# Shortest frame worth sending on its own; shorter clip tails join the frame before
+_MIN_TAIL_MS = 10
+
+# Message scenario spoken for each conversation scenario, where they differ
+_MESSAGE_SCENARIOS = {"urgent_alert": "predicted_failure"}
+
+_RISK_LEVELS = ("low", "medium", "high")
+
+
+def _resolve_scenario(scenario: str, tone: str, risk_level: str) -> Tuple[CompiledTemplate, Mapping[str, Any]]:
+    """Get the message template and scenario configuration for a conversation."""
+    return (
+        MessageTemplates.get_message_template(_MESSAGE_SCENARIOS.get(scenario, scenario), tone),
+        ConversationScenarios.get_scenario_config(scenario, risk_level)
+    )
+
+
+def _build_scenario_table() -> Dict[Tuple[str, str, str], Tuple[CompiledTemplate, Mapping[str, Any]]]:
+    """Resolve every (scenario, tone, risk level) the handlers use up front."""
+    return {
+        (scenario, tone, risk_level): _resolve_scenario(scenario, tone, risk_level)
+        for scenario, tones in (
+            ("predicted_failure", ("urgent", "polite")),
+            ("urgent_alert", ("urgent",)),
+            ("appointment_reminder", ("friendly",)),
+            ("post_service_feedback", ("friendly",)),
+            ("booking_recovery", ("friendly",))
+        )
+        for tone in tones
+        for risk_level in _RISK_LEVELS
+    }
+
+
+# (template, scenario config) by (scenario, tone, risk level), built at import
+_SCENARIO_TABLE = _build_scenario_table()
+
+
+def _scenario_entry(scenario: str, tone: str, risk_level: str = "medium") -> Tuple[CompiledTemplate, Mapping[str, Any]]:
+    """Look up a conversation's template and configuration (resolving unlisted risk levels)."""
+    entry = _SCENARIO_TABLE.get((scenario, tone, risk_level))
+    return entry if entry is not None else _resolve_scenario(scenario, tone, risk_level)
+
+
+# Executor for background reply synthesis, shared by all voice agents
+_prewarm_pool: Optional[ThreadPoolExecutor] = None
+_prewarm_pool_lock = threading.Lock()
+
+
+def _get_prewarm_pool() -> ThreadPoolExecutor:
+    """Get the shared reply pre-synthesis executor (created on first call)."""
+    global _prewarm_pool
+    with _prewarm_pool_lock:
+        if _prewarm_pool is None:
+            _prewarm_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tts-prewarm")
+        return _prewarm_pool
+
+
+def _new_conversation_id() -> str:
+    """Get a random 128-bit conversation ID (32 hex digits; IDs are opaque to clients)."""
+    return os.urandom(16).hex()
+
 
 class VoiceAgent(BaseAgent):
     """
@@ -33,11 +112,25 @@ class VoiceAgent(BaseAgent):
         """Initialize Voice Agent."""
         super().__init__(name="voice")
         
-        # Initialize providers
+        # Initialize providers (process-wide singletons, shared by all agents)
         self.tts_provider = get_tts_provider()
         self.stt_provider = get_stt_provider()
         self.flow_manager = get_flow_manager()
         
+        # Background synthesis of likely next replies
+        self._prewarm_pool = _get_prewarm_pool()
+        
+        # Event handlers by event type
+        self._handlers: Dict[str, Callable[[Dict[str, Any]], Dict[str, Any]]] = {
+            "voice_predict_failure": self._handle_predict_failure,
+            "voice_urgent_alert": self._handle_urgent_alert,
+            "voice_reminder": self._handle_reminder,
+            "voice_feedback": self._handle_feedback,
+            "voice_booking_recovery": self._handle_booking_recovery,
+            "voice_transcribe": self._handle_transcribe,
+            "voice_continue": self._handle_continue_conversation
+        }
+        
         self.logger.info("🎤 Voice Agent ready with TTS/STT support")
     
     def handle_event(self, event: Dict[str, Any]) -> Dict[str, Any]:
@@ -56,32 +149,253 @@ class VoiceAgent(BaseAgent):
         payload = event.get("payload", {})
         
         # Route to appropriate handler
-        if event_type == "voice_predict_failure":
-            return self._handle_predict_failure(payload)
+        handler = self._handlers.get(event_type)
+        if handler is not None:
+            return handler(payload)
+        
+        # Default response
+        return self.create_response(
+            status="success",
+            result={"note": f"Voice Agent processed: {event_type}"}
+        )
+    
+    def run_batch(self, events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Handle several voice events, synthesizing their audio in batches.
         
-        elif event_type == "voice_urgent_alert":
-            return self._handle_urgent_alert(payload)
+        Events are handled in order, but their messages are only synthesized
+        once all are handled: one TTS batch per (voice, speaking rate, sample
+        rate), so
+        broadcasts (reminders, alert storms) use the engine's batching
+        instead of one synthesis per event.
         
-        elif event_type == "voice_reminder":
-            return self._handle_reminder(payload)
+        Args:
+            events: Events to process
         
-        elif event_type == "voice_feedback":
-            return self._handle_feedback(payload)
+        Returns:
+            Responses, in events order
+        """
+        # (message, voice, speaking rate, sample rate, audio placeholder) per synthesis
+        pending: List[tuple] = []
+        responses = []
+        agent_turns = []
+        for event in events:
+            payload = {**event.get("payload", {}), "_tts_batch": pending}
+            queued = len(pending)
+            response = self.handle_event({**event, "payload": payload})
+            responses.append(response)
+            
+            # Remember which turn carries the placeholder, to save its audio later
+            result = response.get("result") or {}
+            if len(pending) > queued and "conversation_id" in result:
+                conversation = self.flow_manager.get_conversation(result["conversation_id"])
+                agent_turns.append((result["conversation_id"], conversation["current_turn"], pending[-1][4]))
+        
+        groups: Dict[tuple, List[int]] = {}
+        for index, (_, voice, speaking_rate, sample_rate, _) in enumerate(pending):
+            groups.setdefault((voice, speaking_rate, sample_rate), []).append(index)
+        
+        for (voice, speaking_rate, sample_rate), indexes in groups.items():
+            audios = self.tts_provider.generate_tts_batch(
+                [pending[index][0] for index in indexes],
+                voice=voice,
+                speaking_rate=speaking_rate,
+                sample_rate=sample_rate
+            )
+            # Fill placeholders in place: responses reference the same dicts
+            for index, audio in zip(indexes, audios):
+                placeholder = pending[index][4]
+                placeholder.clear()
+                placeholder.update(audio.to_dict())
         
-        elif event_type == "voice_booking_recovery":
-            return self._handle_booking_recovery(payload)
+        for conversation_id, turn_number, audio in agent_turns:
+            self.flow_manager.set_turn_audio(conversation_id, turn_number, audio)
         
-        elif event_type == "voice_transcribe":
-            return self._handle_transcribe(payload)
+        return responses
+    
+    def _start_conversation(
+        self,
+        conversation_id: str,
+        scenario: str,
+        context: Dict[str, Any],
+        scenario_config: Mapping[str, Any],
+        sample_rate: Optional[int] = None
+    ) -> ConversationSummary:
+        """
+        Start a conversation flow and pre-synthesize its likely next replies.
         
-        elif event_type == "voice_continue":
-            return self._handle_continue_conversation(payload)
+        Args:
+            conversation_id: Conversation ID
+            scenario: Scenario name
+            context: Message context
+            scenario_config: Scenario configuration (overrides context keys)
+            sample_rate: The payload's output sample rate (default: provider default)
         
-        # Default response
-        return self.create_response(
-            status="success",
-            result={"note": f"Voice Agent processed: {event_type}"}
-        )
+        Returns:
+            Started conversation's summary
+        """
+        # The flow manager keeps, updates and persists the context, so it gets
+        # its own plain dict (not a view over the shared, read-only config)
+        context = dict(context, **scenario_config)
+        conversation = self.flow_manager.start_conversation(conversation_id, scenario, context)
+        self._prewarm_pool.submit(
+            self._prewarm_replies,
+            context,
+            sample_rate or self.tts_provider.DEFAULT_SAMPLE_RATE
+        )
+        return conversation
+    
+    def _prewarm_replies(self, context: Dict[str, Any], sample_rate: int):
+        """
+        Synthesize the reply to every continue action ahead of time.
+        
+        There are only a few possible replies, and TTS audio is cached by
+        content and sample rate, so the continue turn finds its audio already
+        generated as long as it asks for the same sample rate.
+        """
+        try:
+            for action in _PREWARM_ACTIONS:
+                self.tts_provider.generate_tts(
+                    self._reply_message(action, context),
+                    sample_rate=sample_rate
+                )
+        except Exception as e:
+            self.logger.warning("Reply pre-synthesis failed: %s", e)
+    
+    def _reply_message(self, action: Optional[str], context: Dict[str, Any]) -> str:
+        """Get the agent's reply text for a continue-conversation action."""
+        if action == "confirm":
+            return _CONFIRM_MESSAGE
+        elif action == "offer_alternatives":
+            return _ALTERNATIVES_MESSAGE
+        elif action == "provide_safety_info":
+            risk_level = context.get("risk_level", "medium")
+            return _SAFETY_TEMPLATES.get(risk_level, _SAFETY_DEFAULT).safe_substitute(context)
+        return _FALLBACK_MESSAGE
+    
+    def _speak(
+        self,
+        message: str,
+        payload: Dict[str, Any],
+        voice: str = "Aurora_Default",
+        speaking_rate: float = 1.0
+    ) -> Dict[str, Any]:
+        """
+        Synthesize a message for a handler's response.
+        
+        Audio is produced at the payload's ``"sample_rate"`` (e.g. 8000 for
+        telephony), or the provider's default.
+        
+        Streaming payloads (``"stream": True``) skip whole-message synthesis;
+        only the voice settings are returned, for the caller to pass to
+        synthesize_streaming. Within run_batch, synthesis is deferred to the
+        batch and a placeholder is returned.
+        
+        Args:
+            message: Message text
+            payload: Event payload
+            voice: Voice to use
+            speaking_rate: Speaking rate
+        
+        Returns:
+            Audio metadata, or voice settings when streaming
+        """
+        sample_rate = payload.get("sample_rate") or self.tts_provider.DEFAULT_SAMPLE_RATE
+        if payload.get("stream"):
+            return {
+                "streaming": True,
+                "voice": voice,
+                "speaking_rate": speaking_rate,
+                "sample_rate": sample_rate
+            }
+        batch = payload.get("_tts_batch")
+        if batch is not None:
+            # Synthesized later by run_batch
+            placeholder = {
+                "pending": True,
+                "voice": voice,
+                "speaking_rate": speaking_rate,
+                "sample_rate": sample_rate
+            }
+            batch.append((message, voice, speaking_rate, sample_rate, placeholder))
+            return placeholder
+        return self.tts_provider.generate_tts(
+            message,
+            voice=voice,
+            speaking_rate=speaking_rate,
+            sample_rate=sample_rate
+        ).to_dict()
+    
+    def synthesize_streaming(
+        self,
+        message: str,
+        voice: str = "Aurora_Default",
+        speaking_rate: float = 1.0,
+        progressive: bool = False,
+        sample_rate: int = 24000
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Synthesize a message sentence by sentence.
+        
+        Each chunk is synthesized only when requested, so playback of the
+        first sentence can start before the rest of the message is ready.
+        
+        Args:
+            message: Message text
+            voice: Voice to use
+            speaking_rate: Speaking rate
+            progressive: Yield audio frames of growing size (see _stream_audio)
+                instead of one chunk per sentence
+            sample_rate: Output sample rate in Hz
+        
+        Yields:
+            Chunks with seq (0-based), text and audio metadata, or frames
+        """
+        chunks = self.tts_provider.generate_tts_stream(message, voice, speaking_rate, sample_rate=sample_rate)
+        if progressive:
+            yield from self._stream_audio(chunks)
+            return
+        for seq, chunk in enumerate(chunks):
+            yield {"seq": seq, "text": chunk.text, "audio": chunk.to_dict()}
+    
+    def _stream_audio(self, audio_gen: Iterator[TTSResult]) -> Iterator[Dict[str, Any]]:
+        """
+        Split streamed sentence audio into frames of 20, 40, 80, 160, then 200ms.
+        
+        The progression runs across sentences and restarts with every stream
+        (i.e. every new message). A clip tail shorter than _MIN_TAIL_MS is
+        sent with the frame before it rather than on its own.
+        
+        Args:
+            audio_gen: Sentence audio, in order
+        
+        Yields:
+            Frames with seq (0-based), audio_id, audio_url, offset_ms,
+            duration_ms, start_sample, num_samples and is_final (last frame
+            of its sentence)
+        """
+        seq = 0
+        for audio in audio_gen:
+            samples_per_ms = audio.sample_rate / 1000
+            clip_ms = round(audio.duration * 1000)
+            offset_ms = 0
+            while offset_ms < clip_ms:
+                frame_ms = _FRAME_SCHEDULE_MS[min(seq, len(_FRAME_SCHEDULE_MS) - 1)]
+                if clip_ms - offset_ms - frame_ms < _MIN_TAIL_MS:
+                    frame_ms = clip_ms - offset_ms
+                start_sample = round(offset_ms * samples_per_ms)
+                yield {
+                    "seq": seq,
+                    "audio_id": audio.audio_id,
+                    "audio_url": audio.audio_url,
+                    "offset_ms": offset_ms,
+                    "duration_ms": frame_ms,
+                    "start_sample": start_sample,
+                    "num_samples": round((offset_ms + frame_ms) * samples_per_ms) - start_sample,
+                    "is_final": offset_ms + frame_ms >= clip_ms
+                }
+                seq += 1
+                offset_ms += frame_ms
     
     def _handle_predict_failure(self, payload: Dict[str, Any]) -> Dict[str, Any]:
         """Handle predicted failure scenario."""
@@ -94,11 +408,8 @@ class VoiceAgent(BaseAgent):
         risk_level = prediction_data.get("risk_level", "medium")
         tone = "urgent" if risk_level == "high" else "polite"
         
-        # Get scenario configuration
-        scenario_config = ConversationScenarios.get_scenario_config(
-            "predicted_failure",
-            risk_level
-        )
+        # Get message template and scenario configuration
+        template, scenario_config = _scenario_entry("predicted_failure", tone, risk_level)
         
         # Build context
         context = ConversationScenarios.get_context_for_scenario(
@@ -109,25 +420,24 @@ class VoiceAgent(BaseAgent):
         )
         
         # Generate message
-        message = MessageTemplates.build_full_message(
-            "predicted_failure",
-            tone,
-            context
-        )
+        message = template.safe_substitute(context)
         
         # Generate TTS
-        audio = self.tts_provider.generate_tts(
+        audio = self._speak(
             message,
+            payload,
             voice=scenario_config["voice"],
             speaking_rate=scenario_config["speaking_rate"]
         )
         
         # Start conversation flow
-        conversation_id = str(uuid.uuid4())
-        conversation = self.flow_manager.start_conversation(
+        conversation_id = _new_conversation_id()
+        conversation = self._start_conversation(
             conversation_id,
             "predicted_failure",
-            {**context, **scenario_config}
+            context,
+            scenario_config,
+            payload.get("sample_rate")
         )
         
         # Add agent turn
@@ -158,10 +468,7 @@ class VoiceAgent(BaseAgent):
         booking_data = payload.get("booking_data", {})
         
         # Force urgent tone
-        scenario_config = ConversationScenarios.get_scenario_config(
-            "urgent_alert",
-            "high"
-        )
+        template, scenario_config = _scenario_entry("urgent_alert", "urgent", "high")
         
         context = ConversationScenarios.get_context_for_scenario(
             "predicted_failure",
@@ -170,23 +477,22 @@ class VoiceAgent(BaseAgent):
             booking_data
         )
         
-        message = MessageTemplates.build_full_message(
-            "predicted_failure",
-            "urgent",
-            context
-        )
+        message = template.safe_substitute(context)
         
-        audio = self.tts_provider.generate_tts(
+        audio = self._speak(
             message,
+            payload,
             voice=scenario_config["voice"],
             speaking_rate=scenario_config["speaking_rate"]
         )
         
-        conversation_id = str(uuid.uuid4())
-        self.flow_manager.start_conversation(
+        conversation_id = _new_conversation_id()
+        self._start_conversation(
             conversation_id,
             "urgent_alert",
-            {**context, **scenario_config}
+            context,
+            scenario_config,
+            payload.get("sample_rate")
         )
         
         self.flow_manager.add_turn(conversation_id, "agent", message, audio)
@@ -208,9 +514,7 @@ class VoiceAgent(BaseAgent):
         vehicle_data = payload.get("vehicle_data", {})
         booking_data = payload.get("booking_data", {})
         
-        scenario_config = ConversationScenarios.get_scenario_config(
-            "appointment_reminder"
-        )
+        template, scenario_config = _scenario_entry("appointment_reminder", "friendly")
         
         context = ConversationScenarios.get_context_for_scenario(
             "appointment_reminder",
@@ -219,22 +523,21 @@ class VoiceAgent(BaseAgent):
             booking_data
         )
         
-        message = MessageTemplates.build_full_message(
-            "appointment_reminder",
-            "friendly",
-            context
-        )
+        message = template.safe_substitute(context)
         
-        audio = self.tts_provider.generate_tts(
+        audio = self._speak(
             message,
+            payload,
             voice=scenario_config["voice"]
         )
         
-        conversation_id = str(uuid.uuid4())
-        self.flow_manager.start_conversation(
+        conversation_id = _new_conversation_id()
+        self._start_conversation(
             conversation_id,
             "appointment_reminder",
-            {**context, **scenario_config}
+            context,
+            scenario_config,
+            payload.get("sample_rate")
         )
         
         self.flow_manager.add_turn(conversation_id, "agent", message, audio)
@@ -254,9 +557,7 @@ class VoiceAgent(BaseAgent):
         vehicle_data = payload.get("vehicle_data", {})
         service_data = payload.get("service_data", {})
         
-        scenario_config = ConversationScenarios.get_scenario_config(
-            "post_service_feedback"
-        )
+        template, scenario_config = _scenario_entry("post_service_feedback", "friendly")
         
         context = ConversationScenarios.get_context_for_scenario(
             "post_service_feedback",
@@ -265,22 +566,21 @@ class VoiceAgent(BaseAgent):
             service_data
         )
         
-        message = MessageTemplates.build_full_message(
-            "post_service_feedback",
-            "friendly",
-            context
-        )
+        message = template.safe_substitute(context)
         
-        audio = self.tts_provider.generate_tts(
+        audio = self._speak(
             message,
+            payload,
             voice=scenario_config["voice"]
         )
         
-        conversation_id = str(uuid.uuid4())
-        self.flow_manager.start_conversation(
+        conversation_id = _new_conversation_id()
+        self._start_conversation(
             conversation_id,
             "post_service_feedback",
-            {**context, **scenario_config}
+            context,
+            scenario_config,
+            payload.get("sample_rate")
         )
         
         self.flow_manager.add_turn(conversation_id, "agent", message, audio)
@@ -301,9 +601,7 @@ class VoiceAgent(BaseAgent):
         prediction_data = payload.get("prediction_data", {})
         booking_data = payload.get("booking_data", {})
         
-        scenario_config = ConversationScenarios.get_scenario_config(
-            "booking_recovery"
-        )
+        template, scenario_config = _scenario_entry("booking_recovery", "friendly")
         
         context = ConversationScenarios.get_context_for_scenario(
             "booking_recovery",
@@ -315,23 +613,22 @@ class VoiceAgent(BaseAgent):
         # Add alternate slots
         context["alternate_slots"] = "tomorrow morning at 9 AM, tomorrow afternoon at 2 PM, or this Saturday at 10 AM"
         
-        message = MessageTemplates.build_full_message(
-            "booking_recovery",
-            "friendly",
-            context
-        )
+        message = template.safe_substitute(context)
         
-        audio = self.tts_provider.generate_tts(
+        audio = self._speak(
             message,
+            payload,
             voice=scenario_config["voice"],
             speaking_rate=scenario_config["speaking_rate"]
         )
         
-        conversation_id = str(uuid.uuid4())
-        self.flow_manager.start_conversation(
+        conversation_id = _new_conversation_id()
+        self._start_conversation(
             conversation_id,
             "booking_recovery",
-            {**context, **scenario_config}
+            context,
+            scenario_config,
+            payload.get("sample_rate")
         )
         
         self.flow_manager.add_turn(conversation_id, "agent", message, audio)
@@ -355,12 +652,12 @@ class VoiceAgent(BaseAgent):
         transcription = self.stt_provider.transcribe_audio(audio_file, language)
         
         # Detect intent
-        intent_result = self.stt_provider.detect_intent(transcription["text"])
+        intent_result = self.stt_provider.detect_intent(transcription.text)
         
         return self.create_response(
             status="success",
             result={
-                "transcription": transcription,
+                "transcription": transcription.to_dict(),
                 "intent": intent_result
             }
         )
@@ -399,20 +696,10 @@ class VoiceAgent(BaseAgent):
         )
         
         # Generate response based on action
-        if next_action["action"] == "confirm":
-            message = "Great! I'll proceed with booking that appointment for you. You'll receive a confirmation shortly."
-        elif next_action["action"] == "offer_alternatives":
-            message = "I understand. Let me offer you some alternative time slots that might work better."
-        elif next_action["action"] == "provide_safety_info":
-            context = conversation["context"]
-            risk_level = context.get("risk_level", "medium")
-            templates = MessageTemplates.get_template("safety_check", "technical")
-            message = templates.get(risk_level, templates.get("medium_risk", "")).safe_substitute(context)
-        else:
-            message = "How else can I help you today?"
+        message = self._reply_message(next_action["action"], conversation["context"])
         
-        # Generate TTS
-        audio = self.tts_provider.generate_tts(message)
+        # Generate TTS (usually already synthesized by _prewarm_replies)
+        audio = self._speak(message, payload)
         
         # Add agent turn
         self.flow_manager.add_turn(
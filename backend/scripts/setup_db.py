@@ -5,6 +5,7 @@ Creates all database tables based on SQLAlchemy models.
 Usage:
     python scripts/setup_db.py
     python scripts/setup_db.py --drop  # Drop all tables first (WARNING: deletes data)
+    python scripts/setup_db.py --verify  # List the tables found in the database
 """
 
 import sys
@@ -19,23 +20,56 @@ from app.config import settings
 from app.models import Base, Vehicle, Prediction, UEBAEvent
 
 
-def setup_database(drop_first: bool = False):
+RULE = "=" * 60
+
+# Output blocks, each written to stdout in one call
+REGISTERED_MODELS = """📋 Registered models:
+   - Vehicle
+   - Prediction
+   - UEBAEvent
+
+"""
+
+NEXT_STEPS = f"""{RULE}
+🎉 Database setup complete!
+{RULE}
+
+Next steps:
+  1. Start the API server: uvicorn app.main:app --reload
+  2. Visit the API docs: http://localhost:8000/docs
+  3. Check database connection: http://localhost:8000/api/v1/db-check
+
+"""
+
+TROUBLESHOOTING = """Troubleshooting:
+  1. Ensure PostgreSQL is running
+  2. Check DATABASE_URL in .env file
+  3. Verify database credentials
+  4. Create database if it doesn't exist:
+     psql -U postgres -c 'CREATE DATABASE aurorasync;'
+
+"""
+
+def setup_database(drop_first: bool = False, verify: bool = False):
     """
     Set up the database by creating all tables.
     
     Args:
         drop_first: If True, drop all existing tables before creating new ones
+        verify: If True, list the tables reflected from the database rather
+            than the ones registered with the models
     """
-    print("=" * 60)
-    print("🔧 AuroraSync OS - Database Setup")
-    print("=" * 60)
-    print()
-    
-    # Display configuration
-    print(f"📊 Project: {settings.PROJECT_NAME} v{settings.VERSION}")
-    print(f"🗄️  Database URL: {settings.DATABASE_URL}")
-    print(f"🌍 Environment: {settings.ENVIRONMENT}")
-    print()
+    # Display header and configuration
+    sys.stdout.write(
+        f"{RULE}\n"
+        "🔧 AuroraSync OS - Database Setup\n"
+        f"{RULE}\n"
+        "\n"
+        f"📊 Project: {settings.PROJECT_NAME} v{settings.VERSION}\n"
+        f"🗄️  Database URL: {settings.DATABASE_URL}\n"
+        f"🌍 Environment: {settings.ENVIRONMENT}\n"
+        "\n"
+    )
     
     # Check if we should drop tables first
     if drop_first:
@@ -49,54 +83,36 @@ def setup_database(drop_first: bool = False):
             return
     
     # Create tables
-    print("📦 Creating database tables...")
-    print()
+    sys.stdout.write("📦 Creating database tables...\n\n")
     
     try:
         # Import all models to ensure they're registered
-        print("📋 Registered models:")
-        print(f"   - Vehicle")
-        print(f"   - Prediction")
-        print(f"   - UEBAEvent")
-        print()
+        sys.stdout.write(REGISTERED_MODELS)
         
         # Create all tables
         init_db()
         
-        # Verify tables were created
-        from sqlalchemy import inspect
-        inspector = inspect(engine)
-        tables = inspector.get_table_names()
-        
-        print("✅ Successfully created tables:")
-        for table in tables:
-            print(f"   ✓ {table}")
-        print()
+        if verify:
+            # Verify tables were created (extra round trips to the database)
+            from sqlalchemy import inspect
+            inspector = inspect(engine)
+            tables = inspector.get_table_names()
+        else:
+            # create_all just created exactly the registered tables
+            tables = list(Base.metadata.tables)
         
-        print("=" * 60)
-        print("🎉 Database setup complete!")
-        print("=" * 60)
-        print()
-        print("Next steps:")
-        print("  1. Start the API server: uvicorn app.main:app --reload")
-        print("  2. Visit the API docs: http://localhost:8000/docs")
-        print("  3. Check database connection: http://localhost:8000/api/v1/db-check")
-        print()
+        created = "".join(f"   ✓ {table}\n" for table in tables)
+        sys.stdout.write(f"✅ Successfully created tables:\n{created}\n{NEXT_STEPS}")
         
     except Exception as e:
-        print()
-        print("=" * 60)
-        print("❌ Error during database setup!")
-        print("=" * 60)
-        print(f"Error: {str(e)}")
-        print()
-        print("Troubleshooting:")
-        print("  1. Ensure PostgreSQL is running")
-        print("  2. Check DATABASE_URL in .env file")
-        print("  3. Verify database credentials")
-        print("  4. Create database if it doesn't exist:")
-        print("     psql -U postgres -c 'CREATE DATABASE aurorasync;'")
-        print()
+        sys.stdout.write(
+            f"\n{RULE}\n"
+            "❌ Error during database setup!\n"
+            f"{RULE}\n"
+            f"Error: {str(e)}\n"
+            "\n"
+            f"{TROUBLESHOOTING}"
+        )
         sys.exit(1)
 
 
@@ -112,9 +128,14 @@ def main():
         action="store_true",
         help="Drop all existing tables before creating new ones (WARNING: deletes all data)"
     )
+    parser.add_argument(
+        "--verify",
+        action="store_true",
+        help="List the tables found in the database instead of the registered models' tables"
+    )
     
     args = parser.parse_args()
-    setup_database(drop_first=args.drop)
+    setup_database(drop_first=args.drop, verify=args.verify)
 
 
 if __name__ == "__main__":
@@ -9,12 +9,56 @@ Usage:
 import requests
 import json
 import sys
-from typing import Dict, Any
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Any, Optional
 
 
 BASE_URL = "http://localhost:8000"
 AGENTS_URL = f"{BASE_URL}/api/v1/agents"
 
+# Shared session: keeps connections to the server alive between tests
+SESSION = requests.Session()
+
+# Agent routing tests: (name, event type, payload, description)
+ROUTING_CASES = [
+    (
+        "Data Analysis Agent",
+        "analyze_data",
+        {"vehicle_id": "VEH001", "data": {"rpm": 2500, "temp": 85.5}},
+        "Data Analysis Agent - Analyze Data"
+    ),
+    (
+        "Diagnosis Agent",
+        "predict_failure",
+        {"vehicle_id": "VEH001", "features": {"brake_pad_thickness": 2.1}},
+        "Diagnosis Agent - Predict Failure"
+    ),
+    (
+        "Customer Engagement Agent",
+        "engage_customer",
+        {"vehicle_id": "VEH001", "customer_id": "CUST-001"},
+        "Customer Engagement Agent - Engage Customer"
+    ),
+    (
+        "Scheduling Agent",
+        "schedule_service",
+        {"vehicle_id": "VEH001", "service_type": "brake_replacement"},
+        "Scheduling Agent - Schedule Service"
+    ),
+    (
+        "Feedback Agent",
+        "validate_prediction",
+        {"prediction_id": "PRED-12345", "actual_outcome": "brake_failure"},
+        "Feedback Agent - Validate Prediction"
+    ),
+    (
+        "Manufacturing Insights Agent",
+        "generate_rca",
+        {"component": "brake_system", "failure_count": 50},
+        "Manufacturing Insights Agent - Generate RCA"
+    ),
+]
+
 
 def print_section(title: str):
     """Print a section header."""
@@ -23,13 +67,19 @@ def print_section(title: str):
     print("=" * 70)
 
 
+def print_json(data: Any):
+    """Print data as indented JSON, written to stdout as it is encoded."""
+    json.dump(data, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+
+
 def print_response(response: requests.Response):
     """Print a formatted response."""
     if response.status_code == 200:
         data = response.json()
         print(f"✅ Status: {response.status_code}")
         print(f"📦 Response:")
-        print(json.dumps(data, indent=2))
+        print_json(data)
     else:
         print(f"❌ Status: {response.status_code}")
         print(f"Error: {response.text}")
@@ -40,7 +90,7 @@ def test_agent_status():
     print_section("Test 1: Get Agent Status")
     
     try:
-        response = requests.get(f"{AGENTS_URL}/status", timeout=5)
+        response = SESSION.get(f"{AGENTS_URL}/status", timeout=5)
         print_response(response)
         return response.status_code == 200
     except Exception as e:
@@ -53,7 +103,7 @@ def test_event_types():
     print_section("Test 2: Get Available Event Types")
     
     try:
-        response = requests.get(f"{AGENTS_URL}/event-types", timeout=5)
+        response = SESSION.get(f"{AGENTS_URL}/event-types", timeout=5)
         print_response(response)
         return response.status_code == 200
     except Exception as e:
@@ -61,25 +111,43 @@ def test_event_types():
         return False
 
 
-def test_agent_routing(event_type: str, payload: Dict[str, Any], description: str):
-    """Test routing an event to an agent."""
-    print_section(f"Test: {description}")
-    
+def route_event(event_type: str, payload: Dict[str, Any]) -> requests.Response:
+    """Send an event to the test route of the Master Agent."""
     event = {
         "type": event_type,
         "payload": payload,
         "source": "test_script"
     }
+    return SESSION.post(
+        f"{AGENTS_URL}/test-route",
+        json=event,
+        timeout=5
+    )
+
+
+def test_agent_routing(
+    event_type: str,
+    payload: Dict[str, Any],
+    description: str,
+    pending: Optional[Future] = None
+):
+    """
+    Test routing an event to an agent.
+    
+    Args:
+        event_type: Event type
+        payload: Event payload
+        description: Test description
+        pending: Request already sent with route_event (sent here if None)
+    """
+    print_section(f"Test: {description}")
     
     print(f"📤 Sending event: {event_type}")
-    print(f"   Payload: {json.dumps(payload, indent=2)}")
+    sys.stdout.write("   Payload: ")
+    print_json(payload)
     
     try:
-        response = requests.post(
-            f"{AGENTS_URL}/test-route",
-            json=event,
-            timeout=5
-        )
+        response = pending.result() if pending is not None else route_event(event_type, payload)
         print_response(response)
         return response.status_code == 200
     except Exception as e:
@@ -92,7 +160,7 @@ def test_ueba_stats():
     print_section("Test: Get UEBA Statistics")
     
     try:
-        response = requests.get(f"{AGENTS_URL}/ueba/stats", timeout=5)
+        response = SESSION.get(f"{AGENTS_URL}/ueba/stats", timeout=5)
         print_response(response)
         return response.status_code == 200
     except Exception as e:
@@ -117,65 +185,15 @@ def main():
     # Test 2: Event Types
     results.append(("Event Types", test_event_types()))
     
-    # Test 3: Data Analysis Agent
-    results.append((
-        "Data Analysis Agent",
-        test_agent_routing(
-            "analyze_data",
-            {"vehicle_id": "VEH001", "data": {"rpm": 2500, "temp": 85.5}},
-            "Data Analysis Agent - Analyze Data"
-        )
-    ))
-    
-    # Test 4: Diagnosis Agent
-    results.append((
-        "Diagnosis Agent",
-        test_agent_routing(
-            "predict_failure",
-            {"vehicle_id": "VEH001", "features": {"brake_pad_thickness": 2.1}},
-            "Diagnosis Agent - Predict Failure"
-        )
-    ))
-    
-    # Test 5: Customer Engagement Agent
-    results.append((
-        "Customer Engagement Agent",
-        test_agent_routing(
-            "engage_customer",
-            {"vehicle_id": "VEH001", "customer_id": "CUST-001"},
-            "Customer Engagement Agent - Engage Customer"
-        )
-    ))
-    
-    # Test 6: Scheduling Agent
-    results.append((
-        "Scheduling Agent",
-        test_agent_routing(
-            "schedule_service",
-            {"vehicle_id": "VEH001", "service_type": "brake_replacement"},
-            "Scheduling Agent - Schedule Service"
-        )
-    ))
-    
-    # Test 7: Feedback Agent
-    results.append((
-        "Feedback Agent",
-        test_agent_routing(
-            "validate_prediction",
-            {"prediction_id": "PRED-12345", "actual_outcome": "brake_failure"},
-            "Feedback Agent - Validate Prediction"
-        )
-    ))
-    
-    # Test 8: Manufacturing Insights Agent
-    results.append((
-        "Manufacturing Insights Agent",
-        test_agent_routing(
-            "generate_rca",
-            {"component": "brake_system", "failure_count": 50},
-            "Manufacturing Insights Agent - Generate RCA"
-        )
-    ))
+    # Tests 3-8: Worker agents (requests sent concurrently, results
+    # reported in order)
+    with ThreadPoolExecutor(max_workers=len(ROUTING_CASES)) as executor:
+        pending = [
+            executor.submit(route_event, event_type, payload)
+            for _, event_type, payload, _ in ROUTING_CASES
+        ]
+        for (name, event_type, payload, description), future in zip(ROUTING_CASES, pending):
+            results.append((name, test_agent_routing(event_type, payload, description, future)))
     
     # Test 9: UEBA Statistics
     results.append(("UEBA Statistics", test_ueba_stats()))
@@ -13,6 +13,9 @@ from typing import Dict, Any
 BASE_URL = "http://localhost:8000"
 API_V1_URL = f"{BASE_URL}/api/v1"
 
+# Shared session: keeps connections to the server alive between tests
+SESSION = requests.Session()
+
 
 def test_endpoint(name: str, url: str) -> bool:
     """
@@ -27,7 +30,7 @@ def test_endpoint(name: str, url: str) -> bool:
     """
     try:
         print(f"Testing {name}...", end=" ")
-        response = requests.get(url, timeout=5)
+        response = SESSION.get(url, timeout=5)
         
         if response.status_code == 200:
             print("✅ PASS")
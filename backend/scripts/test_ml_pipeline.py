@@ -4,17 +4,70 @@ Tests data generation, model training, and prediction.
 
 Usage:
     python scripts/test_ml_pipeline.py
+    python scripts/test_ml_pipeline.py --verbose  # Also print request and response bodies
 """
 
 import requests
+import argparse
 import json
 import sys
 import os
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Optional
 
 
 BASE_URL = "http://localhost:8000"
 PREDICT_URL = f"{BASE_URL}/api/v1/predict"
 
+# Endpoint URLs
+URL_MODEL_INFO = f"{PREDICT_URL}/model-info"
+URL_PREDICT_TEST = f"{PREDICT_URL}/test"
+URL_AGENTS_TEST_ROUTE = f"{BASE_URL}/api/v1/agents/test-route"
+
+# Shared session: keeps connections to the server alive between tests
+SESSION = requests.Session()
+
+# Print request and response bodies (set by --verbose)
+VERBOSE = False
+
+# Normal operating conditions
+LOW_RISK_TELEMATICS = {
+    "engine_temp": 90.0,
+    "brake_pad_wear": 8.0,
+    "battery_voltage": 12.8,
+    "vibration": 0.3,
+    "tyre_pressure": 32.0,
+    "odometer": 50000.0,
+    "ambient_temp": 25.0
+}
+
+# Failure conditions
+HIGH_RISK_TELEMATICS = {
+    "engine_temp": 115.0,  # High temperature
+    "brake_pad_wear": 1.5,  # Low brake pad
+    "battery_voltage": 11.2,  # Low voltage
+    "vibration": 1.3,  # High vibration
+    "tyre_pressure": 24.0,  # Low pressure
+    "odometer": 80000.0,
+    "ambient_temp": 40.0  # High ambient temp
+}
+
+DIAGNOSIS_EVENT = {
+    "type": "predict_failure",
+    "payload": {
+        "vehicle_id": "VEH001",
+        "telematics": {
+            "engine_temp": 110.0,
+            "brake_pad_wear": 2.0,
+            "battery_voltage": 11.5,
+            "vibration": 1.2,
+            "tyre_pressure": 28.0,
+            "odometer": 50000.0,
+            "ambient_temp": 35.0
+        }
+    }
+}
+
 
 def print_section(title: str):
     """Print a section header."""
@@ -23,18 +76,53 @@ def print_section(title: str):
     print("=" * 70)
 
 
-def test_model_info():
-    """Test getting model information."""
+def print_json(label: str, data: Any):
+    """
+    Print a labelled body as indented JSON, in verbose mode only.
+    
+    The JSON is written to stdout as it is encoded.
+    """
+    if not VERBOSE:
+        return
+    print(label)
+    json.dump(data, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+
+
+def request_model_info() -> requests.Response:
+    """Request model information."""
+    return SESSION.get(URL_MODEL_INFO, timeout=5)
+
+
+def request_prediction(telematics: dict) -> requests.Response:
+    """Request a prediction for telematics data."""
+    return SESSION.post(
+        URL_PREDICT_TEST,
+        json=telematics,
+        timeout=5
+    )
+
+
+def request_diagnosis() -> requests.Response:
+    """Send the test event to the Diagnosis Agent."""
+    return SESSION.post(
+        URL_AGENTS_TEST_ROUTE,
+        json=DIAGNOSIS_EVENT,
+        timeout=5
+    )
+
+
+def test_model_info(pending: Optional[Future] = None):
+    """Test getting model information (pending: request already sent, if any)."""
     print_section("Test 1: Get Model Info")
     
     try:
-        response = requests.get(f"{PREDICT_URL}/model-info", timeout=5)
+        response = pending.result() if pending is not None else request_model_info()
         
         if response.status_code == 200:
             data = response.json()
             print("✅ Model info retrieved successfully")
-            print(f"📦 Response:")
-            print(json.dumps(data, indent=2))
+            print_json("📦 Response:", data)
             return True
         else:
             print(f"❌ Status: {response.status_code}")
@@ -45,36 +133,19 @@ def test_model_info():
         return False
 
 
-def test_prediction_low_risk():
-    """Test prediction with low risk features."""
+def test_prediction_low_risk(pending: Optional[Future] = None):
+    """Test prediction with low risk features (pending: request already sent, if any)."""
     print_section("Test 2: Predict Low Risk (Normal Conditions)")
     
-    # Normal operating conditions
-    telematics = {
-        "engine_temp": 90.0,
-        "brake_pad_wear": 8.0,
-        "battery_voltage": 12.8,
-        "vibration": 0.3,
-        "tyre_pressure": 32.0,
-        "odometer": 50000.0,
-        "ambient_temp": 25.0
-    }
-    
-    print(f"📤 Sending telematics:")
-    print(json.dumps(telematics, indent=2))
+    print_json("📤 Sending telematics:", LOW_RISK_TELEMATICS)
     
     try:
-        response = requests.post(
-            f"{PREDICT_URL}/test",
-            json=telematics,
-            timeout=5
-        )
+        response = pending.result() if pending is not None else request_prediction(LOW_RISK_TELEMATICS)
         
         if response.status_code == 200:
             data = response.json()
             print(f"\n✅ Prediction successful")
-            print(f"📦 Response:")
-            print(json.dumps(data, indent=2))
+            print_json("📦 Response:", data)
             
             risk = data["prediction"]["failure_risk"]
             prob = data["prediction"]["probability"]
@@ -89,36 +160,19 @@ def test_prediction_low_risk():
         return False
 
 
-def test_prediction_high_risk():
-    """Test prediction with high risk features."""
+def test_prediction_high_risk(pending: Optional[Future] = None):
+    """Test prediction with high risk features (pending: request already sent, if any)."""
     print_section("Test 3: Predict High Risk (Failure Conditions)")
     
-    # Failure conditions
-    telematics = {
-        "engine_temp": 115.0,  # High temperature
-        "brake_pad_wear": 1.5,  # Low brake pad
-        "battery_voltage": 11.2,  # Low voltage
-        "vibration": 1.3,  # High vibration
-        "tyre_pressure": 24.0,  # Low pressure
-        "odometer": 80000.0,
-        "ambient_temp": 40.0  # High ambient temp
-    }
-    
-    print(f"📤 Sending telematics:")
-    print(json.dumps(telematics, indent=2))
+    print_json("📤 Sending telematics:", HIGH_RISK_TELEMATICS)
     
     try:
-        response = requests.post(
-            f"{PREDICT_URL}/test",
-            json=telematics,
-            timeout=5
-        )
+        response = pending.result() if pending is not None else request_prediction(HIGH_RISK_TELEMATICS)
         
         if response.status_code == 200:
             data = response.json()
             print(f"\n✅ Prediction successful")
-            print(f"📦 Response:")
-            print(json.dumps(data, indent=2))
+            print_json("📦 Response:", data)
             
             risk = data["prediction"]["failure_risk"]
             prob = data["prediction"]["probability"]
@@ -133,41 +187,19 @@ def test_prediction_high_risk():
         return False
 
 
-def test_diagnosis_agent():
-    """Test diagnosis agent with ML integration."""
+def test_diagnosis_agent(pending: Optional[Future] = None):
+    """Test diagnosis agent with ML integration (pending: request already sent, if any)."""
     print_section("Test 4: Diagnosis Agent with ML")
     
-    event = {
-        "type": "predict_failure",
-        "payload": {
-            "vehicle_id": "VEH001",
-            "telematics": {
-                "engine_temp": 110.0,
-                "brake_pad_wear": 2.0,
-                "battery_voltage": 11.5,
-                "vibration": 1.2,
-                "tyre_pressure": 28.0,
-                "odometer": 50000.0,
-                "ambient_temp": 35.0
-            }
-        }
-    }
-    
-    print(f"📤 Sending event to Diagnosis Agent:")
-    print(json.dumps(event, indent=2))
+    print_json("📤 Sending event to Diagnosis Agent:", DIAGNOSIS_EVENT)
     
     try:
-        response = requests.post(
-            f"{BASE_URL}/api/v1/agents/test-route",
-            json=event,
-            timeout=5
-        )
+        response = pending.result() if pending is not None else request_diagnosis()
         
         if response.status_code == 200:
             data = response.json()
             print(f"\n✅ Agent response received")
-            print(f"📦 Response:")
-            print(json.dumps(data, indent=2))
+            print_json("📦 Response:", data)
             return True
         else:
             print(f"❌ Status: {response.status_code}")
@@ -180,6 +212,16 @@ def test_diagnosis_agent():
 
 def main():
     """Run all ML pipeline tests."""
+    global VERBOSE
+    
+    parser = argparse.ArgumentParser(description="Test the AuroraSync OS ML pipeline")
+    parser.add_argument(
+        "-v", "--verbose",
+        action="store_true",
+        help="Print request and response bodies"
+    )
+    VERBOSE = parser.parse_args().verbose
+    
     print("=" * 70)
     print("🧪 AuroraSync OS - ML Pipeline Test Suite")
     print("=" * 70)
@@ -199,17 +241,25 @@ def main():
     
     results = []
     
-    # Test 1: Model Info
-    results.append(("Model Info", test_model_info()))
-    
-    # Test 2: Low Risk Prediction
-    results.append(("Low Risk Prediction", test_prediction_low_risk()))
-    
-    # Test 3: High Risk Prediction
-    results.append(("High Risk Prediction", test_prediction_high_risk()))
-    
-    # Test 4: Diagnosis Agent
-    results.append(("Diagnosis Agent Integration", test_diagnosis_agent()))
+    # The tests are independent: send all requests at once, then report
+    # each result in order
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        model_info = executor.submit(request_model_info)
+        low_risk = executor.submit(request_prediction, LOW_RISK_TELEMATICS)
+        high_risk = executor.submit(request_prediction, HIGH_RISK_TELEMATICS)
+        diagnosis = executor.submit(request_diagnosis)
+        
+        # Test 1: Model Info
+        results.append(("Model Info", test_model_info(model_info)))
+        
+        # Test 2: Low Risk Prediction
+        results.append(("Low Risk Prediction", test_prediction_low_risk(low_risk)))
+        
+        # Test 3: High Risk Prediction
+        results.append(("High Risk Prediction", test_prediction_high_risk(high_risk)))
+        
+        # Test 4: Diagnosis Agent
+        results.append(("Diagnosis Agent Integration", test_diagnosis_agent(diagnosis)))
     
     # Summary
     print_section("Test Summary")
@@ -47,9 +47,15 @@ test_cases = [
     }
 ]
 
-print("=" * 60)
+RULE = "=" * 60
+DIVIDER = "-" * 60
+
+# One line per feature contribution
+CONTRIBUTION_ROW = "    {:20s}: {:8.2f} → Risk: {:.3f} (Weight: {:.3f})"
+
+print(RULE)
 print("ML PREDICTION TEST - Rule-Based Predictor")
-print("=" * 60)
+print(RULE)
 
 # Get model info
 print("\n📊 Model Information:")
@@ -57,16 +63,16 @@ info = get_model_info()
 for key, value in info.items():
     print(f"  {key}: {value}")
 
-# Run test cases
-print("\n" + "=" * 60)
+# Run test cases (all predictions first, then the report)
+results = [predict_failure(test['features']) for test in test_cases]
+
+print("\n" + RULE)
 print("TEST CASES")
-print("=" * 60)
+print(RULE)
 
-for test in test_cases:
+for test, result in zip(test_cases, results):
     print(f"\n🚗 {test['name']}")
-    print("-" * 60)
-    
-    result = predict_failure(test['features'])
+    print(DIVIDER)
     
     print(f"  Risk Level: {result['failure_risk']}")
     print(f"  Probability: {result['probability']:.2%}")
@@ -74,8 +80,10 @@ for test in test_cases:
     
     print("\n  Feature Contributions:")
     for feature, contrib in result['feature_contributions'].items():
-        print(f"    {feature:20s}: {contrib['value']:8.2f} → Risk: {contrib['risk_score']:.3f} (Weight: {contrib['weighted_contribution']:.3f})")
+        print(CONTRIBUTION_ROW.format(
+            feature, contrib['value'], contrib['risk_score'], contrib['weighted_contribution']
+        ))
 
-print("\n" + "=" * 60)
+print("\n" + RULE)
 print("✅ All tests passed! ML predictions working without scikit-learn!")
-print("=" * 60)
+print(RULE)
@@ -5,15 +5,75 @@ Run this to verify predictions are working with mock data.
 
 import requests
 import json
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 BASE_URL = "http://localhost:8000/api/v1"
 
+# Endpoint URLs
+URL_HEALTH = "http://localhost:8000/health"
+URL_PREDICT_MOCK = f"{BASE_URL}/predict/mock"
+URL_PREDICT_BATCH = f"{BASE_URL}/predict/batch"
+URL_MODEL_INFO = f"{BASE_URL}/predict/model-info"
+
+# Shared session: keeps connections to the server alive between tests
+SESSION = requests.Session()
+
+# One vehicle per risk level, in EXPECTED_RISKS order
+BATCH_FEATURES = [
+    {
+        "engine_temp": 110.0,
+        "brake_pad_wear": 2.0,
+        "battery_voltage": 11.5,
+        "vibration": 1.2,
+        "tyre_pressure": 28.0,
+        "odometer": 50000.0,
+        "ambient_temp": 35.0
+    },
+    {
+        "engine_temp": 95.0,
+        "brake_pad_wear": 6.0,
+        "battery_voltage": 12.3,
+        "vibration": 0.8,
+        "tyre_pressure": 32.0,
+        "odometer": 30000.0,
+        "ambient_temp": 25.0
+    },
+    {
+        "engine_temp": 85.0,
+        "brake_pad_wear": 8.0,
+        "battery_voltage": 12.6,
+        "vibration": 0.5,
+        "tyre_pressure": 32.0,
+        "odometer": 20000.0,
+        "ambient_temp": 22.0
+    }
+]
+EXPECTED_RISKS = ["HIGH", "MEDIUM", "LOW"]
+
+# Batch request body, encoded once
+BATCH_BODY = orjson.dumps(BATCH_FEATURES) if orjson is not None else json.dumps(BATCH_FEATURES).encode()
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+def parse_json(response: requests.Response) -> Any:
+    """Decode a JSON response body (with orjson when it is installed)."""
+    if orjson is not None:
+        return orjson.loads(response.content)
+    return response.json()
+
+
 def test_health():
     """Test if backend is running."""
     print("🏥 Testing Backend Health...")
     
     try:
-        response = requests.get("http://localhost:8000/health", timeout=5)
+        response = SESSION.get(URL_HEALTH, timeout=5)
         response.raise_for_status()
         print("✅ Backend is running!")
         return True
@@ -30,15 +90,30 @@ def test_health():
         return False
 
 
-def test_mock_predictions():
-    """Test mock predictions endpoint."""
+def request_mock_predictions() -> requests.Response:
+    """Request mock predictions."""
+    return SESSION.get(URL_PREDICT_MOCK, timeout=5)
+
+
+def request_batch_prediction() -> requests.Response:
+    """Request predictions for all risk levels in one batch."""
+    return SESSION.post(URL_PREDICT_BATCH, data=BATCH_BODY, headers=JSON_HEADERS, timeout=5)
+
+
+def request_model_info() -> requests.Response:
+    """Request model info."""
+    return SESSION.get(URL_MODEL_INFO, timeout=5)
+
+
+def test_mock_predictions(pending: Optional[Future] = None):
+    """Test mock predictions endpoint (pending: request already sent, if any)."""
     print("\n🔮 Testing Mock Predictions...")
     
     try:
-        response = requests.get(f"{BASE_URL}/predict/mock", timeout=5)
+        response = pending.result() if pending is not None else request_mock_predictions()
         response.raise_for_status()
         
-        data = response.json()
+        data = parse_json(response)
         print("✅ Mock predictions successful!")
         print(f"   Total Vehicles: {data['summary']['total_vehicles']}")
         print(f"   High Risk: {data['summary']['high_risk']}")
@@ -60,77 +135,20 @@ def test_mock_predictions():
         print(f"❌ Error: {e}")
 
 
-def test_single_prediction():
-    """Test single prediction endpoint."""
-    print("\n🚗 Testing Single Prediction...")
+def test_all_risk_levels(pending: Optional[Future] = None):
+    """
+    Test predictions for every risk level with one batch request.
     
-    payload = {
-        "engine_temp": 110.0,
-        "brake_pad_wear": 2.0,
-        "battery_voltage": 11.5,
-        "vibration": 1.2,
-        "tyre_pressure": 28.0,
-        "odometer": 50000.0,
-        "ambient_temp": 35.0
-    }
+    Args:
+        pending: Request already sent with request_batch_prediction, if any
+    """
+    print("\n📦 Testing Batch Prediction (all risk levels)...")
     
     try:
-        response = requests.post(f"{BASE_URL}/predict/test", json=payload, timeout=5)
+        response = pending.result() if pending is not None else request_batch_prediction()
         response.raise_for_status()
         
-        data = response.json()
-        pred = data['prediction']
-        
-        print("✅ Single prediction successful!")
-        print(f"   Risk Level: {pred['failure_risk']}")
-        print(f"   Probability: {pred['probability']}")
-        print(f"   Component: {pred['component']}")
-        print(f"   Days Until Failure: {pred['days_until_failure']}")
-        print(f"   Action: {pred['recommended_action']}")
-    
-    except Exception as e:
-        print(f"❌ Error: {e}")
-
-
-def test_batch_prediction():
-    """Test batch prediction endpoint."""
-    print("\n📦 Testing Batch Prediction...")
-    
-    payload = [
-        {
-            "engine_temp": 110.0,
-            "brake_pad_wear": 2.0,
-            "battery_voltage": 11.5,
-            "vibration": 1.2,
-            "tyre_pressure": 28.0,
-            "odometer": 50000.0,
-            "ambient_temp": 35.0
-        },
-        {
-            "engine_temp": 95.0,
-            "brake_pad_wear": 6.0,
-            "battery_voltage": 12.3,
-            "vibration": 0.8,
-            "tyre_pressure": 32.0,
-            "odometer": 30000.0,
-            "ambient_temp": 25.0
-        },
-        {
-            "engine_temp": 85.0,
-            "brake_pad_wear": 8.0,
-            "battery_voltage": 12.6,
-            "vibration": 0.5,
-            "tyre_pressure": 32.0,
-            "odometer": 20000.0,
-            "ambient_temp": 22.0
-        }
-    ]
-    
-    try:
-        response = requests.post(f"{BASE_URL}/predict/batch", json=payload, timeout=5)
-        response.raise_for_status()
-        
-        data = response.json()
+        data = parse_json(response)
         summary = data['summary']
         
         print("✅ Batch prediction successful!")
@@ -138,20 +156,29 @@ def test_batch_prediction():
         print(f"   High Risk: {summary['high_risk']}")
         print(f"   Medium Risk: {summary['medium_risk']}")
         print(f"   Low Risk: {summary['low_risk']}")
+        
+        for expected, item in zip(EXPECTED_RISKS, data['predictions']):
+            pred = item['prediction']
+            mark = "✅" if pred['failure_risk'] == expected else "❌"
+            print(f"\n   {mark} Expected {expected}, got {pred['failure_risk']}")
+            print(f"   - Probability: {pred['probability']}")
+            print(f"   - Component: {pred['component']}")
+            print(f"   - Days Until Failure: {pred['days_until_failure']}")
+            print(f"   - Action: {pred['recommended_action']}")
     
     except Exception as e:
         print(f"❌ Error: {e}")
 
 
-def test_model_info():
-    """Test model info endpoint."""
+def test_model_info(pending: Optional[Future] = None):
+    """Test model info endpoint (pending: request already sent, if any)."""
     print("\n📊 Testing Model Info...")
     
     try:
-        response = requests.get(f"{BASE_URL}/predict/model-info", timeout=5)
+        response = pending.result() if pending is not None else request_model_info()
         response.raise_for_status()
         
-        data = response.json()
+        data = parse_json(response)
         
         print("✅ Model info retrieved!")
         print(f"   Model Type: {data['model_type']}")
@@ -174,11 +201,16 @@ if __name__ == "__main__":
         print("\n⚠️  Please start the backend server first!")
         exit(1)
     
-    # Test all endpoints
-    test_mock_predictions()
-    test_single_prediction()
-    test_batch_prediction()
-    test_model_info()
+    # Test all endpoints: the requests are independent, so send them all at
+    # once and report each result in order
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        mock = executor.submit(request_mock_predictions)
+        batch = executor.submit(request_batch_prediction)
+        model_info = executor.submit(request_model_info)
+        
+        test_mock_predictions(mock)
+        test_all_risk_levels(batch)
+        test_model_info(model_info)
     
     print("\n" + "=" * 60)
     print("✅ All prediction tests complete!")
@@ -0,0 +1,82 @@
+"""
+Quick test script for shared slot booking.
+Two slot managers (two API workers) share one fake Redis and must never
+both confirm the same slot. Needs the optional redis and fakeredis
+packages (see requirements.txt); skipped when they are not installed.
+"""
+
+import sys
+sys.path.insert(0, '.')
+
+from datetime import datetime, timedelta
+
+try:
+    import fakeredis
+except ImportError:
+    fakeredis = None
+
+from app.scheduling.slot_manager import SlotManager
+from app.scheduling.state_store import RedisStateStore
+from app.scheduling.workshop_manager import get_workshop_manager
+
+WORKSHOP_ID = "WS-MUM-01"
+
+
+def make_managers():
+    """Create two slot managers backed by the same fake Redis."""
+    store = RedisStateStore(fakeredis.FakeRedis())
+    managers = []
+    for _ in range(2):
+        manager = SlotManager()
+        manager._state_store = store
+        managers.append(manager)
+    return managers
+
+
+def test_no_double_booking():
+    """Only the first of two workers booking the same slot gets a confirmation."""
+    first, second = make_managers()
+    slot_time = (datetime.now() + timedelta(days=1)).replace(hour=10, minute=0, second=0, microsecond=0)
+    
+    booking = first.book_slot(WORKSHOP_ID, slot_time, "VEH001", "brakes")
+    assert booking is not None and booking["status"] == "confirmed"
+    
+    conflict = second.book_slot(WORKSHOP_ID, slot_time, "VEH002", "brakes")
+    assert conflict is None, "second worker double-booked the slot"
+    print("✅ Second worker was refused the booked slot")
+
+
+def test_next_search_skips_taken_slot():
+    """After a conflict the other worker's next search offers a different slot."""
+    first, second = make_managers()
+    workshop_data = get_workshop_manager().WORKSHOPS[WORKSHOP_ID]
+    
+    # Both workers see the same optimal slot before either books it
+    slot_a = first.find_optimal_slot(WORKSHOP_ID, workshop_data, "medium")
+    slot_b = second.find_optimal_slot(WORKSHOP_ID, workshop_data, "medium")
+    assert slot_a["slot_time"] == slot_b["slot_time"]
+    
+    assert first.book_slot(WORKSHOP_ID, slot_a["slot_datetime"], "VEH001", "brakes") is not None
+    assert second.book_slot(WORKSHOP_ID, slot_b["slot_datetime"], "VEH002", "brakes") is None
+    
+    retry = second.find_optimal_slot(WORKSHOP_ID, workshop_data, "medium")
+    assert retry["slot_time"] != slot_a["slot_time"]
+    assert second.book_slot(WORKSHOP_ID, retry["slot_datetime"], "VEH002", "brakes") is not None
+    print(f"✅ Second worker moved on to {retry['slot_time']}")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("🧪 Shared Slot Booking Tests")
+    print("=" * 60)
+    
+    if fakeredis is None:
+        print("\n⏭️  Skipping: install redis and fakeredis to run these tests")
+        exit(0)
+    
+    test_no_double_booking()
+    test_next_search_skips_taken_slot()
+    
+    print("\n" + "=" * 60)
+    print("✅ Slot booking tests complete!")
+    print("=" * 60)
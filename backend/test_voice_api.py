@@ -8,6 +8,9 @@ import json
 
 BASE_URL = "http://localhost:8000/api/v1"
 
+# Shared session: keeps connections to the server alive between tests
+SESSION = requests.Session()
+
 def test_voice_engage():
     """Test voice engagement endpoint."""
     print("\n🎤 Testing Voice Engagement...")
@@ -32,7 +35,7 @@ def test_voice_engage():
     }
     
     try:
-        response = requests.post(f"{BASE_URL}/voice/engage", json=payload, timeout=5)
+        response = SESSION.post(f"{BASE_URL}/voice/engage", json=payload, timeout=5)
         response.raise_for_status()
         
         data = response.json()
@@ -66,7 +69,7 @@ def test_voice_continue(conversation_id):
     }
     
     try:
-        response = requests.post(f"{BASE_URL}/voice/continue", json=payload, timeout=5)
+        response = SESSION.post(f"{BASE_URL}/voice/continue", json=payload, timeout=5)
         response.raise_for_status()
         
         data = response.json()
@@ -79,12 +82,40 @@ def test_voice_continue(conversation_id):
         print(f"❌ Error: {e}")
 
 
+def test_tts_audio_url():
+    """Test that the audio URL returned by /tts can be fetched."""
+    print("\n🔊 Testing TTS Audio URL...")
+    
+    try:
+        response = SESSION.post(
+            f"{BASE_URL}/voice/tts",
+            params={"text": "Your service is booked", "sample_rate": 8000},
+            timeout=5
+        )
+        response.raise_for_status()
+        audio = response.json()["audio"]
+        
+        response = SESSION.get(f"http://localhost:8000{audio['audio_url']}", timeout=5)
+        response.raise_for_status()
+        
+        data = response.json()
+        assert data["audio_id"] == audio["audio_id"]
+        assert data["sample_rate"] == audio["sample_rate"]
+        assert data["codec"] == audio["codec"]
+        print("✅ Audio URL served!")
+        print(f"   URL: {audio['audio_url']}")
+        print(f"   Format: {data['sample_rate']} Hz {data['codec']}")
+    
+    except Exception as e:
+        print(f"❌ Error: {e}")
+
+
 def test_health():
     """Test if backend is running."""
     print("🏥 Testing Backend Health...")
     
     try:
-        response = requests.get("http://localhost:8000/health", timeout=5)
+        response = SESSION.get("http://localhost:8000/health", timeout=5)
         response.raise_for_status()
         print("✅ Backend is running!")
         return True
@@ -117,6 +148,9 @@ if __name__ == "__main__":
     # Test continuation
     test_voice_continue(conversation_id)
     
+    # Test audio URL
+    test_tts_audio_url()
+    
     print("\n" + "=" * 60)
     print("✅ Voice AI tests complete!")
     print("=" * 60)
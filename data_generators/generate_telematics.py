@@ -10,14 +10,11 @@ Usage:
 
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
 import os
 
 
-# Set random seed for reproducibility
-np.random.seed(42)
-
 # Configuration
+RANDOM_SEED = 42  # For reproducibility
 NUM_VEHICLES = 10
 ROWS_PER_VEHICLE = 2000
 OUTPUT_PATH = "ml_models/datasets/telematics_logs.csv"
@@ -25,31 +22,49 @@ OUTPUT_PATH = "ml_models/datasets/telematics_logs.csv"
 # Vehicle IDs
 VEHICLE_IDS = [f"VEH{i:03d}" for i in range(1, NUM_VEHICLES + 1)]
 
-# Failure components
+# Failure components (a component's code is its index)
 FAILURE_COMPONENTS = ["none", "brake", "engine", "battery", "tyre"]
+COMPONENT_CODES = {component: code for code, component in enumerate(FAILURE_COMPONENTS)}
+
+# Telematics features, in dataset column order
+FEATURE_COLUMNS = [
+    "engine_temp", "brake_pad_wear", "battery_voltage", "vibration",
+    "tyre_pressure", "odometer", "ambient_temp"
+]
+
+# Realistic (min, max) range of each clipped feature
+CLIP_RANGES = {
+    "engine_temp": (60, 130),
+    "brake_pad_wear": (0, 12),
+    "battery_voltage": (10.5, 14.0),
+    "vibration": (0, 2.0),
+    "tyre_pressure": (20, 45),
+    "ambient_temp": (5, 50)
+}
 
 
-def generate_normal_data(n_rows: int) -> dict:
+def generate_normal_data(rng: np.random.Generator, n_rows: int) -> dict:
     """
     Generate normal operating conditions data.
     
     Args:
+        rng: Random number generator
         n_rows: Number of rows to generate
     
     Returns:
         Dictionary with normal telematics data
     """
     return {
-        "engine_temp": np.random.normal(90, 5, n_rows),  # Mean 90°C, std 5
-        "brake_pad_wear": np.random.normal(8.0, 1.0, n_rows),  # Mean 8mm, std 1mm
-        "battery_voltage": np.random.normal(12.8, 0.2, n_rows),  # Mean 12.8V
-        "vibration": np.random.uniform(0.1, 0.4, n_rows),  # Low vibration
-        "tyre_pressure": np.random.normal(32, 1.5, n_rows),  # Mean 32 PSI
-        "ambient_temp": np.random.normal(25, 8, n_rows),  # Mean 25°C
+        "engine_temp": rng.normal(90, 5, n_rows),  # Mean 90°C, std 5
+        "brake_pad_wear": rng.normal(8.0, 1.0, n_rows),  # Mean 8mm, std 1mm
+        "battery_voltage": rng.normal(12.8, 0.2, n_rows),  # Mean 12.8V
+        "vibration": rng.uniform(0.1, 0.4, n_rows),  # Low vibration
+        "tyre_pressure": rng.normal(32, 1.5, n_rows),  # Mean 32 PSI
+        "ambient_temp": rng.normal(25, 8, n_rows),  # Mean 25°C
     }
 
 
-def inject_brake_failure_pattern(data: dict, indices: np.ndarray) -> None:
+def inject_brake_failure_pattern(rng: np.random.Generator, data: dict, indices: np.ndarray) -> None:
     """
     Inject brake failure pattern into data.
     
@@ -57,11 +72,11 @@ def inject_brake_failure_pattern(data: dict, indices: np.ndarray) -> None:
     - Low brake pad wear (< 3mm)
     - Elevated vibration (> 0.8)
     """
-    data["brake_pad_wear"][indices] = np.random.uniform(0.5, 2.5, len(indices))
-    data["vibration"][indices] = np.random.uniform(0.8, 1.5, len(indices))
+    data["brake_pad_wear"][indices] = rng.uniform(0.5, 2.5, len(indices))
+    data["vibration"][indices] = rng.uniform(0.8, 1.5, len(indices))
 
 
-def inject_engine_failure_pattern(data: dict, indices: np.ndarray) -> None:
+def inject_engine_failure_pattern(rng: np.random.Generator, data: dict, indices: np.ndarray) -> None:
     """
     Inject engine failure pattern into data.
     
@@ -69,22 +84,22 @@ def inject_engine_failure_pattern(data: dict, indices: np.ndarray) -> None:
     - High engine temperature (> 105°C)
     - Often correlated with high ambient temp
     """
-    data["engine_temp"][indices] = np.random.uniform(105, 120, len(indices))
+    data["engine_temp"][indices] = rng.uniform(105, 120, len(indices))
     # Sometimes high ambient temp contributes
-    data["ambient_temp"][indices] += np.random.uniform(5, 15, len(indices))
+    data["ambient_temp"][indices] += rng.uniform(5, 15, len(indices))
 
 
-def inject_battery_failure_pattern(data: dict, indices: np.ndarray) -> None:
+def inject_battery_failure_pattern(rng: np.random.Generator, data: dict, indices: np.ndarray) -> None:
     """
     Inject battery failure pattern into data.
     
     Pattern:
     - Low battery voltage (< 12.0V)
     """
-    data["battery_voltage"][indices] = np.random.uniform(11.0, 11.9, len(indices))
+    data["battery_voltage"][indices] = rng.uniform(11.0, 11.9, len(indices))
 
 
-def inject_tyre_failure_pattern(data: dict, indices: np.ndarray) -> None:
+def inject_tyre_failure_pattern(rng: np.random.Generator, data: dict, indices: np.ndarray) -> None:
     """
     Inject tyre failure pattern into data.
     
@@ -93,98 +108,160 @@ def inject_tyre_failure_pattern(data: dict, indices: np.ndarray) -> None:
     """
     # Half too low, half too high
     half = len(indices) // 2
-    data["tyre_pressure"][indices[:half]] = np.random.uniform(22, 26, half)
-    data["tyre_pressure"][indices[half:]] = np.random.uniform(38, 42, len(indices) - half)
+    data["tyre_pressure"][indices[:half]] = rng.uniform(22, 26, half)
+    data["tyre_pressure"][indices[half:]] = rng.uniform(38, 42, len(indices) - half)
 
 
-def generate_vehicle_data(vehicle_id: str, n_rows: int) -> pd.DataFrame:
+def generate_fleet_data(rng: np.random.Generator, arrays: dict, n_vehicles: int, rows_per_vehicle: int) -> None:
     """
-    Generate telematics data for a single vehicle.
+    Generate telematics data for all vehicles in place.
     
-    Args:
-        vehicle_id: Vehicle identifier
-        n_rows: Number of rows to generate
+    Every draw covers the whole fleet at once; only the odometer and the
+    failure rate are tracked per vehicle.
     
-    Returns:
-        DataFrame with vehicle telematics data
+    Args:
+        rng: Random number generator
+        arrays: Column arrays for all vehicles (see allocate_arrays)
+        n_vehicles: Number of vehicles
+        rows_per_vehicle: Rows per vehicle
     """
-    # Generate timestamps (one reading every 30 minutes over ~40 days)
-    start_date = datetime(2025, 11, 1, 0, 0, 0)
-    timestamps = [start_date + timedelta(minutes=30*i) for i in range(n_rows)]
+    n_rows = n_vehicles * rows_per_vehicle
     
     # Generate normal data
-    data = generate_normal_data(n_rows)
+    for column, values in generate_normal_data(rng, n_rows).items():
+        arrays[column][:] = values
     
-    # Generate cumulative odometer (increases over time)
+    # Generate cumulative odometer (increases over time, restarting at each vehicle)
     # Average ~50 km per day
-    daily_km = np.random.normal(50, 10, n_rows)
-    daily_km = np.maximum(daily_km, 0)  # No negative km
-    data["odometer"] = np.cumsum(daily_km / 48)  # 48 readings per day
-    
-    # Initialize failure flags
-    failure_flag = np.zeros(n_rows, dtype=int)
-    failure_component = np.array(["none"] * n_rows)
-    
-    # Inject failures (5-10% of data)
-    failure_rate = np.random.uniform(0.05, 0.10)
-    n_failures = int(n_rows * failure_rate)
-    
-    if n_failures > 0:
-        # Randomly select failure indices
-        failure_indices = np.random.choice(n_rows, n_failures, replace=False)
-        
-        # Distribute failures across components
-        # Brake: 40%, Engine: 25%, Battery: 20%, Tyre: 15%
-        component_probs = [0.40, 0.25, 0.20, 0.15]
-        components = ["brake", "engine", "battery", "tyre"]
-        
-        for idx in failure_indices:
-            # Select failure component
-            component = np.random.choice(components, p=component_probs)
-            failure_component[idx] = component
-            failure_flag[idx] = 1
-        
-        # Inject failure patterns
-        brake_indices = failure_indices[failure_component[failure_indices] == "brake"]
-        engine_indices = failure_indices[failure_component[failure_indices] == "engine"]
-        battery_indices = failure_indices[failure_component[failure_indices] == "battery"]
-        tyre_indices = failure_indices[failure_component[failure_indices] == "tyre"]
-        
-        if len(brake_indices) > 0:
-            inject_brake_failure_pattern(data, brake_indices)
-        if len(engine_indices) > 0:
-            inject_engine_failure_pattern(data, engine_indices)
-        if len(battery_indices) > 0:
-            inject_battery_failure_pattern(data, battery_indices)
-        if len(tyre_indices) > 0:
-            inject_tyre_failure_pattern(data, tyre_indices)
-    
-    # Create DataFrame
+    # (in place: one scratch array, summed straight into the odometer column)
+    daily_km = rng.normal(50, 10, (n_vehicles, rows_per_vehicle))
+    np.maximum(daily_km, 0, out=daily_km)  # No negative km
+    daily_km /= 48  # 48 readings per day
+    np.cumsum(daily_km, axis=1, out=arrays["odometer"].reshape(n_vehicles, rows_per_vehicle))
+    
+    # Failure flags and components (int8 codes, 0 = none) start zeroed
+    failure_flag = arrays["failure_flag"]
+    failure_component = arrays["failure_component"]
+    
+    # Inject failures (5-10% of each vehicle's data)
+    failure_rates = rng.uniform(0.05, 0.10, n_vehicles)
+    n_failures = (rows_per_vehicle * failure_rates).astype(int)
+    
+    # Randomly select failure indices: each vehicle's n_failures rows with
+    # the lowest random keys, shuffled so patterns split evenly across vehicles
+    keys = rng.random((n_vehicles, rows_per_vehicle))
+    ranks = keys.argsort(axis=1).argsort(axis=1)
+    failure_indices = rng.permutation(np.flatnonzero(ranks < n_failures[:, None]))
+    
+    # Distribute failures across components
+    # Brake: 40%, Engine: 25%, Battery: 20%, Tyre: 15%
+    component_probs = [0.40, 0.25, 0.20, 0.15]
+    component_codes = [COMPONENT_CODES[component] for component in ("brake", "engine", "battery", "tyre")]
+    
+    # Select all failure components in one draw
+    failure_component[failure_indices] = rng.choice(
+        component_codes, size=len(failure_indices), p=component_probs
+    )
+    failure_flag[failure_indices] = 1
+    
+    # Inject failure patterns
+    failure_codes = failure_component[failure_indices]
+    brake_indices = failure_indices[failure_codes == COMPONENT_CODES["brake"]]
+    engine_indices = failure_indices[failure_codes == COMPONENT_CODES["engine"]]
+    battery_indices = failure_indices[failure_codes == COMPONENT_CODES["battery"]]
+    tyre_indices = failure_indices[failure_codes == COMPONENT_CODES["tyre"]]
+    
+    if len(brake_indices) > 0:
+        inject_brake_failure_pattern(rng, arrays, brake_indices)
+    if len(engine_indices) > 0:
+        inject_engine_failure_pattern(rng, arrays, engine_indices)
+    if len(battery_indices) > 0:
+        inject_battery_failure_pattern(rng, arrays, battery_indices)
+    if len(tyre_indices) > 0:
+        inject_tyre_failure_pattern(rng, arrays, tyre_indices)
+
+
+def allocate_arrays(n_rows: int) -> dict:
+    """
+    Allocate the generated columns for all vehicles.
+    
+    Args:
+        n_rows: Total number of rows
+    
+    Returns:
+        Dictionary of column arrays (float32 features uninitialized,
+        failures zeroed)
+    """
+    # float32 features: ample precision for these ranges (odometer stays
+    # well under 2**24 km), half the memory and CSV formatting work
+    arrays = {column: np.empty(n_rows, dtype=np.float32) for column in FEATURE_COLUMNS}
+    arrays["failure_flag"] = np.zeros(n_rows, dtype=int)
+    arrays["failure_component"] = np.zeros(n_rows, dtype=np.int8)
+    return arrays
+
+
+def build_dataframe(arrays: dict, n_vehicles: int, rows_per_vehicle: int) -> pd.DataFrame:
+    """
+    Build the dataset from the filled column arrays.
+    
+    Args:
+        arrays: Filled column arrays (features are clipped in place)
+        n_vehicles: Number of vehicles
+        rows_per_vehicle: Rows per vehicle
+    
+    Returns:
+        DataFrame with telematics data for all vehicles
+    """
+    # Generate timestamps (one reading every 30 minutes over ~40 days),
+    # the same for every vehicle
+    start_date = np.datetime64("2025-11-01T00:00:00")
+    timestamps = start_date + np.arange(rows_per_vehicle) * np.timedelta64(30, "m")
+    timestamps = np.char.add(np.datetime_as_string(timestamps, unit="s"), "Z")
+    
+    # Clip values to realistic ranges (in place, before pandas sees them)
+    for column, (low, high) in CLIP_RANGES.items():
+        np.clip(arrays[column], low, high, out=arrays[column])
+    
     df = pd.DataFrame({
-        "vehicle_id": vehicle_id,
-        "timestamp": [ts.isoformat() + "Z" for ts in timestamps],
-        "engine_temp": data["engine_temp"],
-        "brake_pad_wear": data["brake_pad_wear"],
-        "battery_voltage": data["battery_voltage"],
-        "vibration": data["vibration"],
-        "tyre_pressure": data["tyre_pressure"],
-        "odometer": data["odometer"],
-        "ambient_temp": data["ambient_temp"],
-        "failure_flag": failure_flag,
-        "failure_component": failure_component
+        "vehicle_id": pd.Categorical.from_codes(
+            np.repeat(np.arange(n_vehicles, dtype=np.int8), rows_per_vehicle),
+            categories=VEHICLE_IDS[:n_vehicles]
+        ),
+        "timestamp": np.tile(timestamps, n_vehicles),
+        **{column: arrays[column] for column in FEATURE_COLUMNS},
+        "failure_flag": arrays["failure_flag"],
+        "failure_component": pd.Categorical.from_codes(arrays["failure_component"], categories=FAILURE_COMPONENTS)
     })
     
-    # Clip values to realistic ranges
-    df["engine_temp"] = df["engine_temp"].clip(60, 130)
-    df["brake_pad_wear"] = df["brake_pad_wear"].clip(0, 12)
-    df["battery_voltage"] = df["battery_voltage"].clip(10.5, 14.0)
-    df["vibration"] = df["vibration"].clip(0, 2.0)
-    df["tyre_pressure"] = df["tyre_pressure"].clip(20, 45)
-    df["ambient_temp"] = df["ambient_temp"].clip(5, 50)
-    
     return df
 
 
+def save_csv(df: pd.DataFrame, path: str) -> None:
+    """
+    Save the dataset as CSV.
+    
+    Uses PyArrow's multi-threaded C++ CSV writer when PyArrow is installed,
+    and pandas' writer otherwise.
+    
+    Args:
+        df: Dataset
+        path: Output CSV path
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.csv as pacsv
+    except ImportError:
+        df.to_csv(path, index=False)
+        return
+    
+    # Write categorical columns as plain strings rather than dictionary columns
+    df = df.assign(
+        vehicle_id=df["vehicle_id"].astype(str),
+        failure_component=df["failure_component"].astype(str)
+    )
+    pacsv.write_csv(pa.Table.from_pandas(df, preserve_index=False), path)
+
+
 def main():
     """Generate synthetic telematics data for all vehicles."""
     print("=" * 70)
@@ -196,25 +273,22 @@ def main():
     print(f"Rows per vehicle: {ROWS_PER_VEHICLE}")
     print()
     
-    # Generate data for all vehicles
-    all_data = []
-    for vehicle_id in VEHICLE_IDS:
-        print(f"  Generating data for {vehicle_id}...", end=" ")
-        df = generate_vehicle_data(vehicle_id, ROWS_PER_VEHICLE)
-        all_data.append(df)
-        print("✓")
+    # Generate data for all vehicles at once into shared column arrays,
+    # drawing from one seeded generator
+    rng = np.random.default_rng(RANDOM_SEED)
+    arrays = allocate_arrays(NUM_VEHICLES * ROWS_PER_VEHICLE)
+    generate_fleet_data(rng, arrays, NUM_VEHICLES, ROWS_PER_VEHICLE)
     
-    # Combine all data
-    print()
+    # Build the dataset in one step
     print("Combining data...")
-    combined_df = pd.concat(all_data, ignore_index=True)
+    combined_df = build_dataframe(arrays, NUM_VEHICLES, ROWS_PER_VEHICLE)
     
     # Create output directory if it doesn't exist
     os.makedirs(os.path.dirname(OUTPUT_PATH), exist_ok=True)
     
     # Save to CSV
     print(f"Saving to {OUTPUT_PATH}...")
-    combined_df.to_csv(OUTPUT_PATH, index=False)
+    save_csv(combined_df, OUTPUT_PATH)
     
     # Print statistics
     print()
@@ -233,7 +307,7 @@ def main():
     
     print("Failures by Component:")
     failure_counts = combined_df[combined_df['failure_flag'] == 1]['failure_component'].value_counts()
-    for component, count in failure_counts.items():
+    for component, count in failure_counts[failure_counts > 0].items():
         print(f"  {component.capitalize()}: {count:,} ({count / (combined_df['failure_flag'] == 1).sum() * 100:.1f}%)")
     print()
     
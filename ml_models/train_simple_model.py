@@ -8,22 +8,17 @@ Usage:
     python ml_models/train_simple_model.py
 """
 
-import pandas as pd
 import numpy as np
-from sklearn.model_selection import train_test_split
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.metrics import (
-    accuracy_score,
-    precision_score,
-    recall_score,
-    f1_score,
-    confusion_matrix,
-    classification_report
-)
-import joblib
 import json
 import os
 from datetime import datetime
+from typing import Optional, TYPE_CHECKING
+
+# pandas, scikit-learn and joblib are imported where they are used, so a
+# missing dataset is reported without paying for those imports
+if TYPE_CHECKING:
+    import pandas as pd
+    from sklearn.ensemble import RandomForestClassifier
 
 
 # Configuration
@@ -47,30 +42,120 @@ TARGET_COLUMN = "failure_flag"
 
 # Model hyperparameters
 RANDOM_STATE = 42
-TEST_SIZE = 0.2
 N_ESTIMATORS = 100
-MAX_DEPTH = None  # No limit
+MAX_DEPTH = 16
+MAX_LEAF_NODES = 1024
 MIN_SAMPLES_SPLIT = 5
-MIN_SAMPLES_LEAF = 2
+MIN_SAMPLES_LEAF = 2  # Raised by one per MIN_SAMPLES_LEAF_ROWS training rows
+MIN_SAMPLES_LEAF_ROWS = 10000
+MAX_SAMPLES = 0.2  # Fraction of training rows bootstrapped per tree
+
+# Model file compression (zlib level; joblib.load detects it)
+MODEL_COMPRESS = 3
+
+
+def read_csv(path: str, dtypes: dict) -> "pd.DataFrame":
+    """
+    Read typed columns from a CSV file.
+    
+    Uses PyArrow's multi-threaded C++ CSV reader when PyArrow is installed,
+    and pandas' reader otherwise.
+    
+    Args:
+        path: Path to CSV file
+        dtypes: NumPy dtype of each column to read
+    
+    Returns:
+        DataFrame with the requested columns
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.csv as pacsv
+    except ImportError:
+        import pandas as pd
+        
+        return pd.read_csv(path, usecols=list(dtypes), dtype=dtypes, engine="c")
+    
+    convert_options = pacsv.ConvertOptions(
+        column_types={column: pa.from_numpy_dtype(dtype) for column, dtype in dtypes.items()},
+        include_columns=list(dtypes)
+    )
+    return pacsv.read_csv(path, convert_options=convert_options).to_pandas()
+
+
+def parquet_cache_path(path: str) -> str:
+    """Get the path of the Parquet cache kept next to a CSV file."""
+    return os.path.splitext(path)[0] + ".parquet"
+
+
+def read_parquet_cache(path: str, columns: list) -> Optional["pd.DataFrame"]:
+    """
+    Read columns from the Parquet cache of a CSV file.
+    
+    Args:
+        path: Path to CSV file
+        columns: Columns to read
+    
+    Returns:
+        Cached DataFrame (memory-mapped), or None when PyArrow is not
+        installed or the cache is missing or older than the CSV
+    """
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return None
+    
+    cache_path = parquet_cache_path(path)
+    if not os.path.exists(cache_path) or os.path.getmtime(cache_path) < os.path.getmtime(path):
+        return None
+    
+    import pandas as pd
+    
+    return pd.read_parquet(cache_path, engine="pyarrow", columns=columns, memory_map=True)
+
+
+def write_parquet_cache(df: "pd.DataFrame", path: str) -> None:
+    """
+    Write the Parquet cache of a CSV file (skipped without PyArrow).
+    
+    Args:
+        df: Data parsed from the CSV
+        path: Path to CSV file
+    """
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return
+    
+    df.to_parquet(parquet_cache_path(path), engine="pyarrow", compression="snappy", index=False)
 
 
-def load_data(path: str) -> pd.DataFrame:
+def load_data(path: str) -> "pd.DataFrame":
     """
     Load telematics data from CSV.
     
+    Only the feature and target columns are read, parsed straight into
+    float32 features and an int8 target. The parsed columns are cached as
+    Parquet next to the CSV, so later runs skip parsing until the CSV changes.
+    
     Args:
         path: Path to CSV file
     
     Returns:
-        DataFrame with telematics data
+        DataFrame with the feature and target columns
     """
     print(f"Loading data from {path}...")
-    df = pd.read_csv(path)
+    dtypes = {column: np.float32 for column in FEATURE_COLUMNS}
+    dtypes[TARGET_COLUMN] = np.int8
+    df = read_parquet_cache(path, list(dtypes))
+    if df is None:
+        df = read_csv(path, dtypes)
+        write_parquet_cache(df, path)
     print(f"  Loaded {len(df):,} rows")
     return df
 
 
-def prepare_data(df: pd.DataFrame) -> tuple:
+def prepare_data(df: "pd.DataFrame") -> tuple:
     """
     Prepare data for training.
     
@@ -78,34 +163,83 @@ def prepare_data(df: pd.DataFrame) -> tuple:
         df: Raw DataFrame
     
     Returns:
-        Tuple of (X, y) where X is features and y is target
+        Tuple of (X, y) where X is a C-contiguous float32 feature matrix
+        (the layout the tree builder reads without copying) and y is the
+        target
     """
     print("\nPreparing data...")
     
-    # Check for missing values
-    missing = df[FEATURE_COLUMNS + [TARGET_COLUMN]].isnull().sum()
-    if missing.any():
+    # Extract features and target
+    X = np.ascontiguousarray(df[FEATURE_COLUMNS].to_numpy(copy=False), dtype=np.float32)
+    y = df[TARGET_COLUMN].to_numpy(dtype=np.int8)
+    
+    # Check for missing values (only features can have any: the target is
+    # parsed as int8)
+    missing = np.isnan(X)
+    missing_rows = missing.any(axis=1)
+    if missing_rows.any():
         print("  Warning: Missing values detected:")
-        print(missing[missing > 0])
+        for column, count in zip(FEATURE_COLUMNS, missing.sum(axis=0)):
+            if count:
+                print(f"    {column}: {count:,}")
         print("  Dropping rows with missing values...")
-        df = df.dropna(subset=FEATURE_COLUMNS + [TARGET_COLUMN])
+        X = X[~missing_rows]
+        y = y[~missing_rows]
     
-    # Extract features and target
-    X = df[FEATURE_COLUMNS].copy()
-    y = df[TARGET_COLUMN].copy()
+    # Count both classes in one pass
+    normals, failures = np.bincount(y, minlength=2)[:2]
     
     print(f"  Features: {len(FEATURE_COLUMNS)}")
     print(f"  Samples: {len(X):,}")
-    print(f"  Failures: {y.sum():,} ({y.sum() / len(y) * 100:.2f}%)")
-    print(f"  Normal: {(y == 0).sum():,} ({(y == 0).sum() / len(y) * 100:.2f}%)")
+    print(f"  Failures: {failures:,} ({failures / len(y) * 100:.2f}%)")
+    print(f"  Normal: {normals:,} ({normals / len(y) * 100:.2f}%)")
     
     return X, y
 
 
-def train_model(X_train: pd.DataFrame, y_train: pd.Series) -> RandomForestClassifier:
+def load_previous_model(model: "RandomForestClassifier") -> Optional["RandomForestClassifier"]:
+    """
+    Load the saved model if it can be grown into model by adding trees.
+    
+    That is the case when it was trained after the current dataset was
+    written, has the same hyperparameters and has fewer trees.
+    
+    Args:
+        model: Unfitted model to train
+    
+    Returns:
+        Previously saved model, or None to train from scratch
+    """
+    import joblib
+    from sklearn.ensemble import RandomForestClassifier
+    
+    if not os.path.exists(MODEL_OUTPUT_PATH):
+        return None
+    if os.path.getmtime(MODEL_OUTPUT_PATH) < os.path.getmtime(DATA_PATH):
+        return None
+    
+    previous = joblib.load(MODEL_OUTPUT_PATH)
+    if not isinstance(previous, RandomForestClassifier):
+        return None
+    if previous.n_estimators >= model.n_estimators:
+        return None
+    
+    # Every other hyperparameter must match
+    params = previous.get_params()
+    params["n_estimators"] = model.n_estimators
+    if params != model.get_params():
+        return None
+    
+    return previous
+
+
+def train_model(X_train: np.ndarray, y_train: np.ndarray) -> "RandomForestClassifier":
     """
     Train RandomForest classifier.
     
+    When the saved model fits the same data with fewer trees (see
+    load_previous_model), only the missing trees are grown.
+    
     Args:
         X_train: Training features
         y_train: Training target
@@ -113,52 +247,133 @@ def train_model(X_train: pd.DataFrame, y_train: pd.Series) -> RandomForestClassi
     Returns:
         Trained model
     """
+    import joblib
+    from sklearn.ensemble import RandomForestClassifier
+    
+    # Scale the leaf size with the data to keep deep branches regularized
+    min_samples_leaf = max(MIN_SAMPLES_LEAF, len(X_train) // MIN_SAMPLES_LEAF_ROWS)
+    
     print("\nTraining RandomForest model...")
     print(f"  n_estimators: {N_ESTIMATORS}")
     print(f"  max_depth: {MAX_DEPTH}")
+    print(f"  max_leaf_nodes: {MAX_LEAF_NODES}")
     print(f"  min_samples_split: {MIN_SAMPLES_SPLIT}")
-    print(f"  min_samples_leaf: {MIN_SAMPLES_LEAF}")
+    print(f"  min_samples_leaf: {min_samples_leaf}")
+    print(f"  max_samples: {MAX_SAMPLES}")
     print(f"  random_state: {RANDOM_STATE}")
     
     model = RandomForestClassifier(
         n_estimators=N_ESTIMATORS,
         max_depth=MAX_DEPTH,
+        max_leaf_nodes=MAX_LEAF_NODES,
         min_samples_split=MIN_SAMPLES_SPLIT,
-        min_samples_leaf=MIN_SAMPLES_LEAF,
+        min_samples_leaf=min_samples_leaf,
+        max_samples=MAX_SAMPLES,
         random_state=RANDOM_STATE,
         n_jobs=-1,  # Use all CPU cores
-        verbose=1
+        verbose=1,
+        oob_score=True,  # Validate on each tree's out-of-bag rows
+        warm_start=True  # Later runs can add trees to this model
     )
     
-    model.fit(X_train, y_train)
+    previous = load_previous_model(model)
+    if previous is not None:
+        print(f"  Growing saved model from {previous.n_estimators} trees")
+        previous.n_estimators = N_ESTIMATORS
+        model = previous
+    
+    # Build trees on threads: tree building releases the GIL, so no worker
+    # processes or copies of X_train are needed
+    with joblib.parallel_backend("threading"):
+        model.fit(X_train, y_train)
     print("  Training complete!")
     
     return model
 
 
-def evaluate_model(model: RandomForestClassifier, X_test: pd.DataFrame, y_test: pd.Series) -> dict:
+def format_classification_report(cm: np.ndarray, target_names: list) -> str:
     """
-    Evaluate model performance.
+    Format per-class precision, recall and F1 from a confusion matrix.
+    
+    Matches the layout of sklearn's classification_report (2 digits, a zero
+    denominator scores 0).
     
     Args:
-        model: Trained model
-        X_test: Test features
-        y_test: Test target
+        cm: Confusion matrix (rows: actual class, columns: predicted class)
+        target_names: Display name of each class
     
     Returns:
-        Dictionary with evaluation metrics
+        Report text
     """
-    print("\nEvaluating model...")
+    correct = np.diag(cm)
+    support = cm.sum(axis=1)
+    predicted = cm.sum(axis=0)
+    total = support.sum()
+    
+    with np.errstate(divide="ignore", invalid="ignore"):
+        precision = np.where(predicted > 0, correct / predicted, 0.0)
+        recall = np.where(support > 0, correct / support, 0.0)
+        f1 = np.where(support + predicted > 0, 2 * correct / (support + predicted), 0.0)
+    
+    width = max(len("weighted avg"), *(len(name) for name in target_names))
+    row = f"{{:>{width}}}  {{:>9.2f}} {{:>9.2f}} {{:>9.2f}} {{:>9}}\n"
+    
+    lines = [
+        f"{'':>{width}}  {'precision':>9} {'recall':>9} {'f1-score':>9} {'support':>9}\n\n"
+    ]
+    for name, p, r, f, n in zip(target_names, precision, recall, f1, support):
+        lines.append(row.format(name, p, r, f, n))
+    lines.append("\n")
+    lines.append(f"{'accuracy':>{width}}  {'':>9} {'':>9} {correct.sum() / total:>9.2f} {total:>9}\n")
+    lines.append(row.format("macro avg", precision.mean(), recall.mean(), f1.mean(), total))
+    lines.append(row.format(
+        "weighted avg",
+        np.average(precision, weights=support),
+        np.average(recall, weights=support),
+        np.average(f1, weights=support),
+        total
+    ))
+    return "".join(lines)
+
+
+def evaluate_model(model: "RandomForestClassifier", y: np.ndarray) -> dict:
+    """
+    Evaluate model performance out of bag.
     
-    # Make predictions
-    y_pred = model.predict(X_test)
-    y_pred_proba = model.predict_proba(X_test)[:, 1]
+    Each sample is scored only by the trees that did not train on it, so no
+    test set has to be held out of training.
     
-    # Calculate metrics
-    accuracy = accuracy_score(y_test, y_pred)
-    precision = precision_score(y_test, y_pred, zero_division=0)
-    recall = recall_score(y_test, y_pred, zero_division=0)
-    f1 = f1_score(y_test, y_pred, zero_division=0)
+    Args:
+        model: Trained model (fitted with oob_score=True)
+        y: Training target
+    
+    Returns:
+        Dictionary with evaluation metrics
+    """
+    from sklearn.metrics import confusion_matrix
+    
+    print("\nEvaluating model (out-of-bag)...")
+    
+    # Out-of-bag class probabilities, computed during fit; rows that every
+    # tree trained on have none and are skipped
+    proba = model.oob_decision_function_
+    scored = ~np.isnan(proba).any(axis=1)
+    proba = proba[scored]
+    y_oob = y[scored]
+    print(f"  Scored samples: {len(y_oob):,}")
+    
+    # Predictions: predict() is the most probable class
+    y_pred_proba = proba[:, 1]
+    y_pred = model.classes_.take(np.argmax(proba, axis=1))
+    
+    # Calculate metrics from the confusion matrix (one pass over the
+    # predictions; a zero denominator scores 0)
+    cm = confusion_matrix(y_oob, y_pred, labels=[0, 1])
+    tn, fp, fn, tp = cm.ravel()
+    accuracy = (tp + tn) / cm.sum()
+    precision = tp / (tp + fp) if tp + fp else 0.0
+    recall = tp / (tp + fn) if tp + fn else 0.0
+    f1 = 2 * tp / (2 * tp + fp + fn) if tp + fp + fn else 0.0
     
     metrics = {
         "accuracy": float(accuracy),
@@ -178,7 +393,6 @@ def evaluate_model(model: RandomForestClassifier, X_test: pd.DataFrame, y_test:
     print()
     
     # Confusion matrix
-    cm = confusion_matrix(y_test, y_pred)
     print("Confusion Matrix:")
     print(f"                Predicted")
     print(f"              No Fail  Fail")
@@ -188,23 +402,19 @@ def evaluate_model(model: RandomForestClassifier, X_test: pd.DataFrame, y_test:
     
     # Classification report
     print("Classification Report:")
-    print(classification_report(y_test, y_pred, target_names=["No Failure", "Failure"]))
+    print(format_classification_report(cm, ["No Failure", "Failure"]))
     
     # Feature importance
     print("Top 5 Most Important Features:")
-    feature_importance = pd.DataFrame({
-        "feature": FEATURE_COLUMNS,
-        "importance": model.feature_importances_
-    }).sort_values("importance", ascending=False)
-    
-    for idx, row in feature_importance.head(5).iterrows():
-        print(f"  {row['feature']:20s}: {row['importance']:.4f}")
+    importances = model.feature_importances_
+    for index in np.argsort(-importances)[:5]:
+        print(f"  {FEATURE_COLUMNS[index]:20s}: {importances[index]:.4f}")
     print()
     
     return metrics
 
 
-def save_model(model: RandomForestClassifier, metrics: dict) -> None:
+def save_model(model: "RandomForestClassifier", metrics: dict) -> None:
     """
     Save trained model and metadata.
     
@@ -212,12 +422,14 @@ def save_model(model: RandomForestClassifier, metrics: dict) -> None:
         model: Trained model
         metrics: Evaluation metrics
     """
+    import joblib
+    
     # Create output directory
     os.makedirs(os.path.dirname(MODEL_OUTPUT_PATH), exist_ok=True)
     
     # Save model
     print(f"Saving model to {MODEL_OUTPUT_PATH}...")
-    joblib.dump(model, MODEL_OUTPUT_PATH)
+    joblib.dump(model, MODEL_OUTPUT_PATH, compress=MODEL_COMPRESS, protocol=5)
     print("  Model saved!")
     
     # Save metadata
@@ -230,14 +442,16 @@ def save_model(model: RandomForestClassifier, metrics: dict) -> None:
         "hyperparameters": {
             "n_estimators": N_ESTIMATORS,
             "max_depth": MAX_DEPTH,
+            "max_leaf_nodes": MAX_LEAF_NODES,
             "min_samples_split": MIN_SAMPLES_SPLIT,
-            "min_samples_leaf": MIN_SAMPLES_LEAF,
+            "min_samples_leaf": model.min_samples_leaf,
+            "max_samples": MAX_SAMPLES,
             "random_state": RANDOM_STATE
         },
         "metrics": metrics,
         "data_info": {
             "data_path": DATA_PATH,
-            "test_size": TEST_SIZE
+            "validation": "out-of-bag"
         }
     }
     
@@ -269,22 +483,11 @@ def main():
     # Prepare data
     X, y = prepare_data(df)
     
-    # Split data
-    print(f"\nSplitting data (test_size={TEST_SIZE})...")
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y,
-        test_size=TEST_SIZE,
-        random_state=RANDOM_STATE,
-        stratify=y  # Maintain class distribution
-    )
-    print(f"  Training set: {len(X_train):,} samples")
-    print(f"  Test set: {len(X_test):,} samples")
-    
-    # Train model
-    model = train_model(X_train, y_train)
+    # Train model on all samples (validated out-of-bag, no test split)
+    model = train_model(X, y)
     
     # Evaluate model
-    metrics = evaluate_model(model, X_test, y_test)
+    metrics = evaluate_model(model, y)
     
     # Save model
     save_model(model, metrics)